@@ -42,6 +42,17 @@ mkdir -p "$BUILD_DIR" "$SITE_DIR" "$TMP_VANITY"
 msg "Building vanity Lambda package..."
 python3 -m pip install -q -r "$VANITY_DIR/requirements.txt" -t "$TMP_VANITY"
 
+# Compile the mmap-able lexicon from the committed JSONL (fast cold start)
+if [[ -f "$VANITY_DIR/words_4_7.jsonl.gz" ]]; then
+  msg "Compiling lexicon, letter model and 7-digit suffix table..."
+  python3 "$ROOT_DIR/lambda/tools/build_lexicon.py" --from-jsonl  # unchanged stages are skipped
+  # without it every cold start compiles the JSONL (seconds, ~100 MB more peak memory)
+  for jsonl in "$VANITY_DIR"/words_4_7*.jsonl.gz; do
+    lex="${jsonl%.jsonl.gz}.lex"
+    [[ -f "$lex" ]] || die "Missing $(basename "$lex"); the lexicon did not compile"
+  done
+fi
+
 # Create package folder inside the deployment root
 mkdir -p "$TMP_VANITY/app"
 : > "$TMP_VANITY/app/__init__.py"
@@ -74,6 +85,37 @@ else
   die "app/handler.py NOT found in ZIP — packaging failed"
 fi
 
+if unzip -Z1 "$BUILD_DIR/lambda_vanity.zip" | grep -q '^app/words_4_7.lex$'; then
+  msg "✓ words_4_7.lex included in vanity zip"
+else
+  msg "(!) words_4_7.lex not found in zip (cold start will parse the JSONL lexicon)"
+fi
+
+if unzip -Z1 "$BUILD_DIR/lambda_vanity.zip" | grep -q '^app/words_4_7.ngram$'; then
+  msg "✓ words_4_7.ngram included in vanity zip"
+else
+  msg "(!) words_4_7.ngram not found in zip (first fallback will derive the letter model)"
+fi
+
+if unzip -Z1 "$BUILD_DIR/lambda_vanity.zip" | grep -q '^app/words_4_7.sfx$'; then
+  msg "✓ words_4_7.sfx included in vanity zip"
+else
+  msg "(!) words_4_7.sfx not found in zip (lookups will walk the lexicon per request)"
+fi
+
+if unzip -Z1 "$BUILD_DIR/lambda_vanity.zip" | grep -q '^app/words_4_7.idx$'; then
+  msg "✓ words_4_7.idx included in vanity zip"
+else
+  msg "(!) words_4_7.idx not found in zip (phrase / match-anywhere indexes will be built at runtime)"
+fi
+
+# Lambda rejects direct uploads over 50 MB; each per-locale .sfx is ~21 MB zipped
+ZIP_BYTES=$(wc -c < "$BUILD_DIR/lambda_vanity.zip")
+if (( ZIP_BYTES > 50 * 1024 * 1024 )); then
+  msg "(!) lambda_vanity.zip is $((ZIP_BYTES / 1024 / 1024)) MB, over the 50 MB direct-upload limit" \
+      "(drop locales from --suffix-table-langs or upload via S3)"
+fi
+
 # Optional: show lexicon presence (non-fatal if you’re intentionally testing fallback)
 if unzip -Z1 "$BUILD_DIR/lambda_vanity.zip" | grep -q '^app/words_common.txt.gz$'; then
   msg "✓ words_common.txt.gz included in vanity zip"
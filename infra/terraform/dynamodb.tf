@@ -19,6 +19,16 @@ resource "aws_dynamodb_table" "vanity_calls" {
     type = "S"
   }
 
+  # Per-caller records (VANITY_CALLER_RECORDS) carry an expiry; other items never set it
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  # Feeds the recent-calls view consumer (lambda_api.tf) when enabled
+  stream_enabled   = var.recent_view
+  stream_view_type = var.recent_view ? "NEW_IMAGE" : null
+
   # Point-in-time recovery (optional, commented to keep costs minimal for demo)
   # point_in_time_recovery {
   #   enabled = true
@@ -22,13 +22,23 @@ resource "aws_iam_role" "vanity_role" {
   tags               = local.common_tags
 }
 
-# Allow PutItem into our DynamoDB table
+# Allow PutItem into our DynamoDB table (GetItem/UpdateItem: per-caller records)
 data "aws_iam_policy_document" "vanity_ddb_write" {
   statement {
     sid       = "DynamoPut"
-    actions   = ["dynamodb:PutItem"]
+    actions   = ["dynamodb:PutItem", "dynamodb:GetItem", "dynamodb:UpdateItem"]
     resources = [aws_dynamodb_table.vanity_calls.arn]
   }
+
+  # Lexicon releases (VANITY_LEXICON_SOURCE) when published to S3
+  dynamic "statement" {
+    for_each = startswith(var.lexicon_source, "s3://") ? [trimprefix(var.lexicon_source, "s3://")] : []
+    content {
+      sid       = "LexiconReleases"
+      actions   = ["s3:GetObject"]
+      resources = ["arn:aws:s3:::${trimsuffix(statement.value, "/")}/*"]
+    }
+  }
 }
 
 resource "aws_iam_policy" "vanity_ddb_write" {
@@ -90,11 +100,11 @@ resource "aws_iam_role" "api_role" {
   tags               = local.common_tags
 }
 
-# Allow Scan/Query the DynamoDB table
+# Allow Scan/Query the DynamoDB table (GetItem: the recent-calls view)
 data "aws_iam_policy_document" "api_ddb_read" {
   statement {
     sid       = "DynamoRead"
-    actions   = ["dynamodb:Scan", "dynamodb:Query"]
+    actions   = ["dynamodb:Scan", "dynamodb:Query", "dynamodb:GetItem"]
     resources = [aws_dynamodb_table.vanity_calls.arn]
   }
 }
@@ -118,3 +128,52 @@ resource "aws_iam_role_policy_attachment" "api_xray_attach" {
   role       = aws_iam_role.api_role.name
   policy_arn = aws_iam_policy.xray_write.arn
 }
+
+#################################
+# Recent-calls view (stream)
+#################################
+resource "aws_iam_role" "recent_view_role" {
+  count              = var.recent_view ? 1 : 0
+  name               = "${var.project_name}-recent-view-role"
+  assume_role_policy = data.aws_iam_policy_document.lambda_assume.json
+  tags               = local.common_tags
+}
+
+# Read the table's stream; read and conditionally replace the view item
+data "aws_iam_policy_document" "recent_view" {
+  count = var.recent_view ? 1 : 0
+  statement {
+    sid = "StreamRead"
+    actions = ["dynamodb:DescribeStream", "dynamodb:GetRecords",
+    "dynamodb:GetShardIterator", "dynamodb:ListStreams"]
+    resources = [aws_dynamodb_table.vanity_calls.stream_arn]
+  }
+  statement {
+    sid       = "ViewWrite"
+    actions   = ["dynamodb:GetItem", "dynamodb:PutItem", "dynamodb:Query"]
+    resources = [aws_dynamodb_table.vanity_calls.arn]
+  }
+}
+
+resource "aws_iam_policy" "recent_view" {
+  count  = var.recent_view ? 1 : 0
+  name   = "${var.project_name}-recent-view"
+  policy = data.aws_iam_policy_document.recent_view[0].json
+  tags   = local.common_tags
+}
+
+resource "aws_iam_role_policy_attachment" "recent_view_attach" {
+  count      = var.recent_view ? 1 : 0
+  role       = aws_iam_role.recent_view_role[0].name
+  policy_arn = aws_iam_policy.recent_view[0].arn
+}
+resource "aws_iam_role_policy_attachment" "recent_view_logs_attach" {
+  count      = var.recent_view ? 1 : 0
+  role       = aws_iam_role.recent_view_role[0].name
+  policy_arn = aws_iam_policy.logs_write.arn
+}
+resource "aws_iam_role_policy_attachment" "recent_view_xray_attach" {
+  count      = var.recent_view ? 1 : 0
+  role       = aws_iam_role.recent_view_role[0].name
+  policy_arn = aws_iam_policy.xray_write.arn
+}
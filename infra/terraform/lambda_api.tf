@@ -16,8 +16,12 @@ resource "aws_lambda_function" "api_last5" {
 
   environment {
     variables = {
-      DDB_TABLE = aws_dynamodb_table.vanity_calls.name
-      ENV       = var.env
+      DDB_TABLE     = aws_dynamodb_table.vanity_calls.name
+      ENV           = var.env
+      RECENT_SHARDS = var.recent_shards
+
+      API_RECENT_VIEW  = var.recent_view ? "1" : "0"
+      RECENT_VIEW_SIZE = var.recent_view_size
     }
   }
 
@@ -28,4 +32,55 @@ resource "aws_cloudwatch_log_group" "api_last5" {
   name              = "/aws/lambda/${aws_lambda_function.api_last5.function_name}"
   retention_in_days = 14
   tags              = local.common_tags
-}
\ No newline at end of file
+}
+
+# Stream consumer maintaining the recent-calls view (same zip: recent_view.py)
+resource "aws_lambda_function" "recent_view" {
+  count         = var.recent_view ? 1 : 0
+  function_name = "${var.project_name}-recent-view"
+  role          = aws_iam_role.recent_view_role[0].arn
+  filename      = "./../build/lambda_api.zip"
+  handler       = "recent_view.handler"
+
+  runtime       = "python3.12"
+  architectures = ["arm64"]
+  timeout       = 30
+  memory_size   = 256
+
+  source_code_hash = filebase64sha256("${path.module}/../build/lambda_api.zip")
+
+  environment {
+    variables = {
+      DDB_TABLE        = aws_dynamodb_table.vanity_calls.name
+      ENV              = var.env
+      RECENT_VIEW_SIZE = var.recent_view_size
+    }
+  }
+
+  tracing_config { mode = "Active" }
+}
+
+resource "aws_lambda_event_source_mapping" "recent_view" {
+  count                              = var.recent_view ? 1 : 0
+  event_source_arn                   = aws_dynamodb_table.vanity_calls.stream_arn
+  function_name                      = aws_lambda_function.recent_view[0].arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 1
+  bisect_batch_on_function_error     = true
+  maximum_retry_attempts             = 10
+
+  # only recent-call items (RECENT, RECENT#<shard>); not caller records or the view itself
+  filter_criteria {
+    filter {
+      pattern = jsonencode({ dynamodb = { Keys = { pk = { S = [{ prefix = "RECENT" }] } } } })
+    }
+  }
+}
+
+resource "aws_cloudwatch_log_group" "recent_view" {
+  count             = var.recent_view ? 1 : 0
+  name              = "/aws/lambda/${aws_lambda_function.recent_view[0].function_name}"
+  retention_in_days = 14
+  tags              = local.common_tags
+}
@@ -22,8 +22,12 @@ resource "aws_lambda_function" "vanity" {
 
   environment {
     variables = {
-      DDB_TABLE = aws_dynamodb_table.vanity_calls.name
-      ENV       = var.env
+      DDB_TABLE               = aws_dynamodb_table.vanity_calls.name
+      ENV                     = var.env
+      RECENT_SHARDS           = var.recent_shards
+      VANITY_CALLER_RECORDS   = var.caller_records ? "1" : "0"
+      VANITY_COLLAPSE_SECONDS = var.caller_collapse_seconds
+      VANITY_LEXICON_SOURCE   = var.lexicon_source
     }
   }
 
@@ -23,6 +23,51 @@ variable "enable_bonus_webapp" {
   default     = true
 }
 
+# Spread recent-call writes over RECENT#0..N-1 (1 = single "RECENT" partition).
+# Both Lambdas read it so the API scatter-gathers exactly what the writer uses.
+variable "recent_shards" {
+  type        = number
+  description = "Number of hashed partitions for recent-call items"
+  default     = 1
+}
+
+# Per-caller records: reuse a repeat caller's options and collapse bursts
+# from one caller within caller_collapse_seconds into one recent-calls item.
+variable "caller_records" {
+  type        = bool
+  description = "Keep a per-caller record (read-through options, collapsed repeat writes)"
+  default     = false
+}
+
+variable "caller_collapse_seconds" {
+  type        = number
+  description = "Repeat calls from one caller within this window are not written again"
+  default     = 60
+}
+
+# Versioned lexicon releases (tools/publish_lexicon.py): "" serves the files in
+# the zip; "s3://bucket/prefix" lets warm containers hot-swap new releases.
+variable "lexicon_source" {
+  type        = string
+  description = "Where lexicon releases are published (s3://bucket/prefix), or empty"
+  default     = ""
+}
+
+# Materialized "last N calls" view: a DynamoDB Stream consumer keeps one item
+# current and the API serves it with one GetItem (plus ?version= 304s).
+# After enabling, backfill once with tools/materialize_recent.py.
+variable "recent_view" {
+  type        = bool
+  description = "Serve the dashboard from a stream-maintained view of the newest calls"
+  default     = false
+}
+
+variable "recent_view_size" {
+  type        = number
+  description = "Calls kept in the materialized view"
+  default     = 50
+}
+
 # AWS CLI/SDK profile
 variable "aws_profile" {
   description = "AWS CLI/SDK profile name to use"
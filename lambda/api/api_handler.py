@@ -1,24 +1,199 @@
 # api_handler.py
+import base64
+import binascii
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
 import os
-import boto3
-from boto3.dynamodb.conditions import Key
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from aws_lambda_powertools import Logger
 
+import recent_view
+
 logger = Logger(service="vanity-api")
 DDB_TABLE_NAME = os.getenv("DDB_TABLE", "vanity-numbers-VanityCalls")
-ddb = boto3.resource("dynamodb")
-table = ddb.Table(DDB_TABLE_NAME)
 
-def handler(event, context):
+# boto3 is imported and the table built on first use (or warm()), so
+# warm-up pings and the import itself stay cheap.
+table = None
+_table_lock = threading.Lock()
+
+def _get_table():
+    global table
+    if table is None:
+        with _table_lock:
+            if table is None:
+                import boto3
+                table = boto3.resource("dynamodb").Table(DDB_TABLE_NAME)
+    return table
+
+def warm():
+    """Create the DynamoDB client now instead of on the first request."""
+    _get_table().meta.client
+
+def _is_warmup(event):
+    """{"warmup": true}, serverless-plugin-warmup, or an EventBridge schedule rule."""
+    if not isinstance(event, dict):
+        return False
+    return bool(event.get("warmup")) or event.get("source") in ("serverless-plugin-warmup", "aws.events")
+
+# Must match the vanity Lambda: N > 1 means items live under RECENT#0..N-1
+RECENT_SHARDS = max(1, int(os.getenv("RECENT_SHARDS", "1")))
+PAGE_SIZE = 5      # default ?limit=
+MAX_LIMIT = 50
+# Responses are cached per container for a short TTL (dashboards poll), keyed
+# by query; API_CACHE_TTL_SECONDS=0 disables it. Bodies of API_GZIP_MIN_BYTES
+# or more are gzipped for clients that accept it.
+CACHE_TTL = float(os.getenv("API_CACHE_TTL_SECONDS", "2"))
+GZIP_MIN_BYTES = int(os.getenv("API_GZIP_MIN_BYTES", "1024"))
+CONSISTENT_READ = os.getenv("API_CONSISTENT_READ", "1") == "1"
+# Only what the response needs (sk orders the merge and is the cursor)
+_PROJECTION = {"ProjectionExpression": "#sk, #caller, #created, #cands",
+               "ExpressionAttributeNames": {"#sk": "sk", "#caller": "caller_number",
+                                            "#created": "created_at", "#cands": "vanity_candidates"}}
+# API_RECENT_VIEW=1 serves first pages (and ?since=) from the stream-maintained
+# view (recent_view.py): one eventually consistent GetItem per container per
+# API_CACHE_TTL_SECONDS, shared by every request. Its version is in the body;
+# ?version= is a conditional fetch, 304 while that version is still current.
+RECENT_VIEW = os.getenv("API_RECENT_VIEW", "0") == "1"
+_pool = ThreadPoolExecutor(max_workers=min(RECENT_SHARDS + 1, 32))
+_cache = {}  # (limit, cursor, since) -> (expires, etag, body)
+_cache_lock = threading.Lock()
+_view_cache = [0.0, None]  # [expires, (version, entries)]
+
+def _recent_partitions():
+    if RECENT_SHARDS == 1:
+        return ["RECENT"]
+    # also read the pre-sharding partition so older calls stay visible
+    return [f"RECENT#{i}" for i in range(RECENT_SHARDS)] + ["RECENT"]
+
+def _query_partition(pk, limit=PAGE_SIZE, before=None, after=None):
+    """Newest `limit` items of one partition with before > sk > after."""
+    # The resource's client is thread-safe (Table resources are not) and
+    # still speaks plain Python types.
+    from boto3.dynamodb.conditions import Key
+
+    cond = Key("pk").eq(pk)
+    if after:
+        cond = cond & Key("sk").gt(after)
+    kwargs = {"ExclusiveStartKey": {"pk": pk, "sk": before}} if before else {}
+    tbl = _get_table()
+    resp = tbl.meta.client.query(
+        TableName=tbl.name,
+        KeyConditionExpression=cond,
+        ScanIndexForward=False,   # descending by sk
+        Limit=limit,
+        ConsistentRead=CONSISTENT_READ,
+        **_PROJECTION,
+        **kwargs
+    )
+    return resp.get("Items", [])
+
+def _newest(limit, before=None, after=None):
+    """
+    Scatter-gather: newest `limit` items across all partitions, newest first,
+    older than sk `before` (the cursor) and newer than sk `after` (since).
+    Returns (items, more) where `more` says older items remain.
+    """
+    partitions = _recent_partitions()
+    # one extra item per partition tells whether another page exists
+    query = lambda pk: _query_partition(pk, limit + 1, before, after)  # noqa: E731
+    if len(partitions) == 1:
+        pages = [query(partitions[0])]
+    else:
+        pages = list(_pool.map(query, partitions))
+    # each page is already sk-descending; sk = TS#<ISO-8601 UTC> sorts by time
+    merged = heapq.merge(*pages, key=lambda it: it["sk"], reverse=True)
+    items = list(itertools.islice(merged, limit + 1))
+    return items[:limit], len(items) > limit
+
+# ---------- request parsing ----------
+class BadRequest(ValueError):
+    pass
+
+def _encode_cursor(sk):
+    return base64.urlsafe_b64encode(sk.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor):
     try:
-        # newest first, exactly 5
-        resp = table.query(
-            KeyConditionExpression=Key("pk").eq("RECENT"),
-            ScanIndexForward=False,   # descending by sk
-            Limit=5,
-            ConsistentRead=True
-        )
-        items = resp.get("Items", [])
+        sk = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        sk = ""
+    if not sk.startswith("TS#"):
+        raise BadRequest("invalid cursor")
+    return sk
+
+def _params(event):
+    """(limit, cursor sk or None, since sk or None) from the query string."""
+    q = event.get("queryStringParameters") or {}
+    try:
+        limit = int(q.get("limit") or PAGE_SIZE)
+    except ValueError:
+        raise BadRequest("limit must be an integer") from None
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}")
+    before = _decode_cursor(q["cursor"]) if q.get("cursor") else None
+    # since = a created_at the client already has; sk is TS#<created_at>
+    after = f"TS#{q['since']}" if q.get("since") else None
+    return limit, before, after
+
+def _known_version(event):
+    """?version=: the view version the client already has, or None."""
+    q = event.get("queryStringParameters") or {}
+    try:
+        return int(q["version"]) if q.get("version") else None
+    except ValueError:
+        raise BadRequest("version must be an integer") from None
+
+# ---------- materialized view ----------
+def _view_page(view, limit, after):
+    """(etag, body) from a (version, entries) view, or None when the view cannot answer."""
+    version, entries = view
+    if not version:
+        return None  # not materialized yet
+    newer = [e for e in entries if not after or e["sk"] > after]
+    if after and len(newer) == len(entries) >= recent_view.VIEW_SIZE:
+        return None  # more new calls than the view holds: the gap needs a Query
+    page = newer[:limit]
+    more = len(newer) > limit or (not after and len(entries) >= recent_view.VIEW_SIZE)
+    rows = [{"caller": e["caller"], "created_at": e["created_at"], "top3": e["top3"]} for e in page]
+    return _render(rows, page[-1]["sk"] if more and page else None, version)
+
+def _cached_view():
+    """(version, entries) of the view, read at most once per CACHE_TTL by this container."""
+    now = time.monotonic()
+    with _cache_lock:
+        expires, view = _view_cache
+    if view is not None and expires > now:
+        return view
+    # a view a few hundred ms behind is fine; it costs half a strongly consistent read
+    view = recent_view.read(_get_table(), consistent=False)
+    if CACHE_TTL > 0:
+        with _cache_lock:
+            _view_cache[:] = [now + CACHE_TTL, view]
+    return view
+
+# ---------- response cache ----------
+def _cached_page(key):
+    """(etag, body) for the query, from the container cache or DynamoDB."""
+    now = time.monotonic()
+    if CACHE_TTL > 0:
+        with _cache_lock:
+            hit = _cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1], hit[2]
+
+    limit, before, after = key
+    page = None
+    if RECENT_VIEW and before is None:
+        page = _view_page(_cached_view(), limit, after)
+    if page is None:
+        items, more = _newest(limit, before, after)
         out = [
             {
                 "caller": it["caller_number"],
@@ -27,15 +202,62 @@ def handler(event, context):
             }
             for it in items
         ]
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": event.get("headers", {}).get("origin", "*"),
-                "Access-Control-Allow-Credentials": "true",
-            },
-            "body": __import__("json").dumps({"items": out})
-        }
+        page = _render(out, items[-1]["sk"] if more else None)
+    etag, body = page
+    if CACHE_TTL > 0:
+        with _cache_lock:
+            if len(_cache) >= 256:
+                for k in [k for k, v in _cache.items() if v[0] <= now] or list(_cache)[:128]:
+                    del _cache[k]
+            _cache[key] = (now + CACHE_TTL, etag, body)
+    return etag, body
+
+def _render(items, next_sk, version=None):
+    """(etag, body) of a page of response items."""
+    page = {"items": items, "next_cursor": _encode_cursor(next_sk) if next_sk else None}
+    if version is not None:
+        page["version"] = version
+    body = json.dumps(page).encode()
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"', body
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def handler(event, context):
+    if _is_warmup(event):
+        warm()
+        return {"statusCode": 200, "body": '{"warmup":true}'}
+    # API Gateway v2 lowercases header names; v1 passes them through
+    req_headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    headers = {
+        "Content-Type": "application/json",
+        "Access-Control-Allow-Origin": req_headers.get("origin", "*"),
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Expose-Headers": "ETag",
+        "Cache-Control": "no-cache",  # revalidate with If-None-Match
+        "Vary": "Accept-Encoding",
+    }
+    try:
+        # newest first, ?limit= (default 5), ?cursor= for older pages, ?since= for newer items,
+        # ?version= for nothing unless the view changed
+        key = _params(event)
+        known = _known_version(event)
+        if RECENT_VIEW and known is not None and key[1] is None and known == _cached_view()[0]:
+            return {"statusCode": 304, "headers": headers, "body": ""}
+        etag, body = _cached_page(key)
+        headers["ETag"] = etag
+        if _etag_matches(req_headers.get("if-none-match"), etag):
+            return {"statusCode": 304, "headers": headers, "body": ""}
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in req_headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return {"statusCode": 200, "headers": headers, "isBase64Encoded": True,
+                    "body": base64.b64encode(gzip.compress(body, 6)).decode()}
+        return {"statusCode": 200, "headers": headers, "body": body.decode()}
+    except BadRequest as e:
+        return {"statusCode": 400, "headers": headers, "body": json.dumps({"message": str(e)})}
     except Exception:
         logger.exception("API error")
-        return {"statusCode": 500, "body": '{"message":"Internal Server Error"}'}
\ No newline at end of file
+        return {"statusCode": 500, "body": '{"message":"Internal Server Error"}'}
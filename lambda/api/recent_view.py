@@ -0,0 +1,132 @@
+# recent_view.py
+"""
+Materialized "last N calls" view, maintained from the table's DynamoDB Stream.
+
+One item (pk "VIEW", sk "RECENT") holds the newest RECENT_VIEW_SIZE calls,
+newest first, already in the API's response shape, plus a version that goes
+up by one on every change. handler() consumes stream batches of RECENT /
+RECENT#<shard> items and folds them into the view with a conditional put on
+that version (retried on a lost race), so concurrent shards never drop each
+other's calls. Redelivered records leave the view, and its version, as is.
+
+api_handler serves the view (API_RECENT_VIEW=1) from one GetItem per warm
+container per cache TTL, whatever the number of viewers, and answers
+?version= conditional fetches from it: 304 while unchanged.
+
+catch_up() is the local stand-in for the stream: it queries the RECENT
+partitions for calls newer than the view and applies them the same way
+(tools/materialize_recent.py; also the backfill after enabling the stream,
+which starts at LATEST).
+"""
+import os
+import threading
+from datetime import datetime, timezone
+
+from aws_lambda_powertools import Logger
+
+logger = Logger(service="vanity-recent-view")
+DDB_TABLE_NAME = os.getenv("DDB_TABLE", "vanity-numbers-VanityCalls")
+
+VIEW_KEY = {"pk": "VIEW", "sk": "RECENT"}
+# Calls kept in the view; API pages within it need no Query (MAX_LIMIT is 50)
+VIEW_SIZE = max(1, int(os.getenv("RECENT_VIEW_SIZE", "50")))
+MAX_ATTEMPTS = 5
+
+table = None
+_table_lock = threading.Lock()
+
+def _get_table():
+    global table
+    if table is None:
+        with _table_lock:
+            if table is None:
+                import boto3
+                table = boto3.resource("dynamodb").Table(DDB_TABLE_NAME)
+    return table
+
+def entry(item):
+    """A RECENT item in the view's shape (sk orders the view and is the API cursor)."""
+    return {
+        "sk": item["sk"],
+        "caller": item["caller_number"],
+        "created_at": item["created_at"],
+        "top3": list(item.get("vanity_candidates") or [])[:3],
+    }
+
+def merge(entries, changes, size=None):
+    """Apply {sk: entry, or None for a removed item} to the view's entries; newest `size` first."""
+    by_sk = {e["sk"]: e for e in entries}
+    for sk, e in changes.items():
+        if e is None:
+            by_sk.pop(sk, None)  # the view shrinks until newer calls refill it
+        else:
+            by_sk[sk] = e
+    return sorted(by_sk.values(), key=lambda e: e["sk"], reverse=True)[:size or VIEW_SIZE]
+
+def read(tbl, consistent=True):
+    """(version, entries) of the view; (0, []) before anything materialized it."""
+    item = tbl.get_item(Key=VIEW_KEY, ConsistentRead=consistent).get("Item")
+    if not item:
+        return 0, []
+    return int(item["version"]), list(item.get("items") or [])
+
+def apply(tbl, changes):
+    """Fold changes into the view; returns its version afterwards."""
+    from boto3.dynamodb.conditions import Attr
+
+    for _ in range(MAX_ATTEMPTS):
+        version, entries = read(tbl)
+        merged = merge(entries, changes)
+        if merged == entries:
+            return version  # redelivery, or only calls older than the view
+        try:
+            tbl.put_item(
+                Item={**VIEW_KEY, "version": version + 1, "items": merged,
+                      "updated_at": datetime.now(timezone.utc).isoformat()},
+                ConditionExpression=Attr("version").eq(version) if version else Attr("version").not_exists(),
+            )
+            return version + 1
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            logger.info("Recent view moved past version %s; retrying", version)
+    raise RuntimeError(f"recent view: lost {MAX_ATTEMPTS} races in a row")
+
+def _changes(records):
+    """{sk: entry or None} from stream records, in stream order (later records win)."""
+    from boto3.dynamodb.types import TypeDeserializer
+
+    des = TypeDeserializer()
+    changes = {}
+    for rec in records:
+        ddb = rec.get("dynamodb") or {}
+        keys = {k: des.deserialize(v) for k, v in (ddb.get("Keys") or {}).items()}
+        if not str(keys.get("pk", "")).startswith("RECENT"):
+            continue  # caller records, the view itself
+        if rec.get("eventName") == "REMOVE":
+            changes[keys["sk"]] = None
+        else:
+            changes[keys["sk"]] = entry({k: des.deserialize(v) for k, v in ddb["NewImage"].items()})
+    return changes
+
+def catch_up(tbl, partitions):
+    """Apply calls newer than the view's newest from the given RECENT partitions (no stream needed)."""
+    from boto3.dynamodb.conditions import Key
+
+    _, entries = read(tbl)
+    after = entries[0]["sk"] if entries else None
+    changes = {}
+    for pk in partitions:
+        cond = Key("pk").eq(pk) & Key("sk").gt(after) if after else Key("pk").eq(pk)
+        resp = tbl.meta.client.query(TableName=tbl.name, KeyConditionExpression=cond,
+                                     ScanIndexForward=False, Limit=VIEW_SIZE, ConsistentRead=True)
+        changes.update((it["sk"], entry(it)) for it in resp.get("Items", []))
+    return apply(tbl, changes) if changes else read(tbl)[0]
+
+def handler(event, context):
+    records = event.get("Records") or []
+    changes = _changes(records)
+    version = apply(_get_table(), changes) if changes else None
+    logger.info("Applied %d of %d stream records; recent view at version %s",
+                len(changes), len(records), version)
+    return {"records": len(records), "applied": len(changes), "version": version}
@@ -0,0 +1,19 @@
+# tools/_app.py
+"""
+Make the vanity Lambda importable as `app`, the package name it has inside
+the deployment zip (see build.sh), so tools can import app.handler the same
+way the Lambda runtime and the tests do:
+
+    import _app  # noqa: F401
+    from app import handler
+"""
+import sys
+import types
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+
+if "app" not in sys.modules:
+    _pkg = types.ModuleType("app")
+    _pkg.__path__ = [str(VANITY_DIR)]
+    sys.modules["app"] = _pkg
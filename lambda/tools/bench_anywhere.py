@@ -0,0 +1,70 @@
+# tools/bench_anywhere.py
+"""
+Match-anywhere benchmark: Aho-Corasick scan cost per number as the lexicon grows.
+
+Automata are built over growing random fractions of the lexicon's T9 keys and
+run over the same random 10-digit numbers. Scan time per number should stay
+flat (it follows the digits and the matches found, not the key count); the
+naive column probes every offset and length against a set, for reference.
+The last line times the full vanity.anywhere_candidates() (lookups + ranking).
+
+    python tools/bench_anywhere.py --numbers 5000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+
+
+def naive_matches(keys, digits):
+    return [(end, n) for end in range(4, len(digits) + 1) for n in range(4, min(7, end) + 1)
+            if digits[end - n:end] in keys]
+
+
+def per_number_us(fn, numbers):
+    t0 = time.perf_counter()
+    for d in numbers:
+        fn(d)
+    return (time.perf_counter() - t0) / len(numbers) * 1e6
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--numbers", type=int, default=5000)
+    ap.add_argument("--fractions", type=float, nargs="+", default=[0.1, 0.25, 0.5, 1.0])
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    lex = vanity._engine().lex
+    all_keys = list(vanity._exact_keys(lex))
+    numbers = [f"{rng.randrange(2, 10)}{rng.randrange(10 ** 9):09d}" for _ in range(args.numbers)]
+
+    print(f"{args.numbers} random 10-digit numbers, lexicon={'compiled' if vanity._engine().mapped else 'jsonl'}")
+    print(f"{'keys':>7} {'nodes':>7} {'build ms':>9} {'scan µs':>8} {'naive µs':>9} {'matches':>8}")
+    for frac in args.fractions:
+        keys = rng.sample(all_keys, int(len(all_keys) * frac))
+        t0 = time.perf_counter()
+        ac = vanity._T9Automaton(keys)
+        build_ms = (time.perf_counter() - t0) * 1e3
+        key_set = set(keys)
+        found = sum(len(list(ac.matches(d))) for d in numbers)
+        assert found == sum(len(naive_matches(key_set, d)) for d in numbers)
+        scan = per_number_us(lambda d: list(ac.matches(d)), numbers)
+        naive = per_number_us(lambda d: naive_matches(key_set, d), numbers)
+        print(f"{len(keys):>7,} {len(ac):>7,} {build_ms:>9.1f} {scan:>8.2f} {naive:>9.2f} "
+              f"{found / len(numbers):>8.2f}")
+
+    vanity._automaton()
+    full = per_number_us(lambda d: vanity.anywhere_candidates("+1" + d), numbers)
+    print(f"anywhere_candidates(k=3), full lexicon: {full:.2f} µs/number")
+
+
+if __name__ == "__main__":
+    main()
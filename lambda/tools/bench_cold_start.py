@@ -0,0 +1,59 @@
+# tools/bench_cold_start.py
+"""
+Cold-start benchmark: compiled .lex (mmap) vs gzip+JSONL lexicon loading.
+
+Each sample is a fresh interpreter (a Lambda cold start), so import cost and
+peak RSS are measured in isolation. Build the .lex first:
+
+    python tools/build_lexicon.py --from-jsonl
+    python tools/bench_cold_start.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+
+# Runs inside the child interpreter; prints one JSON line.
+PROBE = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import vanity
+t1 = time.perf_counter()
+vanity.vanity_candidates("+15553569377")
+t2 = time.perf_counter()
+print(json.dumps({
+    "mode": "bin" if vanity._engine().mapped else "jsonl",
+    "import_ms": (t1 - t0) * 1e3,
+    "first_lookup_ms": (t2 - t1) * 1e3,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+def sample(fmt: str) -> dict:
+    env = dict(os.environ, VANITY_LEXICON_FORMAT=fmt)
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=VANITY_DIR, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per mode")
+    args = ap.parse_args(argv)
+
+    print(f"{'mode':<6} {'import ms':>10} {'1st lookup ms':>14} {'peak RSS MB':>12}")
+    for fmt in ("auto", "jsonl"):
+        runs = [sample(fmt) for _ in range(args.runs)]
+        mode = runs[0]["mode"]
+        if fmt == "auto" and mode != "bin":
+            print("bin    (no compiled lexicon; run tools/build_lexicon.py --from-jsonl)")
+            continue
+        med = {k: statistics.median(r[k] for r in runs) for k in ("import_ms", "first_lookup_ms", "max_rss_mb")}
+        print(f"{mode:<6} {med['import_ms']:>10.1f} {med['first_lookup_ms']:>14.2f} {med['max_rss_mb']:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# tools/bench_memory.py
+"""
+Resident memory of the loaded lexicon, before and after the compact layout.
+
+Each mode is a fresh interpreter that imports vanity and loads the lexicon:
+
+  legacy  the previous JSONL layout, rebuilt here for comparison: a WORDS set,
+          a WORD_SCORE dict and a {len: {digits: [(word, score)]}} index
+  jsonl   JSONL compiled in memory to the flat .lex layout (VANITY_LEXICON_FORMAT=jsonl)
+  mmap    words_4_7.lex mapped from disk (build it with tools/build_lexicon.py)
+
+Reported: tracemalloc current/peak (Python allocations), RSS and peak RSS,
+tracked GC objects and the time of one full gc.collect() (GC pressure).
+
+    python tools/bench_memory.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+
+# Runs inside the child interpreter; prints one JSON line.
+PROBE = r"""
+import gc, json, os, resource, sys, time, tracemalloc
+from collections import defaultdict
+tracemalloc.start()
+import vanity
+if sys.argv[1] == "legacy":
+    words, word_score = vanity._load_words()
+    index = {}
+    by_len = defaultdict(list)
+    for w in words:
+        by_len[len(w)].append(w)
+    for n, ws in by_len.items():
+        bucket = defaultdict(list)
+        for w in ws:
+            bucket[vanity._t9_key(w)].append((w, vanity._score_word(w, word_score[w])))
+        for ranked in bucket.values():
+            ranked.sort(key=lambda r: (-r[1], r[0]))
+        index[n] = dict(bucket)
+else:
+    vanity.warm()
+    assert vanity._engine().mapped == (sys.argv[1] == "mmap"), "no compiled lexicon to map"
+gc.collect()
+current, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+t0 = time.perf_counter()
+gc.collect()
+gc_ms = (time.perf_counter() - t0) * 1e3
+try:
+    with open("/proc/self/statm") as fh:
+        rss_mb = int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+except OSError:
+    rss_mb = float("nan")
+print(json.dumps({
+    "traced_mb": current / 2**20,
+    "traced_peak_mb": peak / 2**20,
+    "rss_mb": rss_mb,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "gc_objects": len(gc.get_objects()),
+    "gc_ms": gc_ms,
+}))
+"""
+
+MODES = {"legacy": "jsonl", "jsonl": "jsonl", "mmap": "auto"}
+
+
+def sample(mode: str) -> dict:
+    env = dict(os.environ, VANITY_LEXICON_FORMAT=MODES[mode])
+    proc = subprocess.run([sys.executable, "-c", PROBE, mode], cwd=VANITY_DIR, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode:
+        return {}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = ap.parse_args(argv)
+
+    print(f"{'mode':<7} {'traced MB':>10} {'traced peak':>12} {'RSS MB':>8} {'peak RSS':>9} "
+          f"{'GC objects':>11} {'gc ms':>7}")
+    for mode in args.modes:
+        r = sample(mode)
+        if not r:
+            print(f"{mode:<7} (unavailable; run tools/build_lexicon.py --from-jsonl)")
+            continue
+        print(f"{mode:<7} {r['traced_mb']:>10.1f} {r['traced_peak_mb']:>12.1f} {r['rss_mb']:>8.1f} "
+              f"{r['max_rss_mb']:>9.1f} {r['gc_objects']:>11,} {r['gc_ms']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# tools/bench_persist.py
+"""
+Local latency benchmark for the vanity handler's DynamoDB write modes,
+against a stubbed table whose put_item sleeps like a slow DynamoDB call.
+
+    python tools/bench_persist.py --calls 100 --put-ms 40
+
+"handler" is what Amazon Connect waits for; "drain" is how long the async
+writer needs afterwards (time the container stays thawed after the last call).
+"""
+import argparse
+import contextlib
+import io
+import logging
+import statistics
+import time
+
+import _app  # noqa: F401
+from app import handler as h
+from app.persist import AsyncWriter
+
+
+class SlowTable:
+    def __init__(self, put_ms: float):
+        self.put_ms = put_ms
+        self.items = []
+
+    def put_item(self, Item):
+        time.sleep(self.put_ms / 1000.0)
+        self.items.append(Item)
+
+
+def run(mode: str, calls: int, put_ms: float):
+    h.table = SlowTable(put_ms)
+    h._WRITER = AsyncWriter(h._put_item, h.PERSIST_QUEUE, h.PERSIST_WORKERS) if mode == "async" else None
+    h._RESULTS.clear()
+    lat = []
+    with contextlib.redirect_stdout(io.StringIO()):  # EMF metric lines
+        for i in range(calls):
+            t0 = time.perf_counter()
+            h.handler({"phone": f"+1303555{i % 10000:04d}"}, None)
+            lat.append((time.perf_counter() - t0) * 1e3)
+    t0 = time.perf_counter()
+    if h._WRITER is not None:
+        h._WRITER.drain()
+    drain_ms = (time.perf_counter() - t0) * 1e3
+    assert len(h.table.items) == calls, "lost writes"
+    lat.sort()
+    return statistics.median(lat), lat[int(0.95 * (len(lat) - 1))], lat[-1], drain_ms
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=100)
+    ap.add_argument("--put-ms", type=float, default=40.0, help="stubbed put_item latency")
+    args = ap.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    print(f"{args.calls} calls, put_item {args.put_ms:.0f} ms")
+    print(f"{'mode':<6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'drain ms':>9}")
+    for mode in ("sync", "async"):
+        p50, p95, mx, drain = run(mode, args.calls, args.put_ms)
+        print(f"{mode:<6} {p50:>8.2f} {p95:>8.2f} {mx:>8.2f} {drain:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
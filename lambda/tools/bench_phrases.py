@@ -0,0 +1,58 @@
+# tools/bench_phrases.py
+"""
+Latency benchmark for vanity.phrase_candidates() (multi-word segmentation).
+
+Worst cases are digit strings whose every window hits large T9 buckets
+(long runs of 7s and 9s), next to typical and no-match numbers.
+
+    python tools/bench_phrases.py --iters 2000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+
+CASES = {
+    "run of 7s":  "+17777777777",
+    "run of 9s":  "+19999999999",
+    "run of 2s":  "+12222222222",
+    "mixed 7/9":  "+17979797979",
+    "800-number": "+18003569377",
+    "no match":   "+13035551010",
+}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iters", type=int, default=2000)
+    ap.add_argument("--k", type=int, default=3)
+    ap.add_argument("--budget-ms", type=float, help="opt-in wall-clock cap per call")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    vanity._phrase_trie()
+    print(f"lexicon: {'compiled' if vanity._engine().mapped else 'jsonl'}; "
+          f"trie build {(time.perf_counter() - t0) * 1e3:.1f} ms (once per container)")
+
+    print(f"{'case':<11} {'span':>4} {'p50 µs':>8} {'p99 µs':>8} {'max µs':>8}  best")
+    for name, e164 in CASES.items():
+        for span in (7, 10):
+            times = []
+            for _ in range(args.iters):
+                t = time.perf_counter()
+                res = vanity.phrase_candidates(e164, k=args.k, span=span, budget_ms=args.budget_ms)
+                times.append((time.perf_counter() - t) * 1e6)
+            times.sort()
+            p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+            best = res[0].display if res else "-"
+            print(f"{name:<11} {span:>4} {statistics.median(times):>8.1f} {p99:>8.1f} {times[-1]:>8.1f}  {best}")
+
+
+if __name__ == "__main__":
+    main()
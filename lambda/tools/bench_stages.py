@@ -0,0 +1,91 @@
+# tools/bench_stages.py
+"""
+Overhead and breakdown of the vanity handler's per-stage latency metrics.
+
+The same random numbers go through handler() with stage timing on and off
+(VANITY_STAGE_METRICS), alternating per round so drift hits both equally;
+the result cache is cleared before each pass, so every call is a miss
+(--repeat N re-sends each number N times for cache hits). No table is set,
+so persist is the "no table" path. EMF output is discarded.
+
+    python tools/bench_stages.py --calls 2000 --rounds 5
+    python tools/bench_stages.py --trace            # with X-Ray subsegments (no-op outside Lambda)
+"""
+import argparse
+import contextlib
+import io
+import logging
+import random
+import statistics
+import time
+from collections import defaultdict
+
+import _app  # noqa: F401
+from app import handler as h
+
+
+def run(numbers, enabled: bool, trace: bool, stages=None):
+    h.STAGE_METRICS, h.TRACE_STAGES = enabled, trace
+    h._RESULTS.clear()
+    lat = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for e164 in numbers:
+            t0 = time.perf_counter()
+            h.handler({"phone": e164}, None)
+            lat.append((time.perf_counter() - t0) * 1e6)
+    return lat
+
+
+def pct(lat, q):
+    return sorted(lat)[int(q * (len(lat) - 1))]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=2000, help="distinct numbers per pass")
+    ap.add_argument("--repeat", type=int, default=1, help="send each number this many times")
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--trace", action="store_true", help="also open a tracer subsegment per stage")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    rng = random.Random(args.seed)
+    numbers = [f"+1303{rng.randrange(10 ** 7):07d}" for _ in range(args.calls)] * args.repeat
+    h.warm()
+    h.handler({"phone": numbers[0]}, None)  # spend the cold start outside the timings
+
+    lat = {False: [], True: []}
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            lat[enabled] += run(numbers, enabled, args.trace)
+
+    print(f"{len(numbers)} calls x {args.rounds} rounds, trace={'on' if args.trace else 'off'}")
+    print(f"{'stages':<7} {'mean µs':>8} {'p50 µs':>8} {'p99 µs':>8}")
+    for enabled in (False, True):
+        xs = lat[enabled]
+        print(f"{'on' if enabled else 'off':<7} {statistics.fmean(xs):>8.1f} {pct(xs, 0.5):>8.1f} {pct(xs, 0.99):>8.1f}")
+    off, on = statistics.fmean(lat[False]), statistics.fmean(lat[True])
+    print(f"overhead: {on - off:+.1f} µs/call ({(on - off) / off:+.1%})")
+
+    # Per-stage means, from the durations handed to record_stages
+    sums, counts = defaultdict(float), defaultdict(int)
+
+    def collect(durations, cold_start, cache_hit, env):
+        for name, ms in durations.items():
+            sums[name] += ms
+            counts[name] += 1
+
+    real, h.record_stages = h.record_stages, collect
+    try:
+        run(numbers, True, args.trace)
+    finally:
+        h.record_stages = real
+    print(f"\n{'stage':<9} {'calls':>7} {'mean µs':>8}")
+    for name in ("extract", "caller", "lookup", "fallback", "format", "persist"):
+        if counts[name]:
+            print(f"{name:<9} {counts[name]:>7} {sums[name] / counts[name] * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
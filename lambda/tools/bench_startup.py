@@ -0,0 +1,122 @@
+# tools/bench_startup.py
+"""
+Startup benchmark for both Lambdas: import time (python -X importtime),
+first-invocation latency and peak RSS, each sample in a fresh interpreter.
+
+    python tools/bench_startup.py --runs 5
+    python tools/bench_startup.py --top 15                       # heaviest imports
+    python tools/bench_startup.py --import-budget-ms 250 --rss-budget-mb 90   # CI gate
+
+The vanity Lambda's first call is a real lookup (no DDB_TABLE, so nothing is
+written); the API Lambda's first call is a warm-up ping, since a real one
+needs DynamoDB. Exits 1 when a median is over a given budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+API_DIR = TOOLS_DIR.parent / "api"
+
+# Each probe runs in the child interpreter and prints one JSON line.
+PROBES = {
+    "vanity": ("app.handler", r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import _app
+from app import handler as h
+t1 = time.perf_counter()
+h.handler({"phone": "+13035569377"}, None)
+t2 = time.perf_counter()
+h.handler({"phone": "+13035569377"}, None)
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "first_ms": (t2 - t1) * 1e3, "second_ms": (t3 - t2) * 1e3,
+                  "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""),
+    "api": ("api_handler", r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import api_handler
+t1 = time.perf_counter()
+api_handler.handler({"warmup": True}, None)
+t2 = time.perf_counter()
+api_handler.handler({"warmup": True}, None)
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "first_ms": (t2 - t1) * 1e3, "second_ms": (t3 - t2) * 1e3,
+                  "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""),
+}
+
+
+def _env() -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(TOOLS_DIR), str(API_DIR)]))
+    env.pop("DDB_TABLE", None)
+    env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    env.setdefault("POWERTOOLS_METRICS_NAMESPACE", "VanityConnect")
+    return env
+
+
+def sample(name: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBES[name][1]], env=_env(),
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def importtime(name: str) -> list:
+    """[(cumulative µs, self µs, depth, module)] from -X importtime for the probe's imports."""
+    module = PROBES[name][0]
+    stmt = f"import _app; import {module}" if name == "vanity" else f"import {module}"
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", stmt], env=_env(),
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cum_us, mod = line[len("import time:"):].split("|")
+        mod = mod[1:].rstrip()  # nesting shows as two extra spaces per level
+        rows.append((int(cum_us), int(self_us), (len(mod) - len(mod.lstrip())) // 2, mod.strip()))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per Lambda")
+    ap.add_argument("--top", type=int, default=8, help="heaviest top-level imports to list")
+    ap.add_argument("--import-budget-ms", type=float, help="fail if a median import exceeds this")
+    ap.add_argument("--first-budget-ms", type=float, help="fail if a median first invocation exceeds this")
+    ap.add_argument("--rss-budget-mb", type=float, help="fail if a median peak RSS exceeds this")
+    args = ap.parse_args(argv)
+
+    over = []
+    print(f"{'lambda':<7} {'import ms':>10} {'1st call ms':>12} {'2nd call ms':>12} {'peak RSS MB':>12}")
+    for name in PROBES:
+        runs = [sample(name) for _ in range(args.runs)]
+        med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+        print(f"{name:<7} {med['import_ms']:>10.1f} {med['first_ms']:>12.2f} "
+              f"{med['second_ms']:>12.2f} {med['max_rss_mb']:>12.1f}")
+        for key, budget in (("import_ms", args.import_budget_ms), ("first_ms", args.first_budget_ms),
+                            ("max_rss_mb", args.rss_budget_mb)):
+            if budget is not None and med[key] > budget:
+                over.append(f"{name} {key} {med[key]:.1f} > {budget:g}")
+
+    for name in PROBES:
+        rows = importtime(name)
+        total = sum(r[0] for r in rows if r[2] == 0)
+        # depth 1 = what the handler module (and site/_app) imports directly
+        top = sorted((r for r in rows if r[2] == 1), reverse=True)[:args.top]
+        print(f"\n{name}: {total / 1e3:.1f} ms total under -X importtime; heaviest direct imports:")
+        for cum_us, self_us, _, mod in top:
+            print(f"  {cum_us / 1e3:>8.1f} ms  {mod}")
+
+    if over:
+        print("\nover budget: " + "; ".join(over), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+# tools/bench_suite.py
+"""
+Benchmark suite for the engine, the vanity handler and the API handler, with
+JSON results and a regression gate against a stored baseline.
+
+  lexicon.load            _Engine(): open (or compile) the lexicon + suffix table
+  lexicon.compile_jsonl   read words_4_7.jsonl.gz and compile it to the .lex layout
+  index.trie              phrase trie over the exact T9 keys
+  index.automaton         match-anywhere Aho-Corasick automaton
+  scoring.python          _score_word() over every lexicon word, one at a time
+  scoring.features        word_features(): the whole lexicon's feature matrix (numpy)
+  scoring.rerank          _rerank(): rescore and re-sort every entry under custom weights (numpy)
+  lookup.hit              vanity_candidates(k=3), number ending in a 7-letter word
+  lookup.miss             vanity_candidates(k=3), no word: pronounceable fallbacks
+  lookup.worst_bucket     vanity_candidates(), the largest T9 bucket in full
+  handler.miss            handler() end to end, stubbed table, result cache cleared
+  handler.hit             handler() end to end, stubbed table, result cache hit
+  api.recent              api_handler.handler(), stubbed query returning a page, no response cache
+  api.cached              api_handler.handler() answered from the response cache
+
+Each benchmark runs `--rounds` rounds of `number` calls; per-call times are
+reported as median / min / max over rounds, in µs.
+
+    python tools/bench_suite.py --out bench.json
+    python tools/bench_suite.py --only lookup handler
+    python tools/bench_suite.py --baseline bench_baseline.json --max-regression 20
+
+With --baseline, exits 1 when any benchmark is more than --max-regression
+percent (and --min-delta-us) slower than the baseline. The gate compares the
+best round (--stat min_us, as timeit advises: it is the least noisy on shared
+machines); --stat median_us is stricter about tail slowdowns.
+Baselines are machine-specific: record one with --out on the machine that gates.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import _app  # noqa: F401
+from app import handler as h
+from app import vanity
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "api"))
+import api_handler  # noqa: E402
+
+
+class NullTable:
+    name = "bench"
+
+    def put_item(self, Item):
+        pass
+
+
+class PageTable:
+    """Stands in for the DynamoDB Table resource: meta.client.query returns one fixed page."""
+
+    name = "bench"
+
+    def __init__(self, items):
+        self.meta = self
+        self.client = self
+        self.items = items
+
+    def query(self, **kwargs):
+        return {"Items": self.items[:kwargs.get("Limit", len(self.items))]}
+
+
+def _hit_number(rng):
+    for _ in range(100000):
+        e164 = f"+1303{rng.randrange(10 ** 7):07d}"
+        top = vanity.vanity_candidates(e164, k=1, fallback=False)
+        if top and len(top[0].raw_letters) == 7:
+            return e164
+    raise SystemExit("no 7-letter hit found")
+
+
+def _miss_number(rng):
+    for _ in range(100000):
+        e164 = f"+1303{rng.randrange(10 ** 7):07d}"
+        if not vanity.vanity_candidates(e164, k=1, fallback=False):
+            return e164
+    raise SystemExit("no miss found")
+
+
+def _worst_bucket_number():
+    lex = vanity._engine().lex
+    key, _ = Counter(lex.keys).most_common(1)[0]
+    n, d = divmod(key, vanity.KEY_BASE)
+    digits = f"{d:0{n}d}"
+    # try leading digits until no longer suffix matches, so the bucket itself is returned
+    for pad in range(10 ** (7 - n)):
+        e164 = f"+1303{pad:0{7 - n}d}{digits}" if n < 7 else f"+1303{digits}"
+        top = vanity.vanity_candidates(e164, k=1, fallback=False)
+        if top and len(top[0].raw_letters) == n:
+            return e164
+    return f"+1303{digits:0>7}"
+
+
+def _api_items(n=5):
+    return [{"pk": "RECENT", "sk": f"TS#2025-10-03T21:07:5{i}.000000+00:00",
+             "caller_number": f"+1303555{i:04d}", "created_at": f"2025-10-03T21:07:5{i}.000000+00:00",
+             "vanity_candidates": ["303-555-FLOWERS", "303-555-FLOWE", "303-555-FLOW"]}
+            for i in range(n)]
+
+
+def benchmarks(seed: int):
+    """{name: (setup() -> fn, number)}; setup runs once, outside the timings."""
+    def load():
+        return vanity._Engine
+
+    def compile_jsonl():
+        path = Path(vanity.__file__).parent / "words_4_7.jsonl.gz"
+        if not path.exists():
+            return None
+
+        def run():
+            _, word_score = vanity._load_words()
+            return vanity._compile_lexicon(word_score.items())
+        return run
+
+    def trie():
+        keys = list(vanity._exact_keys(vanity._engine().lex))
+        return lambda: vanity._T9Trie(keys)
+
+    def automaton():
+        keys = list(vanity._exact_keys(vanity._engine().lex))
+        return lambda: vanity._T9Automaton(keys)
+
+    def scoring(kind: str):
+        def setup():
+            lex = vanity._engine().lex
+            if kind == "python":
+                rows = [(lex.word(i), lex.freqs[i]) for i in range(lex.n_words)]
+                return lambda: [vanity._score_word(w, f) for w, f in rows]
+            try:
+                vanity._numpy()
+            except ImportError:
+                return None
+            if kind == "features":
+                return lambda: vanity.word_features(lex)
+            weights = {**vanity.DEFAULT_WEIGHTS, "zipf": 1.5, "bigram": 0.5}
+            return lambda: vanity._rerank(lex, weights)
+        return setup
+
+    def lookup(pick, k=3):
+        def setup():
+            e164 = pick()
+            return lambda: vanity.vanity_candidates(e164, k=k)
+        return setup
+
+    def handler_call(hit: bool):
+        def setup():
+            h.table = NullTable()
+            rng = random.Random(seed)
+            numbers = [_hit_number(rng) if i % 2 else _miss_number(rng) for i in range(32)]
+            cycle = iter(numbers * 10 ** 6)
+            event = {"phone": numbers[0]}
+
+            def run():
+                if not hit:
+                    h._RESULTS.clear()
+                    event["phone"] = next(cycle)
+                h.handler(event, None)
+            return run
+        return setup
+
+    def api(ttl: float):
+        def setup():
+            api_handler.table = PageTable(_api_items())
+            api_handler.CACHE_TTL = ttl
+            api_handler._cache.clear()
+            event = {"headers": {"origin": "https://example.com"}}
+            return lambda: api_handler.handler(event, None)
+        return setup
+
+    return {
+        "lexicon.load": (load, 3),
+        "lexicon.compile_jsonl": (compile_jsonl, 1),
+        "index.trie": (trie, 1),
+        "index.automaton": (automaton, 1),
+        "scoring.python": (scoring("python"), 1),
+        "scoring.features": (scoring("features"), 1),
+        "scoring.rerank": (scoring("rerank"), 1),
+        "lookup.hit": (lookup(lambda: _hit_number(random.Random(seed))), 2000),
+        "lookup.miss": (lookup(lambda: _miss_number(random.Random(seed))), 200),
+        "lookup.worst_bucket": (lookup(_worst_bucket_number, k=None), 2000),
+        "handler.miss": (handler_call(hit=False), 200),
+        "handler.hit": (handler_call(hit=True), 2000),
+        "api.recent": (api(0.0), 2000),
+        "api.cached": (api(3600.0), 2000),
+    }
+
+
+def measure(fn, number: int, rounds: int) -> dict:
+    fn()  # warm-up call: first-touch costs belong to lexicon.load / index.*
+    per_call = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - t0) / number * 1e6)
+    return {"median_us": statistics.median(per_call), "min_us": min(per_call), "max_us": max(per_call),
+            "number": number, "rounds": rounds}
+
+
+def compare(results: dict, baseline: dict, max_regression: float, min_delta_us: float,
+            stat: str = "min_us") -> list:
+    """[(name, base µs, now µs, change)] for benchmarks over the allowed regression."""
+    over = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        now, was = r[stat], base[stat]
+        if now - was > min_delta_us and now > was * (1 + max_regression / 100):
+            over.append((name, was, now, now / was - 1))
+    return over
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--only", nargs="+", help="run benchmarks whose name starts with one of these")
+    ap.add_argument("--rounds", type=int, default=7)
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply calls per round (e.g. 0.1 for a smoke run)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="write results as JSON here")
+    ap.add_argument("--baseline", help="JSON from an earlier --out to gate against")
+    ap.add_argument("--max-regression", type=float, default=20.0, help="allowed slowdown over baseline, percent")
+    ap.add_argument("--min-delta-us", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    ap.add_argument("--stat", choices=["min_us", "median_us"], default="min_us", help="statistic the gate compares")
+    args = ap.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    eng = vanity._engine()
+    meta = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "lexicon": "compiled" if eng.mapped else "jsonl",
+        "suffix_table": eng.suffix_table is not None,
+        "lexicon_version": eng.version,
+        "cpu_count": os.cpu_count(),
+    }
+    results = {}
+    print(f"lexicon={meta['lexicon']} ({meta['lexicon_version']}), suffix table="
+          f"{'on' if meta['suffix_table'] else 'off'}, python {meta['python']}")
+    print(f"{'benchmark':<22} {'median µs':>12} {'min µs':>12} {'calls':>7}")
+    out = sys.stdout
+    with contextlib.redirect_stdout(io.StringIO()) as emf:  # handler EMF lines
+        for name, (setup, number) in benchmarks(args.seed).items():
+            if args.only and not any(name.startswith(p) for p in args.only):
+                continue
+            fn = setup()
+            if fn is None:
+                continue
+            r = measure(fn, max(1, int(number * args.scale)), args.rounds)
+            results[name] = r
+            print(f"{name:<22} {r['median_us']:>12.2f} {r['min_us']:>12.2f} {r['number']:>7}", file=out)
+            emf.seek(0)
+            emf.truncate()
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"meta": meta, "results": results}, indent=2) + "\n")
+        print(f"wrote {len(results)} results → {args.out}")
+
+    if args.baseline:
+        base = json.loads(Path(args.baseline).read_text())
+        over = compare(results, base["results"], args.max_regression, args.min_delta_us, args.stat)
+        if base.get("meta", {}).get("lexicon_version") not in (None, meta["lexicon_version"]):
+            print(f"note: baseline lexicon {base['meta']['lexicon_version']} != {meta['lexicon_version']}")
+        if over:
+            for name, was, now, change in over:
+                print(f"REGRESSION {name}: {was:.2f} → {now:.2f} µs ({change:+.1%})", file=sys.stderr)
+            return 1
+        print(f"no regression over {args.max_regression:g}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# tools/bench_topk.py
+"""
+Microbenchmark for the largest T9 buckets: per-request scoring + sort (the
+original vanity_candidates) vs pre-ranked index lookups sliced to top k.
+
+    python tools/bench_topk.py --iters 20000
+    VANITY_LEXICON_FORMAT=jsonl python tools/bench_topk.py
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+
+
+def largest_buckets(per_len: int = 1):
+    """[(n, digits, words)] for the biggest buckets of each word length."""
+    lex = vanity._engine().lex
+    buckets = {}
+    for key, _ in Counter(lex.keys).most_common():
+        n, d = divmod(key, vanity.KEY_BASE)
+        digits = f"{d:0{n}d}"
+        words = [lex.word(lex.word_ids[e]) for e in lex.find(n, digits)]
+        buckets.setdefault(n, []).append((n, digits, words))
+    return [b for n in sorted(buckets) if 4 <= n <= 7 for b in buckets[n][:per_len]]
+
+
+def before(words):
+    """The pre-ranking request path: score every word, then sort the bucket."""
+    scored = [vanity.VanityCandidate("", w, vanity._score_word(w)) for w in words]
+    scored.sort(key=lambda c: c.score, reverse=True)
+    return scored[:3]
+
+
+def timeit(fn, iters):
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - t0) / iters * 1e6
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iters", type=int, default=20000)
+    ap.add_argument("--per-len", type=int, default=2, help="largest buckets to time per word length")
+    args = ap.parse_args(argv)
+
+    eng = vanity._engine()
+    lexicon = "compiled" if eng.mapped else "jsonl"
+    table = "on" if eng.suffix_table is not None else "off"
+    print(f"lexicon={lexicon}, suffix table={table}")
+    print(f"{'key':>8} {'words':>5} {'before µs':>10} {'all µs':>8} {'k=3 µs':>8}  top")
+    for n, digits, words in largest_buckets(args.per_len):
+        # pad with 1s (never part of a T9 key) so no longer suffix can match
+        e164 = "+1303" + "1" * (7 - n) + digits
+        t_before = timeit(lambda: before(words), args.iters)
+        t_all = timeit(lambda: vanity.vanity_candidates(e164), args.iters)
+        t_k = timeit(lambda: vanity.vanity_candidates(e164, k=3), args.iters)
+        top = ",".join(c.raw_letters for c in vanity.vanity_candidates(e164, k=3))
+        print(f"{digits:>8} {len(words):>5} {t_before:>10.2f} {t_all:>8.2f} {t_k:>8.2f}  {top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,72 @@
 # tools/build_lexicon.py
 """
-Build /words_4_7.jsonl.gz from a frequency source.
+Build each language's lexicon: vanity/words_4_7.jsonl.gz (the word list, one
+{"word": ..., "score": ...} per line) plus the formats the runtime loads:
+words_4_7.lex (mmap-able lexicon), words_4_7.ngram (letter trigram model for
+pronounceable fallbacks), words_4_7.idx (phrase trie and match-anywhere
+automaton) and words_4_7.sfx (7-digit suffix table).
 
-Requires: pip install wordfreq
+One set of files per wordfreq language (--lang). English keeps the plain
+names; other languages get words_4_7.<lang>.jsonl.gz / .lex / .ngram / .idx / .sfx.
 
-This pulls common words, keeps 4–7 letters, uppercases them,
-and writes JSONL.gz with a Zipf-based score.
+The build is a pipeline of streaming stages:
+
+  source   tokens from wordfreq's top_n_list (--top), or a --corpus file of
+           "word count" lines, or the existing JSONL.gz with --from-jsonl
+  filter   fold accents to the keypad letter (É -> E, Ñ -> N, Ç -> C), keep
+           4–7 letters A–Z
+  score    Zipf frequency, in shards of --shard-size across a process pool
+           (--workers); only 2 shards per worker are in flight
+  curate   best score per word; drop --deny words and words containing a
+           --profanity stem; force in --allow words (allow wins over both);
+           keep the best --cap
+  t9key    every kept word must spell a full T9 key
+  emit     JSONL.gz (not with --from-jsonl: the JSONL is the input), .lex,
+           .ngram, then .idx and .sfx from the .lex (the 40 MB .sfx only for
+           --suffix-table-langs, default en)
+
+Each stage's inputs (source settings, list contents, upstream outputs) are
+fingerprinted into lambda/.lexicon_build/<lang>.manifest.json together with
+hashes of what it wrote. A stage whose fingerprint and outputs match the last
+build is skipped: editing a deny list re-curates and recompiles without
+re-scoring 200k tokens, and an unchanged build writes nothing. --force
+rebuilds every stage.
+
+List files hold one word (or profanity stem) per line, "#" comments; an allow
+line may carry a score ("FLOWERS 5.5"; default --allow-score).
+
+Requires: pip install wordfreq  (not needed with --corpus or --from-jsonl)
+
+    python tools/build_lexicon.py                  # wordfreq en
+    python tools/build_lexicon.py --lang en es fr --workers 8
+    python tools/build_lexicon.py --deny deny.txt --profanity profanity.txt --allow allow.txt
+    python tools/build_lexicon.py --from-jsonl     # compile every JSONL.gz present (build.sh)
 """
+import argparse
 import gzip
+import hashlib
+import io
+import itertools
 import json
+import math
+import os
 import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from wordfreq import top_n_list, zipf_frequency
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-OUT = Path(__file__).resolve().parents[1] / "words_4_7.jsonl.gz"
+import vanity  # noqa: E402  (layout constants + scoring shared with the runtime)
+
+BUILD_DIR = VANITY_DIR.parent / ".lexicon_build"
 WORD_RE = re.compile(r"^[A-Z]{4,7}$")
 
 def is_ok(w: str) -> bool:
@@ -24,34 +76,310 @@ def is_ok(w: str) -> bool:
     # Keep it simple for now.
     return True
 
-def main():
-    # Pull ~120k common tokens; filter to 4–7 letters; keep top ~50–100k
-    raw = top_n_list("en", 200000)  # generous; we’ll filter down
-    kept = []
-    for w in raw:
-        W = w.upper()
-        if is_ok(W):
-            score = zipf_frequency(w, "en")  # ~1..7
-            kept.append((W, round(score, 3)))
-
-    # Deduplicate and keep best score per word
-    best = {}
-    for w, s in kept:
-        if w not in best or s > best[w]:
-            best[w] = s
-
-    # Sort by (score desc, length desc, alpha)
-    rows = sorted(best.items(), key=lambda kv: (-kv[1], -len(kv[0]), kv[0]))
-
-    # Cap to ~100k (tune if needed)
-    rows = rows[:100000]
-
-    OUT.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(OUT, "wt", encoding="utf-8") as fh:
+def fold(w: str) -> str:
+    """Uppercase and strip diacritics: CAFÉ -> CAFE, NIÑO -> NINO (ß, Œ, ... stay and fail is_ok)."""
+    return "".join(ch for ch in unicodedata.normalize("NFKD", w.upper()) if not unicodedata.combining(ch))
+
+# ---------- stages ----------
+def source(lang: str, top: int, corpus: Optional[Path]) -> Iterator[Tuple[str, Optional[float]]]:
+    """(token, corpus count or None for wordfreq)."""
+    if corpus is None:
+        from wordfreq import top_n_list
+        for token in top_n_list(lang, top):
+            yield token, None
+        return
+    with open(corpus, encoding="utf-8") as fh:
+        for line in fh:
+            parts = line.split()
+            if parts and not parts[0].startswith("#"):
+                yield parts[0], float(parts[1]) if len(parts) > 1 else 1.0
+
+def filter_tokens(tokens: Iterable[Tuple[str, Optional[float]]]) -> Iterator[Tuple[str, str, Optional[float]]]:
+    """(folded word, original token, count) for tokens that fold to 4–7 letters A–Z."""
+    for token, count in tokens:
+        word = fold(token)
+        if is_ok(word):
+            yield word, token, count
+
+def score_shard(lang: str, shard: List[Tuple[str, str, Optional[float]]],
+                total: Optional[float]) -> List[Tuple[str, float]]:
+    """Runs in a worker: Zipf (log10 per billion words) from wordfreq, or from corpus counts."""
+    if total is None:
+        from wordfreq import zipf_frequency
+        return [(word, round(zipf_frequency(token, lang), 3)) for word, token, _ in shard]
+    return [(word, round(math.log10(count / total * 1e9), 3)) for word, _, count in shard]
+
+def score(words: Iterable[Tuple[str, str, Optional[float]]], lang: str, total: Optional[float],
+          workers: int, shard_size: int) -> Iterator[Tuple[str, float]]:
+    shards = iter(lambda: list(itertools.islice(words, shard_size)), [])
+    if workers <= 1:
+        for shard in shards:
+            yield from score_shard(lang, shard, total)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()  # futures in submission order
+        for shard in shards:
+            window.append(pool.submit(score_shard, lang, shard, total))
+            if len(window) >= 2 * workers:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+def curate(scored: Iterable[Tuple[str, float]], allow: Dict[str, Optional[float]], deny: set,
+           profanity: List[str], cap: int, allow_score: float) -> Tuple[List[Tuple[str, float]], Dict[str, int]]:
+    """(rows best-first, counts of what each list did)."""
+    best: Dict[str, float] = {}
+    for word, s in scored:
+        if s > best.get(word, -math.inf):
+            best[word] = s
+    counts = {"denied": 0, "profanity": 0, "allowed": 0}
+    for word in list(best):
+        if word in allow:
+            continue
+        if word in deny:
+            counts["denied"] += 1
+            del best[word]
+        elif any(stem in word for stem in profanity):
+            counts["profanity"] += 1
+            del best[word]
+    rows = sorted(best.items(), key=lambda kv: (-kv[1], -len(kv[0]), kv[0]))[:cap]
+    kept = {w for w, _ in rows}
+    for word, s in allow.items():
+        if s is not None or word not in kept:
+            counts["allowed"] += 1
+            kept.add(word)
+            best[word] = s if s is not None else best.get(word, allow_score)
+    rows = sorted(((w, best[w]) for w in kept), key=lambda kv: (-kv[1], -len(kv[0]), kv[0]))
+    return rows, counts
+
+def t9key(rows: Iterable[Tuple[str, float]]) -> Iterator[Tuple[str, float]]:
+    """Words whose every letter is on the keypad (allow-list entries skip the filter stage)."""
+    for word, s in rows:
+        if WORD_RE.match(word) and all(L in vanity._T9_REV for L in word):
+            yield word, s
+
+# ---------- files ----------
+def read_jsonl(path: Path) -> List[Tuple[str, float]]:
+    rows = []
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                obj = json.loads(line)
+                rows.append((str(obj["word"]).upper(), float(obj.get("score", 0.0))))
+    return rows
+
+def write_jsonl(rows: Iterable[Tuple[str, float]], path: Path) -> None:
+    """Deterministic bytes (no gzip timestamp), so unchanged rows hash the same; replaced atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz, \
+            io.TextIOWrapper(gz, encoding="utf-8") as fh:
         for w, s in rows:
             fh.write(json.dumps({"word": w, "score": float(s)}) + "\n")
+    os.replace(tmp, path)
+
+def read_list(path: Optional[str], scored: bool = False) -> Dict[str, Optional[float]]:
+    """WORD -> optional score from a list file (folded like the source words)."""
+    entries: Dict[str, Optional[float]] = {}
+    if not path:
+        return entries
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            parts = line.split("#", 1)[0].replace(",", " ").split()
+            if parts:
+                entries[fold(parts[0])] = float(parts[1]) if scored and len(parts) > 1 else None
+    return entries
+
+def compile_lexicon(rows: List[Tuple[str, float]], path: Path, fuzzy: bool = True) -> int:
+    """Write the flat-array layout documented in vanity.py; returns the word count."""
+    data = vanity._compile_lexicon(rows, fuzzy=fuzzy)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)  # never truncate a file a running process may have mapped
+    return vanity.LEX_HEADER.unpack_from(data)[4]
+
+def compile_ngram(rows: List[Tuple[str, float]], path: Path) -> None:
+    """Letter trigram table over the same words, layout documented in vanity.py."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(vanity._compile_ngram(w for w, _ in rows if WORD_RE.match(w)))
+    os.replace(tmp, path)
+
+# ---------- incremental builds ----------
+def sha256_file(path: Optional[Path]) -> Optional[str]:
+    if path is None or not Path(path).exists():
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def fingerprint(**inputs) -> str:
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+class Manifest:
+    """Per-language record of each stage's input fingerprint and output hashes."""
+
+    def __init__(self, lang: str, force: bool = False):
+        self.path = BUILD_DIR / f"{lang}.manifest.json"
+        self.force = force
+        self.stages = json.loads(self.path.read_text())["stages"] if self.path.exists() else {}
+
+    def fresh(self, stage: str, fp: str, outputs: List[Path]) -> bool:
+        rec = self.stages.get(stage)
+        return (not self.force and rec is not None and rec["fingerprint"] == fp
+                and all(sha256_file(p) == rec["outputs"].get(p.name) for p in outputs))
+
+    def record(self, stage: str, fp: str, outputs: List[Path], **stats) -> None:
+        self.stages[stage] = {"fingerprint": fp, "outputs": {p.name: sha256_file(p) for p in outputs},
+                              "built_at": datetime.now(timezone.utc).isoformat(), **stats}
+        BUILD_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"stages": self.stages}, indent=2) + "\n")
+        os.replace(tmp, self.path)
+
+def _wordfreq_version() -> str:
+    from importlib.metadata import version
+    return version("wordfreq")
+
+# ---------- driver ----------
+def build(lang: str, args) -> None:
+    t_start = time.perf_counter()
+    manifest = Manifest(lang, args.force)
+    jsonl = vanity._locale_path(vanity.JSONL_FILE, lang)
+    lex_out = vanity._locale_path(vanity.LEX_FILE, lang)
+    ngram_out = vanity._locale_path(vanity.NGRAM_FILE, lang)
+    sfx_out = vanity._locale_path(vanity.SFX_FILE, lang)
+    idx_out = vanity._locale_path(vanity.IDX_FILE, lang)
+    corpus = Path(args.corpus) if args.corpus else None
+
+    def log(stage: str, text: str) -> None:
+        print(f"[{lang}] {stage:<7} {text}")
+
+    # source -> filter -> score, cached as the pre-curation word list
+    if args.from_jsonl:
+        scored_path = jsonl
+        log("score", f"from {jsonl.name}")
+    else:
+        scored_path = BUILD_DIR / f"{lang}.scored.jsonl.gz"
+        fp = fingerprint(lang=lang, top=args.top, corpus=sha256_file(corpus),
+                         wordfreq=None if corpus else _wordfreq_version())
+        if manifest.fresh("score", fp, [scored_path]):
+            log("score", "unchanged, skipped")
+        else:
+            t0 = time.perf_counter()
+            total = None
+            if corpus is not None:
+                total = sum(count for _, count in source(lang, args.top, corpus))
+            rows = score(filter_tokens(source(lang, args.top, corpus)), lang, total,
+                         args.workers, args.shard_size)
+            best: Dict[str, float] = {}
+            for word, s in rows:
+                if s > best.get(word, -math.inf):
+                    best[word] = s
+            write_jsonl(sorted(best.items()), scored_path)
+            manifest.record("score", fp, [scored_path], words=len(best))
+            log("score", f"{len(best)} words, {args.workers} workers, {time.perf_counter() - t0:.1f} s")
+
+    # curate -> t9key -> JSONL (with --from-jsonl the rows stay in memory)
+    allow = read_list(args.allow, scored=True)
+    for word in sorted(set(allow) - {w for w, _ in t9key((w, 0.0) for w in allow)}):
+        log("curate", f"warning: allow-list entry {word!r} is not 4–7 keypad letters, ignored")
+        del allow[word]
+    deny = set(read_list(args.deny))
+    profanity = sorted(read_list(args.profanity))
+    curate_fp = fingerprint(scored=sha256_file(scored_path), allow=sorted(allow.items(), key=str),
+                            deny=sorted(deny), profanity=profanity, cap=args.cap, allow_score=args.allow_score)
+    curated_out = [] if args.from_jsonl else [jsonl]
+    compile_fp = fingerprint(curated=curate_fp, fuzzy=not args.no_fuzzy,
+                             lex=vanity.LEX_VERSION, ngram=vanity.NGRAM_VERSION)
+    rows: Optional[List[Tuple[str, float]]] = None
+    if manifest.fresh("curate", curate_fp, curated_out):
+        log("curate", "unchanged, skipped")
+    else:
+        rows, counts = curate(read_jsonl(scored_path), allow, deny, profanity, args.cap, args.allow_score)
+        rows = list(t9key(rows))
+        if curated_out:
+            write_jsonl(rows, jsonl)
+        manifest.record("curate", curate_fp, curated_out, words=len(rows), **counts)
+        log("curate", f"{len(rows)} words ({counts['denied']} denied, {counts['profanity']} profanity, "
+                      f"{counts['allowed']} allowed)" + (f" → {jsonl.name}" if curated_out else ""))
+
+    # emit the runtime formats
+    if manifest.fresh("compile", compile_fp, [lex_out, ngram_out]):
+        log("compile", "unchanged, skipped")
+    else:
+        if rows is None:
+            rows, _ = curate(read_jsonl(scored_path), allow, deny, profanity, args.cap, args.allow_score)
+            rows = list(t9key(rows))
+        n = compile_lexicon(rows, lex_out, fuzzy=not args.no_fuzzy)
+        compile_ngram(rows, ngram_out)
+        manifest.record("compile", compile_fp, [lex_out, ngram_out], words=n)
+        log("compile", f"{n} words → {lex_out.name}, {ngram_out.name}")
+
+    build_index(manifest, lex_out, idx_out, log)
+    if args.no_suffix_table:
+        pass
+    elif lang in args.suffix_table_langs or "all" in args.suffix_table_langs:
+        build_suffix(lang, manifest, lex_out, sfx_out, log)
+    elif sfx_out.exists():
+        sfx_out.unlink()  # a stale table would still ship in the zip
+        log("suffix", f"not in --suffix-table-langs, removed {sfx_out.name}")
+    log("done", f"{time.perf_counter() - t_start:.1f} s")
+
+def build_index(manifest: Manifest, lex_out: Path, idx_out: Path, log) -> None:
+    idx_fp = fingerprint(lex=sha256_file(lex_out), idx=vanity.IDX_VERSION)
+    if manifest.fresh("index", idx_fp, [idx_out]):
+        log("index", "unchanged, skipped")
+        return
+    data = vanity._compile_indexes(vanity._MappedLexicon(lex_out))
+    tmp = idx_out.with_suffix(idx_out.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, idx_out)
+    manifest.record("index", idx_fp, [idx_out])
+    log("index", f"{vanity.IDX_HEADER.unpack_from(data)[3]} nodes → {idx_out.name}")
+
+def build_suffix(lang: str, manifest: Manifest, lex_out: Path, sfx_out: Path, log) -> None:
+    sfx_fp = fingerprint(lex=sha256_file(lex_out), sfx=vanity.SFX_VERSION)
+    if manifest.fresh("suffix", sfx_fp, [sfx_out]):
+        log("suffix", "unchanged, skipped")
+    else:
+        import build_suffix_table
+        build_suffix_table.build(lang)
+        manifest.record("suffix", sfx_fp, [sfx_out])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--from-jsonl", action="store_true",
+                    help=f"skip wordfreq and compile the {vanity.JSONL_FILE} files as-is")
+    ap.add_argument("--lang", nargs="+",
+                    help="wordfreq languages (default: en; with --from-jsonl, every JSONL present)")
+    ap.add_argument("--corpus", help='"word count" lines to score instead of wordfreq (single --lang)')
+    ap.add_argument("--top", type=int, default=200000, help="wordfreq tokens to pull")
+    ap.add_argument("--cap", type=int, default=100000, help="words kept per language (allow list extra)")
+    ap.add_argument("--allow", help="curated words to force in (optional score per line)")
+    ap.add_argument("--allow-score", type=float, default=3.0, help="score for allowed words the source lacks")
+    ap.add_argument("--deny", help="words to drop")
+    ap.add_argument("--profanity", help="stems: drop every word containing one")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--shard-size", type=int, default=5000, help="tokens per scoring task")
+    ap.add_argument("--no-fuzzy", action="store_true",
+                    help="omit the 0→O / 1→I,L spellings (exact T9 keys only)")
+    ap.add_argument("--no-suffix-table", action="store_true", help="skip the .sfx stage")
+    ap.add_argument("--suffix-table-langs", nargs="+", default=["en"], metavar="LANG",
+                    help="languages that get a .sfx (40 MB each, ~21 MB zipped); 'all' for every one "
+                         "(default: en; the others walk their lexicon per lookup)")
+    ap.add_argument("--force", action="store_true", help="rebuild every stage")
+    args = ap.parse_args(argv)
 
-    print(f"Wrote {len(rows)} words → {OUT}")
+    langs = args.lang or ([loc for loc in vanity.available_locales()
+                           if vanity._locale_path(vanity.JSONL_FILE, loc).exists()]
+                          if args.from_jsonl else ["en"])
+    if args.corpus and len(langs) != 1:
+        ap.error("--corpus builds one --lang at a time")
+    for lang in langs:
+        build(lang, args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
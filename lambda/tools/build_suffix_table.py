@@ -0,0 +1,102 @@
+# tools/build_suffix_table.py
+"""
+Build vanity/words_4_7.sfx: the dense 7-digit suffix answer table.
+
+Every possible 7-digit suffix (10**7 slots) gets the ranked entry range that
+vanity_candidates() would return for it, with the 7→6→5→4 length fallback
+already resolved. Slots are (first_entry << 8) | n_entries into the compiled
+lexicon, whose entries are best-first per key, so the top 3 are simply the
+first three entries of the range. Layout is documented in vanity.py.
+
+tools/build_lexicon.py runs this as its last stage whenever the .lex
+changes (the table is tied to that exact .lex). Standalone, it builds one
+table per compiled locale (words_4_7.es.sfx for es, ...) unless --locale:
+
+    python tools/build_suffix_table.py
+    python tools/verify_suffix_table.py
+"""
+import argparse
+import os
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+
+
+def build_slots(lex) -> array:
+    max_count = (1 << vanity.SFX_COUNT_BITS) - 1
+
+    # Ranked entry range per (length, digits) key
+    ranges = {n: {} for n in range(4, 8)}
+    keys = lex.keys
+    i = 0
+    while i < lex.n_entries:
+        j = bisect_right(keys, keys[i], i)
+        n, digits = divmod(keys[i], vanity.KEY_BASE)
+        if n in ranges:
+            if j - i > max_count:
+                raise SystemExit(f"key {keys[i]} has {j - i} words; widen SFX_COUNT_BITS")
+            ranges[n][digits] = (i << vanity.SFX_COUNT_BITS) | (j - i)
+        i = j
+
+    # Grow 4 → 7 digits. Repeating the (n-1)-digit table 10 times maps every
+    # n-digit suffix s to slot s % 10**(n-1), i.e. the shorter-word fallback;
+    # n-letter hits then overwrite their own slots, except that a fuzzy key
+    # never overwrites a shorter exact one (vanity._lookup_lengths).
+    def is_fuzzy(slot: int) -> bool:
+        n, digits = divmod(keys[slot >> vanity.SFX_COUNT_BITS], vanity.KEY_BASE)
+        return vanity._is_fuzzy_key(f"{digits:0{n}d}")
+
+    slots = array("I", [0]) * 10 ** 4
+    for digits, slot in ranges[4].items():
+        slots[digits] = slot
+    for n in (5, 6, 7):
+        slots = slots * 10
+        for digits, slot in ranges[n].items():
+            inherited = slots[digits]
+            if inherited and is_fuzzy(slot) and not is_fuzzy(inherited):
+                continue
+            slots[digits] = slot
+    assert len(slots) == vanity.SFX_SLOTS
+    return slots
+
+
+def build(locale: str) -> None:
+    # the .lex as compiled, never a VANITY_SCORE_WEIGHTS re-ranking of it
+    lex = vanity._open_lexicon(locale)
+    if lex is None:
+        raise SystemExit(f"{vanity._locale_path(vanity.LEX_FILE, locale).name} not found; "
+                         "run tools/build_lexicon.py first")
+
+    out = vanity._locale_path(vanity.SFX_FILE, locale)
+    slots = build_slots(lex)
+    if sys.byteorder != "little":
+        slots.byteswap()
+    header = vanity.SFX_HEADER.pack(vanity.SFX_MAGIC, vanity.SFX_VERSION, lex.crc, len(slots))
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(header)
+        slots.tofile(fh)
+    os.replace(tmp, out)
+
+    filled = sum(1 for s in slots if s)
+    print(f"Wrote {len(slots)} slots ({filled / len(slots):.1%} with a word) → {out}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--locale", nargs="+", help="locales to build (default: every compiled one)")
+    args = ap.parse_args(argv)
+    locales = args.locale or [loc for loc in vanity.available_locales()
+                              if vanity._locale_path(vanity.LEX_FILE, loc).exists()]
+    for locale in locales:
+        build(locale)
+
+
+if __name__ == "__main__":
+    main()
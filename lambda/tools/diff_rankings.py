@@ -0,0 +1,92 @@
+# tools/diff_rankings.py
+"""
+Diff the top-3 vanity options between two scoring weight sets.
+
+Both weight sets re-rank the same compiled lexicon (see "Scoring" in
+vanity.py: features length, zipf, vowels, vowel_ratio, repeat, bigram), then
+a sample of random numbers is looked up under each. Reports how often the
+first option and the top-3 set change, which words gain or lose first place
+most often, and example numbers. Weights are JSON objects or JSON files;
+omitted features keep their default. Requires numpy.
+
+    python tools/diff_rankings.py --b '{"zipf": 2.0}'
+    python tools/diff_rankings.py --a weights_prod.json --b '{"bigram": 0.5}' --numbers 50000
+    python tools/diff_rankings.py --b '{"repeat": -1}' --locale es --examples 20
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+
+
+def top3(lex, e164):
+    digits = vanity._digits_only(e164)
+    return [c.raw_letters for c in vanity._lexicon_candidates(lex, e164, digits, 7, k=3, fallback=False)]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--a", default="", help="baseline weights (default: DEFAULT_WEIGHTS)")
+    ap.add_argument("--b", required=True, help="candidate weights")
+    ap.add_argument("--numbers", type=int, default=20000)
+    ap.add_argument("--locale", default=vanity.DEFAULT_LOCALE)
+    ap.add_argument("--examples", type=int, default=10, help="changed numbers to print")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    weights = {"a": vanity.parse_weights(args.a), "b": vanity.parse_weights(args.b)}
+    base = vanity._engine(args.locale).lex
+    lex = {}
+    for name, w in weights.items():
+        t0 = time.perf_counter()
+        lex[name] = vanity._rerank(base, w)
+        changed = {f: v for f, v in w.items() if v != vanity.DEFAULT_WEIGHTS[f]}
+        print(f"{name}: {changed or 'defaults'} (re-ranked in {(time.perf_counter() - t0) * 1e3:.0f} ms)")
+
+    rng = random.Random(args.seed)
+    numbers = [f"+1{rng.randrange(2, 10)}{rng.randrange(10 ** 9):09d}" for _ in range(args.numbers)]
+    matched = first_changed = set_changed = order_changed = 0
+    gained, lost = Counter(), Counter()
+    examples = []
+    for e164 in numbers:
+        a, b = top3(lex["a"], e164), top3(lex["b"], e164)
+        if not a:
+            continue  # same keys in both: no word under either
+        matched += 1
+        if a == b:
+            continue
+        if a[0] != b[0]:
+            first_changed += 1
+            gained[b[0]] += 1
+            lost[a[0]] += 1
+        if set(a) != set(b):
+            set_changed += 1
+        else:
+            order_changed += 1
+        if len(examples) < args.examples:
+            examples.append((e164, a, b))
+
+    print(f"\n{args.numbers} numbers, {matched} with a word ({matched / args.numbers:.1%})")
+    if not matched:
+        return
+    print(f"first option changed   {first_changed:>7} ({first_changed / matched:.1%})")
+    print(f"top-3 set changed      {set_changed:>7} ({set_changed / matched:.1%})")
+    print(f"top-3 order only       {order_changed:>7} ({order_changed / matched:.1%})")
+    if gained:
+        print("\nmost often promoted to first:  " + ", ".join(f"{w} {n}" for w, n in gained.most_common(8)))
+        print("most often demoted from first: " + ", ".join(f"{w} {n}" for w, n in lost.most_common(8)))
+    if examples:
+        print(f"\n{'number':<14} {'a':<28} b")
+        for e164, a, b in examples:
+            print(f"{e164:<14} {' '.join(a):<28} {' '.join(b)}")
+
+
+if __name__ == "__main__":
+    main()
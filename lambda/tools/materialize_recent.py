@@ -0,0 +1,49 @@
+# tools/materialize_recent.py
+"""
+Bring the materialized "last N calls" view (api/recent_view.py) up to date
+from the RECENT partitions, without DynamoDB Streams.
+
+Once: the backfill after turning the view on (the stream starts at LATEST,
+so calls already in the table reach the view only this way). With --follow,
+the local stand-in for the stream consumer: polls every SECONDS and applies
+calls newer than the view, the same conditional update the Lambda makes, so
+it can run next to a deployed consumer too. Uses DDB_TABLE and
+RECENT_SHARDS / RECENT_VIEW_SIZE like the Lambdas.
+
+    DDB_TABLE=vanity-numbers-VanityCalls python tools/materialize_recent.py
+    python tools/materialize_recent.py --follow 1
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1] / "api"
+sys.path.insert(0, str(API_DIR))
+
+import api_handler  # noqa: E402
+import recent_view  # noqa: E402
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--follow", type=float, metavar="SECONDS", help="keep polling at this interval")
+    args = ap.parse_args(argv)
+
+    table = api_handler._get_table()
+    partitions = api_handler._recent_partitions()
+    version = None
+    while True:
+        current = recent_view.catch_up(table, partitions)
+        if current != version:
+            _, entries = recent_view.read(table)
+            newest = entries[0]["created_at"] if entries else "-"
+            print(f"{table.name}: view version {current}, {len(entries)} calls, newest {newest}")
+            version = current
+        if not args.follow:
+            return
+        time.sleep(args.follow)
+
+
+if __name__ == "__main__":
+    main()
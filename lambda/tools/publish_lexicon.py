@@ -0,0 +1,58 @@
+# tools/publish_lexicon.py
+"""
+Publish the compiled lexicon files as a versioned release that warm vanity
+Lambdas pick up without a redeploy (VANITY_LEXICON_SOURCE).
+
+The .lex / .sfx / .ngram / .idx files of every compiled locale (or --locale) are
+uploaded under <dest>/<version>/, then <dest>/manifest.json is replaced to
+name them, with each file's sha256. The version is derived from the content,
+so republishing unchanged files yields the same version and no reload.
+<dest> is a directory (tests, local runs) or s3://bucket/prefix.
+
+    python tools/build_lexicon.py --from-jsonl
+    python tools/publish_lexicon.py /tmp/lexicon-bucket
+    python tools/publish_lexicon.py s3://my-artifacts/vanity/lexicon --locale en es
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import artifacts  # noqa: E402
+import vanity  # noqa: E402
+
+
+def release_files(locales):
+    files = []
+    for locale in locales:
+        lex = vanity._locale_path(vanity.LEX_FILE, locale)
+        if not lex.exists():
+            raise SystemExit(f"{lex.name} not found; run tools/build_lexicon.py first")
+        files.append(lex)
+        files += [p for p in (vanity._locale_path(vanity.SFX_FILE, locale),
+                              vanity._locale_path(vanity.NGRAM_FILE, locale),
+                              vanity._locale_path(vanity.IDX_FILE, locale)) if p.exists()]
+    return files
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("dest", help="directory or s3://bucket/prefix")
+    ap.add_argument("--locale", nargs="+", help="locales to include (default: every compiled one)")
+    args = ap.parse_args(argv)
+
+    locales = args.locale or [loc for loc in vanity.available_locales()
+                              if vanity._locale_path(vanity.LEX_FILE, loc).exists()]
+    store = artifacts.open_store(args.dest)
+    manifest = artifacts.publish(release_files(locales), store)
+    for name, meta in manifest["files"].items():
+        print(f"{name:<24} {meta['bytes']:>12,} bytes  sha256 {meta['sha256'][:16]}")
+    print(f"Published {manifest['version']} → {store}/{artifacts.MANIFEST}")
+    print(json.dumps({"version": manifest["version"], "sha256": manifest["sha256"]}))
+
+
+if __name__ == "__main__":
+    main()
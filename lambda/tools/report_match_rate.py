@@ -0,0 +1,94 @@
+# tools/report_match_rate.py
+"""
+Word-match rate with and without fuzzy 0/1 spellings (0→O, 1→I/L).
+
+Both lexicons are compiled in memory from the loaded word list, one with
+fuzzy keys and one without, and every number goes through the same suffix
+lookup (7→4 letters). A number "matches" when its best option is a word, not
+fallback letters. Numbers come from a file (newline list or CSV, as in
+score_numbers.py) or are generated in NANP format: NXX-NXX-XXXX.
+
+    python tools/report_match_rate.py --numbers 100000
+    python tools/report_match_rate.py dids.csv --column phone
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+from score_numbers import read_numbers  # noqa: E402
+
+
+def nanp_numbers(n: int, seed: int):
+    rng = random.Random(seed)
+    for _ in range(n):
+        area = f"{rng.randrange(2, 10)}{rng.randrange(100):02d}"
+        while area[1:] == "11":  # N11 codes are service numbers
+            area = f"{rng.randrange(2, 10)}{rng.randrange(100):02d}"
+        yield f"+1{area}{rng.randrange(2, 10)}{rng.randrange(100):02d}{rng.randrange(10000):04d}"
+
+
+def best(lex, e164: str):
+    digits = vanity._digits_only(e164)
+    top = vanity._lexicon_candidates(lex, e164, digits, 7, 1)
+    return top[0] if top and top[0].score > 0.05 else None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", nargs="?", help="file of numbers (default: generated NANP numbers)")
+    ap.add_argument("--column", help="CSV column name or 0-based index")
+    ap.add_argument("--numbers", type=int, default=100000, help="how many to generate")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--examples", type=int, default=10, help="fuzzy-only matches to print")
+    args = ap.parse_args(argv)
+
+    src = vanity._engine().lex
+    rows = [(src.word(i), src.freqs[i]) for i in range(src.n_words)]
+    exact = vanity._MappedLexicon(vanity._compile_lexicon(rows, fuzzy=False))
+    fuzzy = vanity._MappedLexicon(vanity._compile_lexicon(rows, fuzzy=True))
+    print(f"{len(rows):,} words: {exact.n_entries:,} exact entries, "
+          f"{fuzzy.n_entries - exact.n_entries:,} fuzzy (penalty {vanity.FUZZY_PENALTY} per substitution, "
+          f"up to {vanity.FUZZY_MAX_SUBS})")
+
+    if args.input:
+        with open(args.input, newline="", encoding="utf-8") as fh:
+            numbers = [n for n in read_numbers(fh, args.column) if vanity._digits_only(n)]
+    else:
+        numbers = list(nanp_numbers(args.numbers, args.seed))
+
+    total = {"all": 0, "with 0/1": 0}
+    hits = {(group, mode): 0 for group in total for mode in ("exact", "fuzzy")}
+    examples = []
+    for e164 in numbers:
+        groups = ["all"]
+        tail = vanity._digits_only(e164)[-7:]
+        if "0" in tail or "1" in tail:
+            groups.append("with 0/1")
+        a, b = best(exact, e164), best(fuzzy, e164)
+        for g in groups:
+            total[g] += 1
+            hits[(g, "exact")] += a is not None
+            hits[(g, "fuzzy")] += b is not None
+        if a is None and b is not None and len(examples) < args.examples:
+            examples.append((e164, b.raw_letters, b.score))
+
+    print(f"\n{'numbers':<16} {'count':>9} {'exact':>8} {'fuzzy':>8} {'change':>8}")
+    for g, n in total.items():
+        if not n:
+            continue
+        ex, fz = hits[(g, "exact")] / n, hits[(g, "fuzzy")] / n
+        label = "last 7 has 0/1" if g == "with 0/1" else g
+        print(f"{label:<16} {n:>9,} {ex:>8.1%} {fz:>8.1%} {fz - ex:>+8.1%}")
+    if examples:
+        print("\nnew matches:")
+        for e164, letters, score in examples:
+            print(f"  {e164}  {letters:<8} {score:.2f}")
+
+
+if __name__ == "__main__":
+    main()
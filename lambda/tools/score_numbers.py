@@ -0,0 +1,175 @@
+# tools/score_numbers.py
+"""
+Score a phone-number portfolio offline, across all cores.
+
+Reads a newline list or CSV of numbers from a file or stdin, fans chunks out
+to a process pool (each worker loads the lexicon once), and writes one JSON
+line per input number, in input order:
+
+    {"line": 0, "number": "+13035553679", "matched": true,
+     "options": [{"letters": "DORY", "score": 7.3}, ...]}
+
+Memory stays bounded: only --chunk-size * (2 * --workers) numbers are in
+flight. "line" is the 0-based record offset, so an interrupted run resumes
+with --skip <last line + 1>. -o starts the file afresh, except that --skip
+(or --append) adds to it, so a resume continues where the last run stopped.
+
+    python tools/score_numbers.py numbers.txt -o scores.jsonl
+    python tools/score_numbers.py dids.csv --column phone --workers 8 --skip 250000 -o scores.jsonl
+
+Uses vanity_candidates_batch() when numpy is installed, else the scalar path.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, TextIO
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+
+try:
+    import numpy  # noqa: F401
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+
+# ---------- input ----------
+def read_numbers(fh: TextIO, column: Optional[str]) -> Iterator[str]:
+    """Yield one raw number per record; CSV when --column is given or a comma shows up."""
+    first = fh.readline()
+    if not first:
+        return
+    lines = itertools.chain([first], fh)
+    if column is None and "," not in first:
+        for line in lines:
+            yield line.strip()
+        return
+
+    rows = csv.reader(lines)
+    header = next(rows)
+    if column is None:
+        idx = 0
+        if any(ch.isdigit() for ch in header[0]):
+            yield header[0].strip()  # no header row: first column, first line is data
+    elif column.isdigit():
+        idx = int(column)
+    else:
+        try:
+            idx = header.index(column)
+        except ValueError:
+            raise SystemExit(f"column {column!r} not in CSV header {header}")
+    for row in rows:
+        yield row[idx].strip() if idx < len(row) else ""
+
+
+def chunked(it: Iterator[str], size: int) -> Iterator[List[str]]:
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---------- worker ----------
+def _init_worker() -> None:
+    # Build the per-process lookup structures once, not per chunk
+    if HAVE_NUMPY:
+        vanity._batch_index()
+
+
+def score_chunk(start: int, numbers: List[str], k: int) -> str:
+    """JSONL for one chunk; `start` is the record offset of numbers[0]."""
+    if HAVE_NUMPY:
+        batch = vanity.vanity_candidates_batch(numbers, k)
+        rows = zip(batch.rows(), batch.matched.tolist())
+    else:
+        rows = ((c, bool(c) and c[0].score > 0.05) for c in (vanity.vanity_candidates(n, k=k) for n in numbers))
+    out = []
+    for i, (number, (cands, matched)) in enumerate(zip(numbers, rows)):
+        out.append(json.dumps({
+            "line": start + i,
+            "number": number,
+            "matched": matched,
+            "options": [{"letters": c.raw_letters, "score": round(c.score, 4)} for c in cands],
+        }))
+    return "\n".join(out) + "\n" if out else ""
+
+
+# ---------- driver ----------
+class Progress:
+    def __init__(self, every: float, start: int):
+        self.every, self.start = every, start
+        self.done = 0
+        self.t0 = self.last = time.perf_counter()
+
+    def update(self, n: int, final: bool = False) -> None:
+        self.done += n
+        now = time.perf_counter()
+        if final or now - self.last >= self.every:
+            self.last = now
+            rate = self.done / max(now - self.t0, 1e-9)
+            print(f"[score] {self.done:,} numbers (through line {self.start + self.done - 1:,}) "
+                  f"{rate:,.0f}/s{' done' if final else ''}", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", nargs="?", default="-", help="file of numbers (default: stdin)")
+    ap.add_argument("-o", "--output", default="-", help="JSONL output (default: stdout)")
+    ap.add_argument("--append", action="store_true", help="add to --output instead of replacing it")
+    ap.add_argument("--column", help="CSV column name or 0-based index (default: first)")
+    ap.add_argument("-k", type=int, default=3, help="options per number")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk-size", type=int, default=20000)
+    ap.add_argument("--skip", type=int, default=0, help="resume: skip this many input records")
+    ap.add_argument("--progress-every", type=float, default=5.0, help="seconds between progress lines")
+    args = ap.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    mode = "a" if args.append or args.skip > 0 else "w"
+    dst = sys.stdout if args.output == "-" else open(args.output, mode, encoding="utf-8")
+    numbers = itertools.islice(read_numbers(src, args.column), args.skip, None)
+    chunks = enumerate(chunked(numbers, args.chunk_size))
+    progress = Progress(args.progress_every, args.skip)
+
+    def emit(text: str, n: int) -> None:
+        dst.write(text)
+        progress.update(n)
+
+    try:
+        if args.workers <= 1:
+            _init_worker()
+            for i, chunk in chunks:
+                emit(score_chunk(args.skip + i * args.chunk_size, chunk, args.k), len(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+                window = deque()  # (future, size) in submission order
+                for i, chunk in chunks:
+                    window.append((pool.submit(score_chunk, args.skip + i * args.chunk_size, chunk, args.k), len(chunk)))
+                    if len(window) >= 2 * args.workers:
+                        fut, n = window.popleft()
+                        emit(fut.result(), n)
+                while window:
+                    fut, n = window.popleft()
+                    emit(fut.result(), n)
+    finally:
+        dst.flush()
+        progress.update(0, final=True)
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+
+if __name__ == "__main__":
+    main()
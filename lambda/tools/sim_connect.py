@@ -0,0 +1,195 @@
+# tools/sim_connect.py
+"""
+Local Amazon Connect load simulator for the vanity handler.
+
+Fires Connect-shaped contact flow events (Details.ContactData.CustomerEndpoint)
+at app.handler.handler from a thread pool, against an in-process DynamoDB
+stand-in whose put_item sleeps (and optionally fails) like a loaded table.
+Reports throughput and p50/p95/p99 latency against the flow's Lambda limit.
+
+  closed loop (default)  --concurrency callers invoke back to back
+  open loop (--rate R)   Poisson arrivals at R calls/s; latency includes time
+                         spent queued behind busy workers, as in a burst
+
+All threads share one module, i.e. one warm container's result cache and
+writer; each thread stands in for a concurrent invocation. Engine and handler
+options are read at import, so they are set here first:
+
+    python tools/sim_connect.py --calls 5000 --concurrency 32
+    python tools/sim_connect.py --rate 400 --put-ms 25 --put-jitter-ms 40 --persist async
+    python tools/sim_connect.py --callers 200 --cache-size 0          # repeat callers, no cache
+    python tools/sim_connect.py --lexicon jsonl --env VANITY_MATCH=anywhere
+
+Exits 1 when any call errored or exceeded --limit-ms.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import _app  # noqa: F401
+
+
+class LatencyTable:
+    """Thread-safe DynamoDB Table stand-in: put_item costs put_ms + Exp(jitter_ms), may raise."""
+
+    name = "vanity-sim"
+
+    def __init__(self, put_ms: float, jitter_ms: float, error_rate: float, seed: int):
+        self.put_ms = put_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.writes = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def put_item(self, Item, **kwargs):
+        with self._lock:
+            delay = self.put_ms + (self._rng.expovariate(1 / self.jitter_ms) if self.jitter_ms > 0 else 0.0)
+            fail = self._rng.random() < self.error_rate
+        time.sleep(delay / 1000.0)
+        with self._lock:
+            if fail:
+                self.errors += 1
+                raise RuntimeError("ProvisionedThroughputExceededException (simulated)")
+            self.writes += 1
+        return {}
+
+
+def connect_event(caller: str, instance_id: str) -> dict:
+    contact_id = str(uuid.uuid4())
+    return {
+        "Name": "ContactFlowEvent",
+        "Details": {
+            "ContactData": {
+                "Attributes": {},
+                "Channel": "VOICE",
+                "ContactId": contact_id,
+                "InitialContactId": contact_id,
+                "InitiationMethod": "INBOUND",
+                "InstanceARN": f"arn:aws:connect:us-east-1:123456789012:instance/{instance_id}",
+                "CustomerEndpoint": {"Address": caller, "Type": "TELEPHONE_NUMBER"},
+                "SystemEndpoint": {"Address": "+18005550100", "Type": "TELEPHONE_NUMBER"},
+            },
+            "Parameters": {},
+        },
+    }
+
+
+def caller_pool(n: int, rng: random.Random) -> list:
+    return [f"+1{rng.randrange(2, 10)}{rng.randrange(100):02d}{rng.randrange(2, 10)}"
+            f"{rng.randrange(100):02d}{rng.randrange(10000):04d}" for _ in range(n)]
+
+
+def run(h, events, concurrency: int, rate: float, rng: random.Random):
+    """[(latency ms, errored)] per event, in completion order."""
+    ctx = SimpleNamespace(function_name="vanity-sim", aws_request_id="sim")
+
+    def one(event, t0):
+        try:
+            h.handler(event, ctx)
+            errored = False
+        except Exception:
+            errored = True
+        return (time.perf_counter() - t0) * 1e3, errored
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if not rate:
+            futures = [pool.submit(lambda ev=ev: one(ev, time.perf_counter())) for ev in events]
+        else:
+            futures, at, start = [], 0.0, time.perf_counter()
+            for ev in events:
+                at += rng.expovariate(rate)
+                delay = start + at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(one, ev, start + at))  # measured from the arrival
+        return [f.result() for f in futures]
+
+
+def pct(xs, q):
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=16, help="concurrent invocations (threads)")
+    ap.add_argument("--rate", type=float, default=0.0, help="open loop: mean arrivals per second")
+    ap.add_argument("--callers", type=int, default=0, help="distinct callers to draw from (0 = all distinct)")
+    ap.add_argument("--put-ms", type=float, default=10.0, help="put_item base latency")
+    ap.add_argument("--put-jitter-ms", type=float, default=5.0, help="mean of the exponential extra latency")
+    ap.add_argument("--put-error-rate", type=float, default=0.0, help="fraction of put_item calls that raise")
+    ap.add_argument("--persist", choices=["sync", "async"], help="VANITY_PERSIST_MODE")
+    ap.add_argument("--cache-size", type=int, help="VANITY_CACHE_SIZE")
+    ap.add_argument("--lexicon", choices=["auto", "jsonl"], help="VANITY_LEXICON_FORMAT")
+    ap.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra handler setting")
+    ap.add_argument("--limit-ms", type=float, default=5000.0, help="Connect's Lambda timeout for the flow")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    settings = dict(kv.split("=", 1) for kv in args.env)
+    for key, value in (("VANITY_PERSIST_MODE", args.persist), ("VANITY_CACHE_SIZE", args.cache_size),
+                       ("VANITY_LEXICON_FORMAT", args.lexicon)):
+        if value is not None:
+            settings[key] = str(value)
+    os.environ.update(settings)
+    os.environ["DDB_TABLE"] = LatencyTable.name
+    logging.disable(logging.WARNING)
+
+    from app import handler as h
+    from app.vanity import _engine
+
+    rng = random.Random(args.seed)
+    table = LatencyTable(args.put_ms, args.put_jitter_ms, args.put_error_rate, args.seed)
+    h.table = table
+    h.warm()
+    pool = caller_pool(args.callers or args.calls, rng)
+    instance_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    events = [connect_event(pool[i] if not args.callers else rng.choice(pool), instance_id)
+              for i in range(args.calls)]
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # EMF metric lines
+        results = run(h, events, args.concurrency, args.rate, rng)
+        wall = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        if h._WRITER is not None:
+            h._WRITER.drain()
+        drain_ms = (time.perf_counter() - t1) * 1e3
+
+    lat = sorted(ms for ms, _ in results)
+    errors = sum(1 for _, e in results if e)
+    over = sum(1 for ms in lat if ms > args.limit_ms)
+    cache = h._RESULTS
+    looked_up = cache.hits + cache.misses
+
+    mode = f"open loop {args.rate:g}/s" if args.rate else "closed loop"
+    print(f"{args.calls} calls, {mode}, concurrency {args.concurrency}, persist {h.PERSIST_MODE}, "
+          f"lexicon {'compiled' if _engine().mapped else 'jsonl'}, "
+          f"put_item {args.put_ms:g}+Exp({args.put_jitter_ms:g}) ms")
+    print(f"throughput  {len(lat) / wall:,.0f} calls/s ({wall:.2f} s)")
+    print(f"latency ms  p50 {statistics.median(lat):.2f}  p95 {pct(lat, 0.95):.2f}  "
+          f"p99 {pct(lat, 0.99):.2f}  max {lat[-1]:.2f}")
+    print(f"limit       {over} of {len(lat)} over {args.limit_ms:g} ms "
+          f"(p99 at {pct(lat, 0.99) / args.limit_ms:.1%} of the limit)")
+    print(f"cache       {cache.hits / looked_up if looked_up else 0:.1%} hits, {cache.evictions} evictions")
+    print(f"dynamodb    {table.writes} writes, {table.errors} failed"
+          + (f", async drain {drain_ms:.1f} ms" if h._WRITER is not None else ""))
+    if errors:
+        print(f"errors      {errors} handler exceptions")
+    return 1 if errors or over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
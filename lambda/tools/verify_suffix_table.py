@@ -0,0 +1,102 @@
+# tools/verify_suffix_table.py
+"""
+Offline check that vanity/words_4_7.sfx agrees with the dynamic lookup.
+
+For a random sample of 7-digit suffixes, the table answer must equal both
+  - the dynamic walk over the compiled lexicon (exact words and scores), and
+  - the original JSONL path: _INDEX-style buckets scored with _score_word
+    (plus fuzzy 0/1 spellings, less FUZZY_PENALTY per substitution), ranked by
+    score (ties broken alphabetically, as the compiler does), exact keys at
+    any length before fuzzy ones.
+Only lexicon matches are compared (fallback=False): numbers no word covers
+must be empty on every side, so the result never depends on timing.
+
+    python tools/verify_suffix_table.py --samples 200000
+    python tools/verify_suffix_table.py --locale es
+"""
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+VANITY_DIR = Path(__file__).resolve().parents[1] / "vanity"
+sys.path.insert(0, str(VANITY_DIR))
+
+import vanity  # noqa: E402
+
+
+def jsonl_reference(locale=None):
+    """Rebuild the pre-compiled-lexicon lookup from the JSONL source."""
+    words, word_score = vanity._load_words(locale)
+    index = defaultdict(list)
+    for w in words:
+        digits = vanity._t9_key(w)
+        score = vanity._score_word(w, word_score[w])
+        index[(len(w), digits)].append((score, w))
+        if len(digits) == len(w):
+            for key, subs in vanity._fuzzy_keys(w, digits):
+                index[(len(w), key)].append((score - vanity.FUZZY_PENALTY * subs, w))
+    for bucket in index.values():
+        bucket.sort(key=lambda sw: (-sw[0], sw[1]))
+
+    def top3(digits):
+        for n in vanity._lookup_lengths(digits):
+            bucket = index.get((n, digits[-n:]))
+            if bucket:
+                return [(w, s) for s, w in bucket[:3]]
+        return []
+    return top3
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--samples", type=int, default=200000)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--locale", default=vanity.DEFAULT_LOCALE)
+    args = ap.parse_args(argv)
+
+    eng = vanity._engine(args.locale)
+    lex, table = eng.lex if eng.mapped else None, eng.suffix_table
+    if lex is None or table is None:
+        raise SystemExit("compiled lexicon or suffix table missing/stale; run build_lexicon.py and build_suffix_table.py")
+
+    rng = random.Random(args.seed)
+    numbers = [f"+1303{rng.randrange(10 ** 7):07d}" for _ in range(args.samples)]
+    numbers += ["+15553569377", "+13035553679", "+13035550000", "+13035559999"]
+    reference = jsonl_reference(args.locale)
+
+    def pairs(cands):
+        return [(c.raw_letters, c.score) for c in cands]
+
+    t_table = t_dyn = 0.0
+    mismatches = 0
+    for e164 in numbers:
+        digits = vanity._digits_only(e164)
+        t0 = time.perf_counter()
+        got = vanity._table_candidates(lex, table, e164, digits, fallback=False, locale=args.locale)
+        t1 = time.perf_counter()
+        want = vanity._lexicon_candidates(lex, e164, digits, 7, fallback=False, locale=args.locale)
+        t2 = time.perf_counter()
+        t_table += t1 - t0
+        t_dyn += t2 - t1
+
+        ok = pairs(got) == pairs(want)
+        ref = reference(digits)
+        if ref:
+            ok = ok and pairs(got[:3]) == ref
+        if not ok:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"MISMATCH {e164}: table={pairs(got[:3])} dynamic={pairs(want[:3])} jsonl={ref}")
+
+    n = len(numbers)
+    print(f"checked {n} numbers, {mismatches} mismatches")
+    print(f"table   {t_table / n * 1e6:6.2f} µs/lookup")
+    print(f"dynamic {t_dyn / n * 1e6:6.2f} µs/lookup")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
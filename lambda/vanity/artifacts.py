@@ -0,0 +1,161 @@
+# lambda/vanity/artifacts.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+class LocalStore:
+    """A directory standing in for the artifact bucket (tests, local runs, EFS)."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def get(self, key: str) -> bytes:
+        return (self.root / key).read_bytes()
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # readers never see half a manifest
+
+    def __str__(self) -> str:
+        return str(self.root)
+
+
+class S3Store:
+    """s3://bucket/prefix; boto3 is imported on first use."""
+
+    def __init__(self, bucket: str, prefix: str = ""):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self._client = None
+
+    def _s3(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client("s3")
+        return self._client
+
+    def get(self, key: str) -> bytes:
+        return self._s3().get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+
+    def put(self, key: str, data: bytes) -> None:
+        self._s3().put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def __str__(self) -> str:
+        return f"s3://{self.bucket}/{self.prefix}"
+
+
+def open_store(uri: str):
+    if uri.startswith("s3://"):
+        bucket, _, prefix = uri[len("s3://"):].partition("/")
+        return S3Store(bucket, prefix)
+    return LocalStore(uri)
+
+
+def build_manifest(files: Dict[str, bytes]) -> Dict:
+    """{"version", "sha256", "created_at", "files": {name: {"sha256", "bytes"}}}; the version is content-derived."""
+    hashes = {name: hashlib.sha256(data).hexdigest() for name, data in files.items()}
+    digest = hashlib.sha256("".join(f"{n}:{h}\n" for n, h in sorted(hashes.items())).encode()).hexdigest()
+    return {
+        "version": f"rel-{digest[:16]}",
+        "sha256": digest,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "files": {name: {"sha256": hashes[name], "bytes": len(files[name])} for name in sorted(files)},
+    }
+
+
+def publish(paths: Iterable[Path], store) -> Dict:
+    """Upload files under <version>/, then point manifest.json at them (last, so readers never see a partial release)."""
+    files = {Path(p).name: Path(p).read_bytes() for p in paths}
+    manifest = build_manifest(files)
+    for name, data in files.items():
+        store.put(f"{manifest['version']}/{name}", data)
+    store.put(MANIFEST, json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+class LexiconReloader:
+    """
+    Keeps a warm container on the lexicon release named by a store's manifest.
+
+    check() reads manifest.json; when its version differs from the active one
+    it stages the release's files under cache_dir/<version>/ (each verified
+    against its sha256, written via rename) and hands that directory to
+    `apply` (vanity.use_lexicon_dir), which builds the new engines and swaps
+    them in at once. maybe_check() runs check() on a background thread at
+    most every `interval` seconds and never blocks the caller; the first call
+    checks at once. A failed check keeps the current lexicon and is retried
+    at the next interval.
+    """
+
+    def __init__(self, store, apply: Callable[[Path], Dict[str, str]], interval: float = 60.0,
+                 cache_dir: str = "/tmp/lexicon"):
+        self.store = store
+        self.apply = apply
+        self.interval = interval
+        self.cache_dir = Path(cache_dir)
+        self.version: Optional[str] = None
+        self._next = time.monotonic()  # nothing active yet: the first maybe_check() fetches
+        self._lock = threading.Lock()  # one check at a time
+
+    def check(self) -> bool:
+        """Swap in the store's current release; False when it is already active."""
+        manifest = json.loads(self.store.get(MANIFEST))
+        if manifest["version"] == self.version:
+            return False
+        root = self._stage(manifest)
+        versions = self.apply(root)
+        previous, self.version = self.version, manifest["version"]
+        log.info("Lexicon release %s active (was %s): %s", self.version, previous, versions)
+        self._prune(keep={root.name, previous})
+        return True
+
+    def maybe_check(self) -> None:
+        now = time.monotonic()
+        if now < self._next or not self._lock.acquire(blocking=False):
+            return
+        self._next = now + self.interval
+        threading.Thread(target=self._run, name="lexicon-reload", daemon=True).start()
+
+    def _run(self) -> None:
+        try:
+            self.check()
+        except Exception as e:
+            log.warning("Lexicon reload from %s failed: %s", self.store, e)
+        finally:
+            self._lock.release()
+
+    def _stage(self, manifest: Dict) -> Path:
+        root = self.cache_dir / manifest["version"]
+        root.mkdir(parents=True, exist_ok=True)
+        for name, meta in manifest["files"].items():
+            path = root / name
+            if path.exists():  # only ever renamed into place after verifying
+                continue
+            data = self.store.get(f"{manifest['version']}/{name}")
+            if hashlib.sha256(data).hexdigest() != meta["sha256"]:
+                raise ValueError(f"{name}: content hash does not match the manifest")
+            tmp = path.with_name(name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return root
+
+    def _prune(self, keep: set) -> None:
+        # the previous release stays: calls in flight may still read its mapped files
+        for d in self.cache_dir.iterdir():
+            if d.is_dir() and d.name not in keep:
+                shutil.rmtree(d, ignore_errors=True)
@@ -4,12 +4,22 @@ import os
 import re
 import json
 import logging
+import threading
+import time
+import zlib
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from decimal import Decimal
 
-import boto3
-from app.vanity import vanity_candidates
+from app.artifacts import LexiconReloader, open_store
+from app.cache import LRUCache
+from app.observability import NULL_TIMER, StageTimer, metrics, record_cache, record_stages
+from app.persist import AsyncWriter
+from app.profiling import InvocationProfiler
+from app.vanity import (DEFAULT_LOCALE, anywhere_candidates, available_locales, fallback_candidates,
+                        fallback_letters, lexicon_version, phrase_candidates, use_lexicon_dir,
+                        vanity_candidates)
+from app.vanity import warm as warm_vanity
 
 # ---------- logging ----------
 log = logging.getLogger(__name__)
@@ -17,38 +27,63 @@ if not log.handlers:
     logging.basicConfig(level=logging.INFO)
 
 # ---------- aws resources ----------
+# Created on first use (or by warm()), not at import: importing boto3 and
+# building the resource is most of this module's cold start, and warm-up
+# pings or runs without DDB_TABLE never need it.
 DDB_TABLE_NAME = os.environ.get("DDB_TABLE", "")
-_dynamo = boto3.resource("dynamodb") if DDB_TABLE_NAME else None
-table = _dynamo.Table(DDB_TABLE_NAME) if _dynamo else None
-
-# ---------- T9 helpers for deterministic fallbacks ----------
-T9 = {
-    "2": "ABC", "3": "DEF",
-    "4": "GHI", "5": "JKL", "6": "MNO",
-    "7": "PQRS", "8": "TUV", "9": "WXYZ",
-}
-
-
+table = None
+_table_lock = threading.Lock()
+
+
+def _get_table():
+    global table
+    if table is None and DDB_TABLE_NAME:
+        with _table_lock:
+            if table is None:
+                import boto3
+                table = boto3.resource("dynamodb").Table(DDB_TABLE_NAME)
+    return table
+
+# ---------- engine options ----------
+# VANITY_PHRASES=1: prefer multi-word segmentations of the whole number
+# (e.g. 800-GO-FLOWERS) and use single-suffix matches only when none exist.
+PHRASE_MODE = os.environ.get("VANITY_PHRASES", "0") == "1"
+# VANITY_MATCH=anywhere: words may sit anywhere in the national number
+# (303-FLOW-377), not only at its end; "suffix" (default) keeps the tail only.
+ANYWHERE_MODE = os.environ.get("VANITY_MATCH", "suffix").lower() == "anywhere"
+ENV = os.environ.get("ENV", "dev")
+
+# ---------- locale ----------
+# The lexicon locale comes from the event ("locale", or the contact flow's
+# Parameters.locale / ContactData.LanguageCode such as "es-MX"); failing that,
+# from the caller's country calling code via VANITY_COUNTRY_LOCALES
+# ("code:locale,..."; longest code wins). Locales without a built lexicon
+# fall back to VANITY_LOCALE (see vanity.DEFAULT_LOCALE).
+COUNTRY_LOCALES: Dict[str, str] = dict(
+    pair.strip().split(":", 1)
+    for pair in os.environ.get(
+        "VANITY_COUNTRY_LOCALES", "34:es,52:es,54:es,56:es,57:es,51:es,58:es,33:fr,32:fr,41:fr,49:de,43:de"
+    ).split(",")
+    if ":" in pair
+)
+
+# ---------- stage timing ----------
+# VANITY_STAGE_METRICS=0 turns off the per-stage latency EMF (extract, caller,
+# lookup, fallback, format, persist; see observability.record_stages).
+# VANITY_TRACE_STAGES=1 also opens an X-Ray subsegment per stage.
+STAGE_METRICS = os.environ.get("VANITY_STAGE_METRICS", "1") == "1"
+TRACE_STAGES = os.environ.get("VANITY_TRACE_STAGES", "0") == "1"
+_COLD_START = True
+
+# Per-container LRU of scored letters, keyed by suffix + lexicon version.
+# VANITY_CACHE_SIZE=0 disables it.
+_RESULTS = LRUCache(int(os.environ.get("VANITY_CACHE_SIZE", "4096")))
+
+# ---------- digit helpers ----------
 def _digits_only(s: str) -> str:
     return "".join(ch for ch in s if s and ch.isdigit())
 
 
-def _fallback_letters(digits: str, n: int) -> str:
-    """Deterministic T9 letters for last n digits: first letter from each mapping."""
-    last = digits[-n:]
-    out: List[str] = []
-    for d in last:
-        if d in T9:
-            out.append(T9[d][0])  # deterministic first choice
-        elif d == "0":
-            out.append("O")
-        elif d == "1":
-            out.append("I")
-        else:
-            out.append(d)
-    return "".join(out)
-
-
 # ---------- e164 normalization (referenced by tests) ----------
 _E164 = re.compile(r"^\+?\d+$")
 
@@ -79,12 +114,24 @@ def normalize_e164(s: str) -> str:
 
 
 # ---------- display & ssml formatting ----------
-def _format_display(e164: str, letters: str) -> str:
-    """Format like 303-555-FLOWERS (or with 4–7 letter tails)."""
+def _format_display(e164: str, letters: str, offset: Optional[int] = None) -> str:
+    """
+    Format like 303-555-FLOWERS (or with 4–7 letter tails).
+
+    With `offset` (where the word starts in the national number, from
+    match-anywhere) the letters replace exactly those digits, e.g. 303-FLOW-377.
+    """
     if not letters:
         return ""
     d = _digits_only(e164)
 
+    if offset is not None:
+        national = d[-10:]
+        head, tail = national[:offset], national[offset + len(letters):]
+        bounds = (0, 3, 6, 10) if len(national) == 10 else (0, 3, len(national))
+        groups = [head[a:b] for a, b in zip(bounds, bounds[1:]) if head[a:b]]
+        return "-".join(groups + [letters] + ([tail] if tail else []))
+
     if len(d) >= 10:
         area, mid = d[-10:-7], d[-7:-4]
         return f"{area}-{mid}-{letters}"
@@ -140,31 +187,153 @@ def _extract_phone(event: Dict[str, Any]) -> str:
     return "+1"
 
 
+def _extract_locale(event: Dict[str, Any], e164: str) -> str:
+    details = event.get("Details") or {}
+    requested = (
+        event.get("locale")
+        or (details.get("Parameters") or {}).get("locale")
+        or (details.get("ContactData") or {}).get("LanguageCode")
+    )
+    if not requested:
+        national = _digits_only(e164)
+        for n in range(min(4, len(national)), 0, -1):
+            requested = COUNTRY_LOCALES.get(national[:n])
+            if requested:
+                break
+    locale = str(requested or DEFAULT_LOCALE).lower().replace("_", "-").split("-")[0]
+    return locale if locale in available_locales() else DEFAULT_LOCALE
+
+
 # ---------- ddb write ----------
-def _write_recent(e164: str, displays: List[str], scored_raw: List[tuple[str, float]]) -> None:
+# VANITY_PERSIST_MODE=async returns to Connect first and writes on a
+# background thread that is drained before the container freezes
+# (see persist.AsyncWriter); the default "sync" writes before returning.
+# VANITY_PERSIST_WORKERS writer threads share a queue of VANITY_PERSIST_QUEUE
+# records; past that, writes happen inline in handler().
+PERSIST_MODE = os.environ.get("VANITY_PERSIST_MODE", "sync").lower()
+PERSIST_WORKERS = max(1, int(os.environ.get("VANITY_PERSIST_WORKERS", "4")))
+PERSIST_QUEUE = max(1, int(os.environ.get("VANITY_PERSIST_QUEUE", "64")))
+
+
+# ---------- per-caller records ----------
+# VANITY_CALLER_RECORDS=1 keeps one item per caller and lexicon version
+# (pk "CALLER#<e164>", sk "<lexicon version>#<mode>") with the options last
+# given. Every call reads it first (eventually consistent GetItem): when it
+# exists, its options are returned without scoring. A repeat call within
+# VANITY_COLLAPSE_SECONDS of the last recorded one writes nothing; otherwise a
+# conditional UpdateItem refreshes the record and only the invocation that
+# wins it writes the recent-calls item, so a burst from one caller is one
+# TS# item. Records expire VANITY_CALLER_TTL_DAYS after the last write
+# (table TTL on expires_at). A first-time caller costs one extra write.
+CALLER_RECORDS = os.environ.get("VANITY_CALLER_RECORDS", "0") == "1"
+COLLAPSE_SECONDS = float(os.environ.get("VANITY_COLLAPSE_SECONDS", "60"))
+CALLER_TTL_DAYS = float(os.environ.get("VANITY_CALLER_TTL_DAYS", "30"))
+_MODE = "+".join(m for m, on in (("phrases", PHRASE_MODE), ("anywhere", ANYWHERE_MODE)) if on) or "suffix"
+
+
+def _caller_key(e164: str, lexicon: str) -> Dict[str, str]:
+    return {"pk": f"CALLER#{e164}", "sk": f"{lexicon}#{_MODE}"}
+
+
+def _read_caller(e164: str, lexicon: str) -> Optional[Dict[str, Any]]:
+    t = _get_table()
+    if not t:
+        return None
+    try:
+        return t.get_item(Key=_caller_key(e164, lexicon),
+                          ProjectionExpression="vanity_candidates, #raw, last_call_ms",
+                          ExpressionAttributeNames={"#raw": "raw"}).get("Item")
+    except Exception as e:
+        log.warning("Failed to read caller record: %s", e)
+        return None
+
+
+def _scored_from_record(record: Dict[str, Any]) -> Tuple[Tuple[str, float, str], ...]:
+    """A caller record's options in _score_letters' shape (empty slots stay empty)."""
+    by_display = {r["display"]: r for r in record.get("raw", [])}
+    return tuple(
+        (by_display[disp]["letters"], float(by_display[disp]["score"]), disp) if disp in by_display else ("", 0.0, "")
+        for disp in record.get("vanity_candidates", [])
+    )
+
+
+def _collapsed(record: Optional[Dict[str, Any]]) -> bool:
+    return record is not None and time.time() * 1000 - float(record.get("last_call_ms", 0)) < COLLAPSE_SECONDS * 1000
+
+
+def _claim_caller(item: Dict[str, Any]) -> bool:
+    """Record this call on the caller's record; False if another call did within the window."""
+    from boto3.dynamodb.conditions import Attr
+
+    now_ms = int(datetime.fromisoformat(item["created_at"]).timestamp() * 1000)
+    try:
+        _get_table().update_item(
+            Key=_caller_key(item["caller_number"], item["lexicon"]),
+            UpdateExpression="SET vanity_candidates = :c, #raw = :r, last_call_ms = :t, last_sk = :sk, expires_at = :x",
+            ConditionExpression=Attr("last_call_ms").not_exists()
+            | Attr("last_call_ms").lt(now_ms - int(COLLAPSE_SECONDS * 1000)),
+            ExpressionAttributeNames={"#raw": "raw"},
+            ExpressionAttributeValues={
+                ":c": item["vanity_candidates"], ":r": item["raw"], ":t": now_ms, ":sk": item["sk"],
+                ":x": now_ms // 1000 + int(CALLER_TTL_DAYS * 86400),
+            },
+        )
+        return True
+    except Exception as e:
+        if getattr(e, "response", {}).get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def _put_item(item: Dict[str, Any]) -> None:
+    if CALLER_RECORDS and not _claim_caller(item):
+        log.info("Repeat call from %s already recorded; skipping put_item", item["caller_number"])
+        return
+    _get_table().put_item(Item=item)
+    log.info("Wrote item successfully")
+
+
+_WRITER = AsyncWriter(_put_item, PERSIST_QUEUE, PERSIST_WORKERS) if PERSIST_MODE == "async" else None
+
+# RECENT_SHARDS=N (>1) spreads items over pk RECENT#0..RECENT#N-1 instead of
+# the single hot "RECENT" partition; api_handler scatter-gathers all shards.
+# Must match the API Lambda's setting.
+RECENT_SHARDS = max(1, int(os.environ.get("RECENT_SHARDS", "1")))
+
+
+def _recent_pk(sk: str) -> str:
+    if RECENT_SHARDS == 1:
+        return "RECENT"
+    return f"RECENT#{zlib.crc32(sk.encode()) % RECENT_SHARDS}"  # hash of the µs timestamp
+
+
+def _write_recent(e164: str, displays: List[str], scored_raw: List[tuple[str, float]],
+                  lexicon: Optional[str] = None) -> None:
     """
     Store the latest call in the schema the API and web expect.
     Schema example:
-      pk: "RECENT"
+      pk: "RECENT"  (or "RECENT#<shard>" with RECENT_SHARDS > 1)
       sk: "TS#2025-10-03T21:07:59.123456+00:00"
       caller_number: "+15555551234"
       created_at: ISO-8601 string
       vanity_candidates: ["303-555-FLOWERS","303-555-FLOWE","303-555-FLOW"]
+      lexicon: "lex-1a2b3c4d"  (version of the word list behind the options)
       raw: [
         {"letters":"FLOWERS","display":"303-555-FLOWERS","score":7.2},
         {"letters":"FLOWE",  "display":"303-555-FLOWE",  "score":5.0},
         {"letters":"FLOW",   "display":"303-555-FLOW",   "score":4.0},
       ]
     """
-    if not table:
+    if not _get_table():
         log.info("No DDB table configured; skipping put_item")
         return
 
     try:
         now = datetime.now(timezone.utc).isoformat()
+        sk = f"TS#{now}"
         item = {
-            "pk": "RECENT",
-            "sk": f"TS#{now}",
+            "pk": _recent_pk(sk),
+            "sk": sk,
             "caller_number": e164,
             "created_at": now,
             # FIX: keep exactly 3 slots, even if some are fallback/empty
@@ -175,44 +344,173 @@ def _write_recent(e164: str, displays: List[str], scored_raw: List[tuple[str, fl
                 if disp
             ],
         }
+        if lexicon:
+            item["lexicon"] = lexicon
         log.info("Writing to DDB: %s", item)
-        table.put_item(Item=item)
-        log.info("Wrote item successfully")
+        if _WRITER is not None:
+            _WRITER.submit(item)
+        else:
+            _put_item(item)
     except Exception as e:
         log.warning("Failed to write recent to DDB: %s", e)
 
 
-# ---------- main lambda ----------
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    log.debug("event: %s", event)
-    e164 = _extract_phone(event)
-    digits = _digits_only(e164)
-
+# ---------- scoring (cacheable) ----------
+def _score_letters(e164: str, digits: str, timer: StageTimer = NULL_TIMER,
+                   locale: Optional[str] = None) -> Tuple[Tuple[str, float, str], ...]:
+    """
+    The three (letters, score, preformatted display) options for a number.
+    Depends only on the number's suffix and the locale, so handler() caches it per container.
+    """
     # 1) curated lexicon matches (best-first)
-    cands = vanity_candidates(e164, max_letters=7)
-    letters: List[str] = [c.raw_letters for c in cands[:3] if c and c.raw_letters]
+    with timer.stage("lookup"):
+        cands = (
+            (phrase_candidates(e164, k=3, locale=locale) if PHRASE_MODE else [])
+            or (anywhere_candidates(e164, k=3, locale=locale) if ANYWHERE_MODE else [])
+            or vanity_candidates(e164, max_letters=7, k=3, fallback=False, locale=locale)
+        )
+        letters: List[str] = [c.raw_letters for c in cands[:3] if c and c.raw_letters]
 
-    # 2) ensure 3 options via deterministic fallbacks
+    # 2) ensure 3 options via pronounceable fallbacks (see vanity.fallback_letters)
     if len(letters) < 3:
-        for n in (5, 4):
-            if len(letters) >= 3:
-                break
-            if len(digits) >= n:
-                letters.append(_fallback_letters(digits, n))
-    while len(letters) < 3:
-        letters.append("")
+        with timer.stage("fallback"):
+            if not cands:
+                cands = fallback_candidates(e164, locale=locale)[:3]
+                letters = [c.raw_letters for c in cands if c.raw_letters]
+            for n in (5, 4):
+                if len(letters) >= 3:
+                    break
+                if len(digits) >= n:
+                    letters.append(fallback_letters(digits, n, locale=locale))
+            while len(letters) < 3:
+                letters.append("")
+
+    # Align scores with letters (0.0 if letter came from fallback); phrase and
+    # match-anywhere candidates are formatted here since words may sit mid-number
+    score_by_letters = {c.raw_letters: c.score for c in cands[:3]}
+    preformatted = {
+        c.raw_letters: c.display or _format_display(e164, c.raw_letters, c.offset)
+        for c in cands[:3] if c.display or c.offset is not None
+    }
+    return tuple((L, score_by_letters.get(L, 0.0), preformatted.get(L, "")) for L in letters)
+
+
+def _cache_key(digits: str, lexicon: str) -> Tuple[str, bool, bool, str]:
+    # 7 digits decide suffix results; phrases and match-anywhere span the national number.
+    # The lexicon version differs per locale and per release, so a swap never serves stale options.
+    wide = PHRASE_MODE or ANYWHERE_MODE
+    return (digits[-10:] if wide else digits[-7:], PHRASE_MODE, ANYWHERE_MODE, lexicon)
+
+
+# ---------- warm-up ----------
+def warm() -> None:
+    """Load the default locale's lexicon (plus phrase trie / automaton if enabled) and the DynamoDB table now."""
+    warm_vanity(phrases=PHRASE_MODE, anywhere=ANYWHERE_MODE)
+    _get_table()
+
+
+def _is_warmup(event: Any) -> bool:
+    """{"warmup": true}, serverless-plugin-warmup, or an EventBridge schedule rule."""
+    if not isinstance(event, dict):
+        return False
+    return bool(event.get("warmup")) or event.get("source") in ("serverless-plugin-warmup", "aws.events")
+
+
+# ---------- lexicon releases ----------
+# VANITY_LEXICON_SOURCE (a directory or s3://bucket/prefix that
+# tools/publish_lexicon.py writes) serves the lexicon from the release its
+# manifest.json names instead of the files in the zip. Init serves the bundled
+# lexicon and only starts fetching the current release on a background thread
+# (a release is tens of MB to download and verify, too much for Connect's
+# timeout); then a warm container checks the manifest at most every
+# VANITY_LEXICON_CHECK_SECONDS the same way and swaps a new release in
+# without blocking calls (see artifacts.LexiconReloader). Releases are
+# staged under VANITY_LEXICON_CACHE_DIR (/tmp/lexicon).
+LEXICON_SOURCE = os.environ.get("VANITY_LEXICON_SOURCE", "")
+_RELOADER = LexiconReloader(
+    open_store(LEXICON_SOURCE), use_lexicon_dir,
+    interval=float(os.environ.get("VANITY_LEXICON_CHECK_SECONDS", "60")),
+    cache_dir=os.environ.get("VANITY_LEXICON_CACHE_DIR", "/tmp/lexicon"),
+) if LEXICON_SOURCE else None
+
+if _RELOADER is not None:
+    _RELOADER.maybe_check()  # background: failures are logged and retried, the bundle serves meanwhile
+
+# VANITY_EAGER_INIT=1 does the warm-up during the init phase instead
+# (provisioned concurrency / SnapStart-style deployments).
+if os.environ.get("VANITY_EAGER_INIT", "0") == "1":
+    warm()
+
+
+# ---------- profiling ----------
+# VANITY_PROFILE_EVERY=N profiles 1 in N invocations with cProfile;
+# VANITY_PROFILE_SLOW_MS=T keeps the profile of any invocation >= T ms.
+# VANITY_PROFILE_MEMORY=1 adds tracemalloc. Summaries go to the log, raw
+# stats to VANITY_PROFILE_DIR (default /tmp). Unset, handler is not wrapped.
+_PROFILER = InvocationProfiler(
+    every=int(os.environ.get("VANITY_PROFILE_EVERY", "0")),
+    slow_ms=float(os.environ.get("VANITY_PROFILE_SLOW_MS", "0")),
+    memory=os.environ.get("VANITY_PROFILE_MEMORY", "0") == "1",
+    out_dir=os.environ.get("VANITY_PROFILE_DIR", "/tmp"),
+)
 
-    # 3) build displays + SSML (skip empties in SSML)
-    displays = [_format_display(e164, L) if L else "" for L in letters]
-    ssml = _build_ssml(displays)
 
-    # Build scored_raw alongside (use 0.0 if letter came from fallback)
-    # cands already sorted best-first; align letters->score
-    score_by_letters = {c.raw_letters: c.score for c in cands[:3]}
-    scored_raw = [(L, score_by_letters.get(L, 0.0)) for L in letters]
+# ---------- main lambda ----------
+@_PROFILER.wrap
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    global _COLD_START
+    cold, _COLD_START = _COLD_START, False
+    try:
+        if _RELOADER is not None:
+            _RELOADER.maybe_check()
+        if _is_warmup(event):
+            warm()
+            return {"warmup": True, "lexicon": lexicon_version(),
+                    "release": _RELOADER.version if _RELOADER is not None else None}
+        return _handle(event, context, cold)
+    finally:
+        if _WRITER is not None:
+            _WRITER.invocation_done()  # lets the writer drain and release the freeze
+
+
+def _handle(event: Dict[str, Any], context: Any, cold: bool = False) -> Dict[str, Any]:
+    log.debug("event: %s", event)
+    timer = StageTimer(trace=TRACE_STAGES) if STAGE_METRICS else NULL_TIMER
+    with timer.stage("extract"):
+        e164 = _extract_phone(event)
+        digits = _digits_only(e164)
+        locale = _extract_locale(event, e164)
+        lexicon = lexicon_version(locale)  # one version per call, even if a release swaps in meanwhile
+
+    # 1-2) scored letters: from the caller's record, else reused across warm
+    # invocations for the same suffix and locale
+    record = None
+    if CALLER_RECORDS:
+        with timer.stage("caller"):
+            record = _read_caller(e164, lexicon)
+    with timer.stage("lookup"):
+        key = _cache_key(digits, lexicon)
+        scored = (_scored_from_record(record) if record else None) or _RESULTS.get(key)
+    hit = scored is not None
+    evicted = 0
+    if scored is None:
+        scored = _score_letters(e164, digits, timer, locale)
+        evicted = _RESULTS.put(key, scored)
+
+    # 3) build displays + SSML (skip empties in SSML)
+    with timer.stage("format"):
+        displays = [disp or _format_display(e164, L) if L else "" for L, _, disp in scored]
+        ssml = _build_ssml(displays)
+        scored_raw = [(L, score) for L, score, _ in scored]
 
     # 4) best-effort DDB write (correct schema & all three options)
-    _write_recent(e164, displays[:3], scored_raw)
+    with timer.stage("persist"):
+        if not CALLER_RECORDS or not _collapsed(record):
+            _write_recent(e164, displays[:3], scored_raw, lexicon)
+
+    record_cache(hit, evicted, ENV)
+    metrics.flush_metrics()
+    record_stages(timer.durations, cold, hit, ENV)
 
     return {
         "option1": displays[0],
@@ -1,11 +1,34 @@
 # lambda/vanity/observability.py
-from aws_lambda_powertools import Logger, Tracer, Metrics
+import json
+import time
+from contextlib import nullcontext
+from typing import Dict
+
+from aws_lambda_powertools import Metrics
 from aws_lambda_powertools.metrics import MetricUnit
 
 # Service names show up in logs/traces/metrics
-logger  = Logger(service="vanity")
-tracer  = Tracer(service="vanity")
-metrics = Metrics(namespace="VanityConnect")
+NAMESPACE = "VanityConnect"
+metrics = Metrics(namespace=NAMESPACE)
+
+# logger / tracer are built on first access: Tracer pulls in aws_xray_sdk,
+# several hundred ms of cold start that metrics-only callers never use.
+_LAZY = {}
+
+def __getattr__(name: str):
+    if name not in ("logger", "tracer"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _lazy(name)
+
+def _lazy(name: str):
+    if name not in _LAZY:
+        if name == "logger":
+            from aws_lambda_powertools import Logger
+            _LAZY[name] = Logger(service="vanity")
+        else:
+            from aws_lambda_powertools import Tracer
+            _LAZY[name] = Tracer(service="vanity")
+    return _LAZY[name]
 
 def record_success(candidates_count: int, matched_words: int, env: str, connect_instance_id: str | None):
     """
@@ -33,4 +56,92 @@ def record_error(env: str, connect_instance_id: str | None):
     metrics.add_dimension(name="service", value="vanity")
     metrics.add_dimension(name="env", value=env or "dev")
     metrics.add_dimension(name="connectInstanceId", value=connect_instance_id or "unknown")
-    metrics.add_metric(name="Errors", value=1, unit=MetricUnit.Count)
\ No newline at end of file
+    metrics.add_metric(name="Errors", value=1, unit=MetricUnit.Count)
+
+def record_cache(hit: bool, evictions: int, env: str):
+    """
+    Emit per-invocation counters for the in-container result cache
+    (sum over time for hit ratio):
+      - ResultCacheHits / ResultCacheMisses: 1 or 0 for this call
+      - ResultCacheEvictions: entries evicted to store this call's result
+    """
+    metrics.add_dimension(name="service", value="vanity")
+    metrics.add_dimension(name="env", value=env or "dev")
+    metrics.add_metric(name="ResultCacheHits", value=1 if hit else 0, unit=MetricUnit.Count)
+    metrics.add_metric(name="ResultCacheMisses", value=0 if hit else 1, unit=MetricUnit.Count)
+    metrics.add_metric(name="ResultCacheEvictions", value=evictions, unit=MetricUnit.Count)
+
+class _Stage:
+    __slots__ = ("timer", "name", "t0", "sub")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self.timer, self.name, self.sub = timer, name, None
+
+    def __enter__(self):
+        if self.timer.trace:
+            self.sub = _lazy("tracer").provider.in_subsegment(f"## {self.name}")
+            self.sub.__enter__()
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.t0) * 1e3
+        durations = self.timer.durations
+        durations[self.name] = durations.get(self.name, 0.0) + ms
+        if self.sub is not None:
+            self.sub.__exit__(*exc)
+        return False
+
+_NO_STAGE = nullcontext()
+
+class StageTimer:
+    """
+    Wall time per handler stage, in ms, for one invocation:
+
+        timer = StageTimer()
+        with timer.stage("lookup"):
+            ...
+        record_stages(timer.durations, cold_start, cache_hit, env)
+
+    enabled=False makes stage() a shared no-op context; trace=True also opens
+    an X-Ray subsegment "## <stage>" around each stage.
+    """
+
+    def __init__(self, enabled: bool = True, trace: bool = False):
+        self.enabled = enabled
+        self.trace = trace and enabled
+        self.durations: Dict[str, float] = {}
+
+    def stage(self, name: str):
+        return _Stage(self, name) if self.enabled else _NO_STAGE
+
+NULL_TIMER = StageTimer(enabled=False)
+
+_STAGE_DIMENSIONS = [["service", "env", "coldStart", "cacheHit"]]
+_STAGE_NAMES: Dict[str, str] = {}
+
+def record_stages(durations: Dict[str, float], cold_start: bool, cache_hit: bool, env: str):
+    """
+    Emit one EMF line with a duration per stage that ran this invocation:
+      - Stage<Name>Ms, e.g. StageLookupMs, StagePersistMs
+      - StagesTotalMs: their sum
+    Dimensions: service, env, coldStart, cacheHit ("true"/"false").
+
+    Written directly rather than through a powertools Metrics object (whose
+    validation and flush cost several times the stages being measured), and
+    kept out of `metrics` so these dimensions don't attach to business metrics.
+    """
+    if not durations:
+        return
+    blob = {"service": "vanity", "env": env or "dev",
+            "coldStart": "true" if cold_start else "false",
+            "cacheHit": "true" if cache_hit else "false"}
+    defs = []
+    for name, ms in durations.items():
+        metric = _STAGE_NAMES.get(name) or _STAGE_NAMES.setdefault(name, f"Stage{name.title()}Ms")
+        defs.append({"Name": metric, "Unit": "Milliseconds"})
+        blob[metric] = ms
+    defs.append({"Name": "StagesTotalMs", "Unit": "Milliseconds"})
+    blob["StagesTotalMs"] = sum(durations.values())
+    blob["_aws"] = {"Timestamp": int(time.time() * 1000), "CloudWatchMetrics": [
+        {"Namespace": NAMESPACE, "Dimensions": _STAGE_DIMENSIONS, "Metrics": defs}]}
+    print(json.dumps(blob, separators=(",", ":")))
@@ -0,0 +1,122 @@
+# lambda/vanity/persist.py
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+from typing import Any, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+_EXT_API = "http://{api}/2020-01-01/extension"
+
+
+class AsyncWriter:
+    """
+    Writes records on a background thread so handler() can return to Amazon
+    Connect before the DynamoDB round trip.
+
+    Inside Lambda, a frozen container would also freeze this thread, so the
+    writer registers an internal extension: Lambda does not freeze the
+    sandbox until every extension asks for its next event, and ours only does
+    that once the invocation has finished and the queue is drained. The
+    response still goes back to the caller as soon as handler() returns.
+
+    Outside Lambda (tests, benchmarks) records are written as they arrive;
+    call drain() to wait for them.
+
+    Backlog: a Lambda container runs one invocation at a time and is only
+    released once the queue is empty, so there it holds at most one record.
+    Where many invocations share a process (sim_connect, a local server) the
+    queue is what bounds the wait: draining takes up to
+    maxsize * put latency / workers, and once it is full submit() writes
+    inline, pushing the latency back onto the callers instead of growing
+    the backlog.
+    """
+
+    def __init__(self, write: Callable[[Dict[str, Any]], None], maxsize: int = 64, workers: int = 1):
+        self._write = write
+        self._q: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize)
+        self._invocation_done = threading.Event()
+        for i in range(max(1, workers)):
+            threading.Thread(target=self._run, name=f"persist-writer-{i}", daemon=True).start()
+
+        api = os.environ.get("AWS_LAMBDA_RUNTIME_API")
+        if api:
+            # must register during init, i.e. while this module is imported
+            ext_id = self._register(api)
+            if ext_id:
+                threading.Thread(target=self._extension_loop, args=(api, ext_id),
+                                 name="persist-extension", daemon=True).start()
+        atexit.register(self.drain, 5.0)
+
+    # ---- handler side ----
+    def submit(self, item: Dict[str, Any]) -> None:
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            log.warning("Persist queue full; writing inline")
+            self._write_one(item)
+
+    def invocation_done(self) -> None:
+        """Called when handler() finishes (success or not)."""
+        self._invocation_done.set()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted record is written; False on timeout."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._q.all_tasks_done:
+            while self._q.unfinished_tasks:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._q.all_tasks_done.wait(remaining)
+        return True
+
+    def pending(self) -> int:
+        return self._q.unfinished_tasks
+
+    # ---- background side ----
+    def _write_one(self, item: Dict[str, Any]) -> None:
+        try:
+            self._write(item)
+        except Exception as e:
+            log.warning("Failed to write recent to DDB: %s", e)
+
+    def _run(self) -> None:
+        while True:
+            item = self._q.get()
+            try:
+                self._write_one(item)
+            finally:
+                self._q.task_done()
+
+    @staticmethod
+    def _register(api: str) -> Optional[str]:
+        req = urllib.request.Request(
+            _EXT_API.format(api=api) + "/register",
+            data=json.dumps({"events": ["INVOKE"]}).encode(),
+            headers={"Lambda-Extension-Name": "vanity-persist"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=2) as resp:
+                return resp.headers.get("Lambda-Extension-Identifier")
+        except Exception as e:
+            log.warning("Extension registration failed; async writes may wait for the next invoke: %s", e)
+            return None
+
+    def _extension_loop(self, api: str, ext_id: str) -> None:
+        next_url = _EXT_API.format(api=api) + "/event/next"
+        while True:
+            # Blocks (container may freeze) until an invocation starts
+            req = urllib.request.Request(next_url, headers={"Lambda-Extension-Identifier": ext_id})
+            with urllib.request.urlopen(req) as resp:
+                event = json.loads(resp.read() or b"{}")
+            deadline = event.get("deadlineMs", 0) / 1000.0
+            self._invocation_done.wait(timeout=max(0.0, deadline - time.time()))
+            self._invocation_done.clear()
+            self.drain(timeout=max(0.0, deadline - time.time()))
@@ -0,0 +1,135 @@
+# lambda/vanity/profiling.py
+import cProfile
+import functools
+import itertools
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class InvocationProfiler:
+    """
+    Opt-in cProfile (and tracemalloc) capture around a Lambda handler.
+
+      every=N     profile invocations 1, N+1, 2N+1, ... (the first is the cold start)
+      slow_ms=T   profile every invocation, keep only those that took >= T ms
+      memory      also trace allocations (peak and top allocating lines)
+
+    A kept profile is logged as one compact JSON summary (top functions by
+    cumulative and own time) and dumped as raw pstats to out_dir/*.prof, the
+    newest `keep` files only (/tmp is small). With neither every nor slow_ms
+    set, wrap() returns the handler itself: no per-call overhead at all.
+    slow_ms pays cProfile's overhead on every call; use it to chase a problem,
+    not as a standing setting.
+    """
+
+    def __init__(self, every: int = 0, slow_ms: float = 0.0, memory: bool = False,
+                 out_dir: str = "/tmp", top: int = 12, keep: int = 20, name: str = "vanity"):
+        self.every = max(0, every)
+        self.slow_ms = max(0.0, slow_ms)
+        self.memory = memory
+        self.out_dir = Path(out_dir)
+        self.top = top
+        self.keep = keep
+        self.name = name
+        self._count = itertools.count()
+        self._lock = threading.Lock()  # one profiler at a time (cProfile cannot nest)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.every or self.slow_ms)
+
+    def wrap(self, fn: Callable) -> Callable:
+        if not self.enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def profiled(event: Any, context: Any):
+            n = next(self._count)
+            sampled = bool(self.every) and n % self.every == 0
+            if not (sampled or self.slow_ms) or not self._lock.acquire(blocking=False):
+                return fn(event, context)
+            try:
+                return self._run(fn, event, context, n, sampled)
+            finally:
+                self._lock.release()
+
+        return profiled
+
+    def _run(self, fn: Callable, event: Any, context: Any, n: int, sampled: bool):
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:  # another profiler owns the interpreter (3.12+)
+            return fn(event, context)
+        prof.disable()
+        trace = self.memory and not tracemalloc.is_tracing()
+        if trace:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        prof.enable()
+        try:
+            return fn(event, context)
+        finally:
+            prof.disable()
+            ms = (time.perf_counter() - t0) * 1e3
+            snapshot = peak = None
+            if trace:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if sampled or ms >= self.slow_ms > 0:
+                try:
+                    self._report(prof, ms, n, "slow" if self.slow_ms and ms >= self.slow_ms else "sampled",
+                                 getattr(context, "aws_request_id", None), snapshot, peak)
+                except Exception as e:
+                    log.warning("Profile report failed: %s", e)
+
+    def _report(self, prof: cProfile.Profile, ms: float, n: int, reason: str, request_id: Optional[str],
+                snapshot: Optional[tracemalloc.Snapshot], peak: Optional[int]) -> None:
+        stats = pstats.Stats(prof)
+        summary: Dict[str, Any] = {
+            "profile": reason,
+            "invocation": n,
+            "request_id": request_id,
+            "duration_ms": round(ms, 3),
+            "calls": stats.total_calls,
+            "top_cumulative": self._top(stats, 3),
+            "top_own": self._top(stats, 2),
+        }
+        if snapshot is not None:
+            summary["memory"] = {
+                "peak_kb": round(peak / 1024, 1),
+                "top_lines": [f"{s.traceback[0].filename.rsplit('/', 1)[-1]}:{s.traceback[0].lineno} "
+                              f"{s.size / 1024:.1f}KB/{s.count}"
+                              for s in snapshot.statistics("lineno")[:self.top]],
+            }
+        path = self._dump(prof, n, request_id)
+        summary["stats_file"] = str(path) if path else None
+        (log.warning if reason == "slow" else log.info)("profile %s", json.dumps(summary))
+
+    def _top(self, stats: pstats.Stats, col: int) -> List[str]:
+        # stats.stats: {(file, line, func): (prim calls, calls, own s, cumulative s, callers)}
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][col], reverse=True)[:self.top]
+        return [f"{file.rsplit('/', 1)[-1]}:{line}({func}) {row[1]}x {row[2] * 1e3:.2f}/{row[3] * 1e3:.2f}ms"
+                for (file, line, func), row in rows]
+
+    def _dump(self, prof: cProfile.Profile, n: int, request_id: Optional[str]) -> Optional[Path]:
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"{self.name}-{int(time.time())}-{request_id or n}.prof"
+            prof.dump_stats(path)
+            old = sorted(self.out_dir.glob(f"{self.name}-*.prof"), key=lambda p: p.stat().st_mtime)
+            for p in old[:-self.keep] if self.keep > 0 else []:
+                p.unlink(missing_ok=True)
+            return path
+        except OSError as e:
+            log.warning("Could not write profile to %s: %s", self.out_dir, e)
+            return None
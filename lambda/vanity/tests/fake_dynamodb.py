@@ -0,0 +1,110 @@
+# lambda/vanity/tests/fake_dynamodb.py
+"""In-memory stand-in for the boto3 DynamoDB Table the Lambdas use (pk/sk schema)."""
+import copy
+import re
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
+
+
+def _key_condition(condition):
+    """(pk, sk predicate) of Key("pk").eq(v), optionally & Key("sk").<op>(x)."""
+    expr = condition.get_expression()
+    if expr["operator"] == "AND":
+        pk, _ = _key_condition(expr["values"][0])
+        sk_expr = expr["values"][1].get_expression()
+        ops = {">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+               "<": lambda a, b: a < b, "<=": lambda a, b: a <= b, "=": lambda a, b: a == b}
+        assert sk_expr["operator"] in ops, "fake supports sk comparisons only"
+        bound = sk_expr["values"][1]
+        return pk, lambda sk: ops[sk_expr["operator"]](sk, bound)
+    assert expr["operator"] == "=", "fake supports pk equality only"
+    return expr["values"][1], lambda sk: True
+
+
+def _condition_holds(condition, item):
+    """Evaluate an Attr(...) condition (not_exists/exists, comparisons, & and |) on a stored item."""
+    expr = condition.get_expression()
+    op, values = expr["operator"], expr["values"]
+    if op == "OR":
+        return any(_condition_holds(v, item) for v in values)
+    if op == "AND":
+        return all(_condition_holds(v, item) for v in values)
+    if op == "attribute_not_exists":
+        return values[0].name not in item
+    if op == "attribute_exists":
+        return values[0].name in item
+    ops = {">": lambda a, b: a > b, ">=": lambda a, b: a >= b, "<": lambda a, b: a < b,
+           "<=": lambda a, b: a <= b, "=": lambda a, b: a == b, "<>": lambda a, b: a != b}
+    assert op in ops, f"fake does not support {op}"
+    name = values[0].name
+    return name in item and ops[op](item[name], values[1])
+
+
+def _project(item, projection, names):
+    if not projection:
+        return item
+    fields = [names.get(f.strip(), f.strip()) for f in projection.split(",")]
+    return {f: item[f] for f in fields if f in item}
+
+
+class FakeTable:
+    """Stores items by (pk, sk) and counts read/write calls."""
+
+    def __init__(self, name="vanity-numbers-VanityCalls"):
+        self.name = name
+        self.items = {}
+        self.reads = 0
+        self.writes = 0
+        # table.meta.client.query(TableName=..., ...) hits the same store
+        self.meta = SimpleNamespace(client=self)
+
+    def put_item(self, Item, ConditionExpression=None, **kwargs):
+        self.writes += 1
+        current = self.items.get((Item["pk"], Item["sk"]), {})
+        if ConditionExpression is not None and not _condition_holds(ConditionExpression, current):
+            raise ClientError({"Error": {"Code": "ConditionalCheckFailedException",
+                                         "Message": "The conditional request failed"}}, "PutItem")
+        self.items[(Item["pk"], Item["sk"])] = copy.deepcopy(Item)
+        return {}
+
+    def get_item(self, Key, ProjectionExpression=None, ExpressionAttributeNames=None,
+                 ConsistentRead=False, **kwargs):
+        self.reads += 1
+        item = self.items.get((Key["pk"], Key["sk"]))
+        if item is None:
+            return {}
+        return {"Item": _project(copy.deepcopy(item), ProjectionExpression, ExpressionAttributeNames or {})}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues,
+                    ConditionExpression=None, ExpressionAttributeNames=None, **kwargs):
+        """SET a = :v, ... only; a failed condition still counts as a write, as DynamoDB bills it."""
+        self.writes += 1
+        current = self.items.get((Key["pk"], Key["sk"]), {})
+        if ConditionExpression is not None and not _condition_holds(ConditionExpression, current):
+            raise ClientError({"Error": {"Code": "ConditionalCheckFailedException",
+                                         "Message": "The conditional request failed"}}, "UpdateItem")
+        names = ExpressionAttributeNames or {}
+        item = {**copy.deepcopy(current), **Key}
+        assert UpdateExpression.startswith("SET "), "fake supports SET only"
+        for name, value in re.findall(r"([#\w]+)\s*=\s*(:\w+)", UpdateExpression):
+            item[names.get(name, name)] = copy.deepcopy(ExpressionAttributeValues[value])
+        self.items[(Key["pk"], Key["sk"])] = item
+        return {}
+
+    def query(self, KeyConditionExpression, ScanIndexForward=True, Limit=None,
+              ExclusiveStartKey=None, TableName=None, ConsistentRead=False,
+              ProjectionExpression=None, ExpressionAttributeNames=None, **kwargs):
+        self.reads += 1
+        pk, sk_ok = _key_condition(KeyConditionExpression)
+        rows = sorted((it for (p, sk), it in self.items.items() if p == pk and sk_ok(sk)),
+                      key=lambda it: it["sk"], reverse=not ScanIndexForward)
+        if ExclusiveStartKey:
+            start = ExclusiveStartKey["sk"]
+            rows = [it for it in rows if (it["sk"] < start if not ScanIndexForward else it["sk"] > start)]
+        page = rows[:Limit] if Limit else rows
+        resp = {"Items": [_project(copy.deepcopy(it), ProjectionExpression, ExpressionAttributeNames or {})
+                          for it in page], "Count": len(page)}
+        if Limit and len(rows) > Limit:
+            resp["LastEvaluatedKey"] = {"pk": pk, "sk": page[-1]["sk"]}
+        return resp
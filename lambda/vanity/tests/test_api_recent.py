@@ -0,0 +1,59 @@
+# lambda/vanity/tests/test_api_recent.py
+import base64
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "api"))
+
+import api_handler
+from fake_dynamodb import FakeTable
+
+
+def _table(n):
+    table = FakeTable()
+    for i in range(n):
+        ts = f"2025-10-03T21:{i // 60:02d}:{i % 60:02d}.000000+00:00"
+        table.put_item({"pk": "RECENT", "sk": f"TS#{ts}", "caller_number": f"+1303555{i:04d}",
+                        "created_at": ts, "vanity_candidates": ["A", "B", "C"], "raw": [{"letters": "A"}]})
+    return table
+
+
+def _get(params=None, headers=None):
+    res = api_handler.handler({"queryStringParameters": params, "headers": headers or {}}, None)
+    body = res.get("body", "")
+    if res.get("isBase64Encoded"):
+        body = gzip.decompress(base64.b64decode(body)).decode()
+    return res, json.loads(body) if body else None
+
+
+def test_cursor_pages_and_since_only_newer():
+    table = _table(12)
+    with patch.object(api_handler, "table", table), patch.object(api_handler, "_cache", {}):
+        _, first = _get({"limit": "5"})
+        _, second = _get({"limit": "5", "cursor": first["next_cursor"]})
+        _, last = _get({"limit": "5", "cursor": second["next_cursor"]})
+        _, newer = _get({"since": first["items"][2]["created_at"]})
+        bad, _ = _get({"limit": "500"})
+
+    callers = [it["caller"] for page in (first, second, last) for it in page["items"]]
+    assert callers == [f"+1303555{i:04d}" for i in reversed(range(12))]
+    assert last["next_cursor"] is None
+    assert [it["caller"] for it in newer["items"]] == callers[:2]
+    assert set(first["items"][0]) == {"caller", "created_at", "top3"}
+    assert bad["statusCode"] == 400
+
+
+def test_etag_cache_and_gzip():
+    table = _table(40)
+    with patch.object(api_handler, "table", table), patch.object(api_handler, "_cache", {}):
+        res, page = _get({"limit": "40"}, {"Accept-Encoding": "gzip, br"})
+        again, _ = _get({"limit": "40"}, {"If-None-Match": res["headers"]["ETag"]})
+
+    assert res["headers"]["Content-Encoding"] == "gzip" and len(page["items"]) == 40
+    assert again["statusCode"] == 304 and again["body"] == ""
+    assert table.reads == 1  # second request served from the container cache
@@ -0,0 +1,116 @@
+# lambda/vanity/tests/test_artifacts.py
+import threading
+import time
+from collections import OrderedDict
+from unittest.mock import patch
+
+import pytest
+
+from app import handler as h
+from app import vanity
+from app.artifacts import MANIFEST, LexiconReloader, LocalStore, publish
+from fake_dynamodb import FakeTable
+
+
+def _release(tmp_path, name, rows):
+    src = tmp_path / name
+    src.mkdir()
+    (src / vanity.LEX_FILE).write_bytes(vanity._compile_lexicon(rows))
+    return [src / vanity.LEX_FILE]
+
+
+def test_releases_hot_swap_and_version_results(tmp_path, monkeypatch):
+    monkeypatch.delenv("VANITY_LEXICON_FORMAT", raising=False)
+    monkeypatch.setattr(vanity, "_ENGINES", OrderedDict(vanity._ENGINES))
+    monkeypatch.setattr(vanity, "_LEXICON_DIR", vanity._LEXICON_DIR)
+    monkeypatch.setattr(vanity, "_AVAILABLE", vanity._AVAILABLE)
+    store = LocalStore(tmp_path / "bucket")
+    reloader = LexiconReloader(store, vanity.use_lexicon_dir, interval=0, cache_dir=tmp_path / "cache")
+
+    first = publish(_release(tmp_path, "a", [("FLOWERS", 5.0)]), store)
+    assert reloader.check() and not reloader.check()
+    assert reloader.version == first["version"]
+    assert vanity.vanity_candidates("+15553569377", k=1)[0].raw_letters == "FLOWERS"
+    in_flight, v1 = vanity._engine(), vanity.lexicon_version()
+
+    second = publish(_release(tmp_path, "b", [("FLOWERS", 5.0), ("EXPRESS", 4.0)]), store)
+    reloader.maybe_check()  # background: returns at once
+    deadline = time.monotonic() + 10
+    while reloader.version != second["version"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert reloader.version == second["version"]
+    assert vanity.lexicon_version() != v1
+    assert in_flight.lex.find(7, "3569377")  # the swapped-out engine still answers
+
+    table = FakeTable()
+    with patch.object(h, "table", table), patch.object(h, "_WRITER", None):
+        h.handler({"phone": "+15553977377"}, None)
+    (item,) = table.items.values()
+    assert item["lexicon"] == vanity.lexicon_version()
+    assert item["vanity_candidates"][0].endswith("EXPRESS")
+
+    # a tampered file is refused; the active release stays
+    third = publish(_release(tmp_path, "c", [("HOLA", 5.0)]), store)
+    store.put(f"{third['version']}/{vanity.LEX_FILE}", b"corrupt")
+    with pytest.raises(ValueError, match="content hash"):
+        reloader.check()
+    assert reloader.version == second["version"]
+    assert (tmp_path / "bucket" / MANIFEST).exists()
+
+
+def test_reload_maps_shipped_indexes_and_refuses_partial_releases(tmp_path, monkeypatch):
+    monkeypatch.delenv("VANITY_LEXICON_FORMAT", raising=False)
+    monkeypatch.setattr(vanity, "_ENGINES", OrderedDict())
+    monkeypatch.setattr(vanity, "_LEXICON_DIR", vanity._LEXICON_DIR)
+    monkeypatch.setattr(vanity, "_AVAILABLE", vanity._AVAILABLE)
+    store = LocalStore(tmp_path / "bucket")
+    reloader = LexiconReloader(store, vanity.use_lexicon_dir, interval=0, cache_dir=tmp_path / "cache")
+    vanity.warm(phrases=True, anywhere=True)
+
+    files = _release(tmp_path, "a", [("FLOWERS", 5.0), ("GOLF", 3.0), ("HOME", 4.0)])
+    idx = files[0].with_name(vanity.IDX_FILE)
+    idx.write_bytes(vanity._compile_indexes(vanity._MappedLexicon(files[0])))
+    publish(files + [idx], store)
+
+    def built_at_runtime(lex):
+        raise AssertionError("indexes should come from the release")
+    monkeypatch.setattr(vanity, "_exact_keys", built_at_runtime)
+    assert reloader.check()
+    assert vanity._engine().trie is not None and len(vanity._engine().automaton) < 20
+    assert vanity.anywhere_candidates("+13034653555", k=1)[0].raw_letters == "GOLF"
+    assert vanity.phrase_candidates("+13046534663", k=1)[0].display == "30-GOLF-HOME"
+    active, version = reloader.version, vanity.lexicon_version()
+
+    # English is loaded, so a Spanish-only release is refused
+    es = tmp_path / "es"
+    es.mkdir()
+    (es / "words_4_7.es.lex").write_bytes(vanity._compile_lexicon([("HOLA", 5.0)]))
+    publish([es / "words_4_7.es.lex"], store)
+    with pytest.raises(ValueError, match="no words_4_7.lex for loaded locale"):
+        reloader.check()
+    assert reloader.version == active and vanity.lexicon_version() == version
+
+
+def test_first_check_runs_in_the_background_while_the_bundle_serves(tmp_path, monkeypatch):
+    monkeypatch.delenv("VANITY_LEXICON_FORMAT", raising=False)
+    monkeypatch.setattr(vanity, "_ENGINES", OrderedDict(vanity._ENGINES))
+    monkeypatch.setattr(vanity, "_LEXICON_DIR", vanity._LEXICON_DIR)
+    monkeypatch.setattr(vanity, "_AVAILABLE", vanity._AVAILABLE)
+    bundled = vanity.lexicon_version()
+    store = LocalStore(tmp_path / "bucket")
+    release = publish(_release(tmp_path, "a", [("FLOWERS", 5.0)]), store)
+
+    gate = threading.Event()
+    fetch = store.get
+    monkeypatch.setattr(store, "get", lambda key: gate.wait(5) and fetch(key))
+    reloader = LexiconReloader(store, vanity.use_lexicon_dir, interval=60, cache_dir=tmp_path / "cache")
+    t0 = time.perf_counter()
+    reloader.maybe_check()  # what handler init does: no download on the init path
+    assert time.perf_counter() - t0 < 0.5
+    assert reloader.version is None and vanity.lexicon_version() == bundled
+
+    gate.set()
+    deadline = time.monotonic() + 10
+    while reloader.version != release["version"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert reloader.version == release["version"] and vanity.lexicon_version() != bundled
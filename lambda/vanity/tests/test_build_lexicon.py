@@ -0,0 +1,78 @@
+# lambda/vanity/tests/test_build_lexicon.py
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+
+import build_lexicon
+
+
+@pytest.fixture
+def out(tmp_path, monkeypatch):
+    """Build outputs and the stage manifest go to tmp_path, never next to the shipped lexicon."""
+    locale_path = build_lexicon.vanity._locale_path
+    monkeypatch.setattr(build_lexicon, "BUILD_DIR", tmp_path / "build")
+    monkeypatch.setattr(build_lexicon.vanity, "_locale_path",
+                        lambda name, locale=None, root=None: locale_path(name, locale, tmp_path))
+    (tmp_path / "corpus.txt").write_text(
+        "flowers 500\ngolf 300\nhello 400\nniño 200\ndarned 80\ndarnit 60\nhome 350\nok 900\n",
+        encoding="utf-8")
+    (tmp_path / "deny.txt").write_text("# not on a keypad near you\nHELLO\n")
+    (tmp_path / "profanity.txt").write_text("darn\n")
+    (tmp_path / "allow.txt").write_text("EXPRESS 5.5\nGOLF\nX-RAY\n")
+    return tmp_path
+
+
+def _build(out, capsys):
+    build_lexicon.main(["--lang", "en", "--corpus", str(out / "corpus.txt"), "--workers", "1",
+                        "--deny", str(out / "deny.txt"), "--profanity", str(out / "profanity.txt"),
+                        "--allow", str(out / "allow.txt"), "--no-suffix-table"])
+    lines = [re.match(r"\[en\] (\w+) +(.*)", line) for line in capsys.readouterr().out.splitlines()]
+    return {m[1]: m[2] for m in lines if m and not m[2].startswith("warning")}
+
+
+def _rebuilt(log):
+    return {stage for stage, text in log.items() if stage != "done" and "skipped" not in text}
+
+
+def test_curation_drops_denied_and_profane_words_and_forces_allowed(out, capsys):
+    log = _build(out, capsys)
+    assert log["curate"] == "5 words (1 denied, 2 profanity, 1 allowed) → words_4_7.jsonl.gz"
+
+    rows = dict(build_lexicon.read_jsonl(out / "words_4_7.jsonl.gz"))
+    lex = build_lexicon.vanity._MappedLexicon(out / "words_4_7.lex")
+    words = {lex.word(i) for i in range(lex.n_words)}
+    assert set(rows) == words == {"FLOWERS", "GOLF", "NINO", "HOME", "EXPRESS"}
+    assert rows["EXPRESS"] == 5.5 and rows["GOLF"] > 3.0  # a listed score wins; otherwise the corpus does
+
+
+def test_only_stages_downstream_of_a_changed_input_rerun(out, capsys):
+    assert _rebuilt(_build(out, capsys)) == {"score", "curate", "compile", "index"}
+    lex = (out / "words_4_7.lex").read_bytes()
+
+    (out / "deny.txt").write_text("# not on a keypad near you\nHELLO\n")  # rewritten, same words
+    assert _rebuilt(_build(out, capsys)) == set()
+    assert (out / "words_4_7.lex").read_bytes() == lex
+
+    (out / "deny.txt").write_text("HELLO\nHOME\n")
+    assert _rebuilt(_build(out, capsys)) == {"curate", "compile", "index"}
+    assert "HOME" not in dict(build_lexicon.read_jsonl(out / "words_4_7.jsonl.gz"))
+
+    (out / "words_4_7.idx").unlink()  # a missing output reruns just its stage
+    assert _rebuilt(_build(out, capsys)) == {"index"}
+
+    with open(out / "corpus.txt", "a", encoding="utf-8") as fh:
+        fh.write("hotel 120\n")
+    assert _rebuilt(_build(out, capsys)) == {"score", "curate", "compile", "index"}
+
+
+def test_suffix_tables_are_opt_in_per_language(out, capsys):
+    stale = out / "words_4_7.es.sfx"
+    stale.write_bytes(b"from an older build")
+    build_lexicon.main(["--lang", "es", "--corpus", str(out / "corpus.txt"), "--workers", "1"])
+    log = capsys.readouterr().out
+    assert (out / "words_4_7.es.lex").exists() and (out / "words_4_7.es.idx").exists()
+    assert not stale.exists() and "not in --suffix-table-langs, removed words_4_7.es.sfx" in log
@@ -0,0 +1,28 @@
+# lambda/vanity/tests/test_cache.py
+from unittest.mock import patch, MagicMock
+from app.cache import LRUCache
+from app import handler as h
+
+
+def test_lru_evicts_least_recently_used():
+    c = LRUCache(2)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1          # a is now most recent
+    assert c.put("c", 3) == 1       # evicts b
+    assert c.get("b") is None
+    assert (c.hits, c.misses, c.evictions) == (1, 1, 1)
+
+
+def test_handler_reuses_scored_letters_for_same_suffix():
+    h._RESULTS.clear()
+    with patch("app.handler.table") as mock_table, \
+         patch("app.handler._score_letters", wraps=h._score_letters) as score:
+        first = h.handler({"phone": "+13035553679"}, MagicMock())
+        # different area code, same 7-digit suffix -> cache hit, own display
+        second = h.handler({"phone": "+17205553679"}, MagicMock())
+    assert score.call_count == 1
+    assert first["option1"].startswith("303-555-")
+    assert second["option1"].startswith("720-555-")
+    assert first["option1"][8:] == second["option1"][8:]
+    assert mock_table.put_item.call_count == 2
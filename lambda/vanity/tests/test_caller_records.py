@@ -0,0 +1,40 @@
+# lambda/vanity/tests/test_caller_records.py
+from unittest.mock import patch
+
+from app import handler as h
+from fake_dynamodb import FakeTable
+
+CALLER = "+13035551212"
+
+
+def _recent(table):
+    return [it for (pk, _), it in table.items.items() if pk.startswith("RECENT")]
+
+
+def test_repeat_callers_reuse_their_record_and_collapse_writes():
+    table = FakeTable()
+    with patch.object(h, "table", table), patch.object(h, "CALLER_RECORDS", True), \
+            patch.object(h, "COLLAPSE_SECONDS", 60.0), patch.object(h, "_WRITER", None), \
+            patch.object(h, "_score_letters", wraps=h._score_letters) as score:
+        h._RESULTS.clear()
+        first = h.handler({"phone": CALLER}, None)
+        assert (table.reads, table.writes, score.call_count) == (1, 2, 1)  # record + TS# item
+
+        h._RESULTS.clear()  # the record, not the container cache, answers
+        for _ in range(3):
+            assert h.handler({"phone": CALLER}, None) == first
+        assert (table.reads, table.writes, score.call_count) == (4, 2, 1)  # burst: reads only
+        assert len(_recent(table)) == 1
+
+        with patch.object(h, "COLLAPSE_SECONDS", 0.0):  # window over: recorded again, still not rescored
+            h.handler({"phone": CALLER}, None)
+        assert (table.reads, table.writes, score.call_count) == (5, 4, 1)
+        assert len(_recent(table)) == 2
+
+        # two invocations that both read the record before either wrote: one TS# item
+        stale = _recent(table)[0]
+        h._put_item({**stale, "sk": "TS#9999", "created_at": stale["created_at"]})
+        assert table.writes == 5 and len(_recent(table)) == 2
+
+    record = table.items[("CALLER#" + CALLER, f"{stale['lexicon']}#{h._MODE}")]
+    assert record["vanity_candidates"] == [first["option1"], first["option2"], first["option3"]]
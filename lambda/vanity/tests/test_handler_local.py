@@ -14,4 +14,23 @@ def test_handler_returns_options_without_connect():
     # Ensure keys exist
     assert "option1" in res
     assert "option2" in res
-    assert "option3" in res
\ No newline at end of file
+    assert "option3" in res
+
+def test_warmup_event_short_circuits():
+    with patch("app.handler.table") as mock_table:
+        res = handler({"warmup": True}, MagicMock())
+        res_scheduled = handler({"source": "aws.events", "detail-type": "Scheduled Event"}, MagicMock())
+
+    assert res["warmup"] is True and res_scheduled["warmup"] is True
+    assert "option1" not in res
+    mock_table.put_item.assert_not_called()
+
+def test_stage_metrics_emitted_and_switchable():
+    with patch("app.handler.table"), patch("app.handler.record_stages") as rec:
+        handler({"phone": "+13035551212"}, MagicMock())
+        durations, _, _, _ = rec.call_args.args
+        assert {"extract", "lookup", "format", "persist"} <= set(durations)
+
+        with patch("app.handler.STAGE_METRICS", False):
+            handler({"phone": "+13035551212"}, MagicMock())
+        assert rec.call_args.args[0] == {}
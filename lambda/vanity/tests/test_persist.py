@@ -0,0 +1,158 @@
+# lambda/vanity/tests/test_persist.py
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from app import handler as h
+from app import persist
+from app.persist import AsyncWriter
+
+
+class FakeTable:
+    """put() that takes `delay_s`, waits for `gate` or raises for items marked "fail"."""
+
+    def __init__(self, delay_s=0.0, gate=None):
+        self.delay_s = delay_s
+        self.gate = gate
+        self.items = []
+        self.threads = []
+
+    def put(self, item):
+        if self.gate is not None:
+            self.gate.wait(5)
+        time.sleep(self.delay_s)
+        if item.get("fail"):
+            raise RuntimeError("ProvisionedThroughputExceededException")
+        self.items.append(item["n"])
+        self.threads.append(threading.current_thread().name)
+
+
+class _Stop(Exception):
+    pass
+
+
+class RuntimeAPI:
+    """Stands in for urlopen() against the Lambda Extensions API."""
+
+    def __init__(self, events, on_next=lambda: None):
+        self.events = list(events)
+        self.on_next = on_next
+        self.requests = []
+
+    def __call__(self, req, timeout=None):
+        self.requests.append((req.get_method(), req.full_url, dict(req.header_items())))
+        if req.full_url.endswith("/register"):
+            return _Response(b"", {"Lambda-Extension-Identifier": "ext-1"})
+        self.on_next()
+        if not self.events:
+            raise _Stop
+        return _Response(json.dumps(self.events.pop(0)).encode(), {})
+
+
+class _Response:
+    def __init__(self, body, headers):
+        self.body, self.headers = body, headers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read(self):
+        return self.body
+
+
+def test_full_queue_writes_inline_and_loses_nothing():
+    table = FakeTable(delay_s=0.01)
+    writer = AsyncWriter(table.put, maxsize=2, workers=2)
+    for n in range(12):
+        writer.submit({"n": n})
+
+    assert writer.drain(2.0) and writer.pending() == 0
+    assert sorted(table.items) == list(range(12))
+    assert "MainThread" in table.threads  # overflow went inline instead of waiting on the queue
+    assert {"persist-writer-0", "persist-writer-1"} <= set(table.threads)
+
+
+def test_drain_times_out_while_a_write_is_outstanding():
+    gate = threading.Event()
+    table = FakeTable(gate=gate)
+    writer = AsyncWriter(table.put)
+    writer.submit({"n": 1})
+
+    t0 = time.perf_counter()
+    assert writer.drain(0.05) is False
+    assert 0.04 < time.perf_counter() - t0 < 1.0
+    assert writer.pending() == 1 and table.items == []
+
+    gate.set()
+    assert writer.drain(2.0) is True
+    assert writer.pending() == 0 and table.items == [1]
+
+
+def test_failed_writes_are_logged_and_the_writer_keeps_going(caplog):
+    table = FakeTable()
+    writer = AsyncWriter(table.put)
+    for n in range(3):
+        writer.submit({"n": n, "fail": n == 1})
+    assert writer.drain(2.0)
+    assert table.items == [0, 2]
+    assert "Failed to write recent to DDB: ProvisionedThroughputExceededException" in caplog.text
+
+
+def test_extension_holds_the_freeze_until_the_invocation_is_written(monkeypatch):
+    gate = threading.Event()
+    table = FakeTable(gate=gate)
+    written_at_next = []
+    api = RuntimeAPI([{"eventType": "INVOKE", "deadlineMs": (time.time() + 5) * 1000}],
+                     on_next=lambda: written_at_next.append(list(table.items)))
+    monkeypatch.setattr(persist.urllib.request, "urlopen", api)
+
+    assert AsyncWriter._register("127.0.0.1:9001") == "ext-1"
+    method, url, headers = api.requests[0]
+    assert (method, url) == ("POST", "http://127.0.0.1:9001/2020-01-01/extension/register")
+    assert headers["Lambda-extension-name"] == "vanity-persist"
+
+    writer = AsyncWriter(table.put)
+    loop = threading.Thread(target=lambda: _until_stopped(writer, "127.0.0.1:9001", "ext-1"))
+    loop.start()
+    writer.submit({"n": 1})
+    time.sleep(0.05)
+    writer.invocation_done()  # handler() returned, but the write is still in flight
+    time.sleep(0.05)
+    assert len(written_at_next) == 1  # so the extension has not asked for the next event
+
+    gate.set()
+    loop.join(2.0)
+    assert not loop.is_alive()
+    assert written_at_next == [[], [1]]
+    assert api.requests[1][2]["Lambda-extension-identifier"] == "ext-1"
+
+    def unreachable(req, timeout=None):
+        raise OSError("connection refused")
+    monkeypatch.setattr(persist.urllib.request, "urlopen", unreachable)
+    assert AsyncWriter._register("127.0.0.1:9001") is None
+
+
+def test_warmup_ping_releases_the_extension(monkeypatch):
+    api = RuntimeAPI([{"eventType": "INVOKE", "deadlineMs": (time.time() + 5) * 1000}])
+    monkeypatch.setattr(persist.urllib.request, "urlopen", api)
+    writer = AsyncWriter(FakeTable().put)
+    loop = threading.Thread(target=lambda: _until_stopped(writer, "127.0.0.1:9001", "ext-1"))
+    loop.start()
+    time.sleep(0.02)  # the INVOKE event is in: the extension now waits for the handler
+
+    with patch.object(h, "_WRITER", writer), patch.object(h, "table"):
+        assert h.handler({"warmup": True}, None)["warmup"] is True
+    loop.join(1.0)
+    assert not loop.is_alive()  # asked for the next event long before the 5 s deadline
+    assert len(api.requests) == 2
+
+
+def _until_stopped(writer, api, ext_id):
+    try:
+        writer._extension_loop(api, ext_id)
+    except _Stop:
+        pass
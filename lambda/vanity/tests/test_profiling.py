@@ -0,0 +1,26 @@
+# lambda/vanity/tests/test_profiling.py
+import json
+import logging
+from unittest.mock import MagicMock
+
+from app.profiling import InvocationProfiler
+
+
+def _work(event, context):
+    return sum(i * i for i in range(2000))
+
+
+def test_profiler_off_returns_handler_unwrapped():
+    assert InvocationProfiler().wrap(_work) is _work
+
+
+def test_profiler_samples_one_in_n(tmp_path, caplog):
+    wrapped = InvocationProfiler(every=2, memory=True, out_dir=str(tmp_path)).wrap(_work)
+    with caplog.at_level(logging.INFO, logger="app.profiling"):
+        results = [wrapped({}, MagicMock(aws_request_id=f"req-{i}")) for i in range(4)]
+
+    assert results == [_work({}, None)] * 4
+    summaries = [json.loads(r.getMessage()[len("profile "):]) for r in caplog.records]
+    assert [s["request_id"] for s in summaries] == ["req-0", "req-2"]
+    assert summaries[0]["top_cumulative"] and "peak_kb" in summaries[0]["memory"]
+    assert sorted(p.name.split("-", 2)[2] for p in tmp_path.glob("*.prof")) == ["req-0.prof", "req-2.prof"]
@@ -0,0 +1,38 @@
+# lambda/vanity/tests/test_recent_shards.py
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "api"))
+
+import api_handler
+from app import handler as h
+from fake_dynamodb import FakeTable
+
+
+def test_sharded_writes_merge_back_in_unsharded_order():
+    table = FakeTable()
+    with patch.object(h, "table", table), patch.object(h, "RECENT_SHARDS", 4):
+        for i in range(20):
+            h._write_recent(f"+1303555{i:04d}", ["303-555-A", "303-555-B", "303-555-C"],
+                            [("A", 1.0), ("B", 0.5), ("C", 0.0)])
+            time.sleep(0.001)  # distinct µs timestamps
+
+    partitions = {pk for pk, _ in table.items}
+    assert len(partitions) > 1
+    assert all(pk.startswith("RECENT#") for pk in partitions)
+
+    # what a single unsharded partition would have returned
+    newest = sorted(table.items.values(), key=lambda it: it["sk"], reverse=True)[:5]
+
+    with patch.object(api_handler, "table", table), patch.object(api_handler, "RECENT_SHARDS", 4):
+        res = api_handler.handler({}, None)
+
+    assert res["statusCode"] == 200
+    items = json.loads(res["body"])["items"]
+    assert [it["caller"] for it in items] == [it["caller_number"] for it in newest]
+    assert table.reads == 5  # 4 shards + the legacy RECENT partition
@@ -0,0 +1,88 @@
+# lambda/vanity/tests/test_recent_view.py
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from boto3.dynamodb.types import TypeSerializer
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "api"))
+
+import api_handler
+import recent_view
+from fake_dynamodb import FakeTable
+
+
+def _item(i, pk="RECENT"):
+    ts = f"2025-10-03T21:{i // 60:02d}:{i % 60:02d}.000000+00:00"
+    return {"pk": pk, "sk": f"TS#{ts}", "caller_number": f"+1303555{i:04d}", "created_at": ts,
+            "vanity_candidates": [f"303-555-W{i}", "B", "C"]}
+
+
+def _stream(*items, event="INSERT"):
+    ser = TypeSerializer()
+    return {"Records": [{"eventName": event, "dynamodb": {
+        "Keys": {k: ser.serialize(it[k]) for k in ("pk", "sk")},
+        "NewImage": {k: ser.serialize(v) for k, v in it.items()}}} for it in items]}
+
+
+def _get(params):
+    res = api_handler.handler({"queryStringParameters": params, "headers": {}}, None)
+    return res, json.loads(res["body"]) if res["body"] else None
+
+
+def test_stream_maintains_view_and_api_serves_it_with_one_read():
+    table = FakeTable()
+    with patch.object(recent_view, "table", table), patch.object(recent_view, "VIEW_SIZE", 10), \
+            patch.object(api_handler, "table", table), patch.object(api_handler, "_cache", {}), \
+            patch.object(api_handler, "_view_cache", [0.0, None]), patch.object(api_handler, "RECENT_VIEW", True):
+        # two shards' batches, one redelivered; caller records are not calls
+        recent_view.handler(_stream(*[_item(i, f"RECENT#{i % 2}") for i in range(0, 12, 2)]), None)
+        recent_view.handler(_stream(*[_item(i, f"RECENT#{i % 2}") for i in range(1, 12, 2)]), None)
+        assert recent_view.handler(_stream(_item(11, "RECENT#1")), None)["version"] == 2
+        recent_view.handler(_stream({**_item(99), "pk": "CALLER#+13035550099", "sk": "lex#exact"}), None)
+        version, entries = recent_view.read(table)
+        assert version == 2 and len(entries) == 10
+        assert [e["caller"] for e in entries] == [f"+1303555{i:04d}" for i in reversed(range(2, 12))]
+
+        table.reads = 0
+        _, page = _get({"limit": "5"})
+        _, newer = _get({"since": page["items"][2]["created_at"]})
+        # conditional fetches from many viewers: nothing newer than their version
+        statuses = {_get({"version": "2"})[0]["statusCode"] for _ in range(20)}
+        assert table.reads == 1  # one GetItem shared by every request, whatever the shard count
+        assert statuses == {304}
+        assert page["version"] == 2 and page["items"][0]["top3"] == ["303-555-W11", "B", "C"]
+        assert [it["caller"] for it in newer["items"]] == [it["caller"] for it in page["items"][:2]]
+
+        # once the container's copy expires, a new version is served in full
+        recent_view.handler(_stream(_item(20)), None)
+        api_handler._view_cache[0] = 0.0
+        res, changed = _get({"version": "2", "limit": "1"})
+        assert res["statusCode"] == 200 and changed["version"] == 3
+        assert changed["items"][0]["caller"] == "+13035550020"
+
+
+def test_catch_up_backfills_and_view_falls_back_to_query():
+    table = FakeTable()
+    for i in range(8):
+        table.put_item(_item(i))
+    with patch.object(recent_view, "VIEW_SIZE", 5), patch.object(api_handler, "table", table), \
+            patch.object(api_handler, "_cache", {}), patch.object(api_handler, "_view_cache", [0.0, None]), \
+            patch.object(api_handler, "CACHE_TTL", 0), patch.object(api_handler, "RECENT_VIEW", True):
+        _, before = _get({"limit": "3"})  # not materialized yet: Query
+        assert "version" not in before
+        assert recent_view.catch_up(table, ["RECENT"]) == 1
+        assert recent_view.catch_up(table, ["RECENT"]) == 1  # nothing new: no write
+
+        _, page = _get({"limit": "5"})
+        assert page["version"] == 1 and page["next_cursor"]  # older calls than the view exist
+        _, older = _get({"limit": "5", "cursor": page["next_cursor"]})
+        _, gap = _get({"since": _item(0)["created_at"], "limit": "10"})
+
+    assert [it["caller"] for it in page["items"] + older["items"]] == \
+        [f"+1303555{i:04d}" for i in reversed(range(8))]
+    assert before["items"] == page["items"][:3]
+    assert "version" not in gap and len(gap["items"]) == 7
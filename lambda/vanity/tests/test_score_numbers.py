@@ -0,0 +1,58 @@
+# lambda/vanity/tests/test_score_numbers.py
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+
+import score_numbers
+
+NUMBERS = ["+13035553679", "+15553569377", "+13035550000", "+13035554653", "+13035554663"]
+
+
+def _score(tmp_path, *args, workers=1):
+    out = tmp_path / "scores.jsonl"
+    score_numbers.main([*args, "-o", str(out), "--workers", str(workers), "--chunk-size", "2"])
+    return [json.loads(line) for line in out.read_text().splitlines()]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_output_is_in_input_order_and_rerun_replaces_it(tmp_path, workers):
+    src = tmp_path / "numbers.txt"
+    src.write_text("\n".join(NUMBERS) + "\n")
+
+    rows = _score(tmp_path, str(src), workers=workers)
+    assert [(r["line"], r["number"]) for r in rows] == list(enumerate(NUMBERS))
+    assert rows[1]["matched"] and rows[1]["options"][0]["letters"] == "FLOWERS"
+    assert len(rows[0]["options"]) == 3
+
+    assert _score(tmp_path, str(src), workers=workers) == rows  # a fresh run never appends duplicate lines
+
+
+def test_skip_resumes_where_an_interrupted_run_stopped(tmp_path):
+    src = tmp_path / "numbers.txt"
+    src.write_text("\n".join(NUMBERS) + "\n")
+    whole = _score(tmp_path, str(src))
+
+    out = tmp_path / "scores.jsonl"
+    out.write_text("".join(json.dumps(r) + "\n" for r in whole[:3]))  # run died after line 2
+    assert _score(tmp_path, str(src), "--skip", "3") == whole
+
+
+@pytest.mark.parametrize("text, column", [
+    ("id,phone\n1,+13035553679\n2,+15553569377\n", "phone"),
+    ("id,phone\n1,+13035553679\n2,+15553569377\n", "1"),
+    ("+13035553679,a\n+15553569377,b\n", None),  # no header row: the first line is data
+    ("phone\n+13035553679\n+15553569377\n", "phone"),
+])
+def test_csv_columns_and_headers(text, column):
+    numbers = list(score_numbers.read_numbers(io.StringIO(text), column))
+    assert numbers == ["+13035553679", "+15553569377"]
+
+
+def test_unknown_csv_column_is_an_error():
+    with pytest.raises(SystemExit, match="'phone' not in CSV header"):
+        list(score_numbers.read_numbers(io.StringIO("id,number\n1,+13035553679\n"), "phone"))
@@ -1,9 +1,15 @@
 # lambda/vanity/tests/test_vanity.py
 import re
+import zlib
+
+import pytest
 
 # updated imports to match the new code structure
-from app.handler import normalize_e164
-from app.vanity import vanity_candidates, WORDS
+from app.handler import _format_display, normalize_e164
+from app.vanity import (
+    FUZZY_PENALTY, _score_word, anywhere_candidates, fallback_letters, phrase_candidates,
+    vanity_candidates, vanity_candidates_batch, WORDS,
+)
 
 
 def test_normalize_e164():
@@ -21,6 +27,154 @@ def test_generate_candidates_basic():
     scores = [c.score for c in cands[:10]]
     assert scores == sorted(scores, reverse=True)
 
+def test_top_k_is_prefix_of_full_ranking():
+    e164 = "+13035552227"  # one of the largest 4-letter buckets
+    full = vanity_candidates(e164)
+    top = vanity_candidates(e164, k=3)
+    assert len(top) == 3
+    assert [(c.raw_letters, c.score) for c in top] == [(c.raw_letters, c.score) for c in full[:3]]
+
 def test_dictionary_bonus_present():
     # Ensure dictionary exists and includes our seed words
-    assert "FLOWERS" in WORDS
\ No newline at end of file
+    assert "FLOWERS" in WORDS
+
+def test_fuzzy_digits_spell_letter_like_words():
+    cands = vanity_candidates("+13035554053", k=3)  # 4-0-5-3: H-O-L-D with 0 as O
+    hold = next(c for c in cands if c.raw_letters == "HOLD")
+    assert hold.score == pytest.approx(_score_word("HOLD") - FUZZY_PENALTY)
+
+def test_exact_shorter_word_beats_longer_fuzzy_spelling():
+    import sys
+    from pathlib import Path
+    from app import vanity
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+    from build_suffix_table import build_slots
+
+    lex = vanity._MappedLexicon(vanity._compile_lexicon([("PINK", 8.72), ("ORIOL", 6.13), ("OPEN", 5.0)]))
+    table = memoryview(build_slots(lex))
+
+    def top(e164):
+        digits = vanity._digits_only(e164)
+        got = [c.raw_letters for c in vanity._lexicon_candidates(lex, e164, digits, 7, 1, fallback=False)]
+        assert [c.raw_letters for c in vanity._table_candidates(lex, table, e164, digits, 1, False)] == got
+        return got
+
+    assert top("+19472807465") == ["PINK"]  # ...-0-PINK, not ...-ORIOL with 0 as O
+    assert top("+19472800736") == ["OPEN"]  # no exact word at any length: fuzzy 0PEN still answers
+    assert top("+19472806745") == []
+
+
+def test_fallback_letters_search_is_bounded():
+    digits = "3235262"
+    assert fallback_letters(digits) == fallback_letters(digits, beam=16, budget_ms=None)
+    assert len(fallback_letters(digits, beam=1)) == 7
+    assert fallback_letters(digits, budget_ms=-1) == "DADJAMA"  # out of time: first letters
+    assert fallback_letters("+1 (303) 555-1010", n=4) in {"IOIO", "IOLO", "LOIO", "LOLO"}
+
+def test_fallback_and_phrases_do_not_depend_on_timing(monkeypatch):
+    import itertools
+    from app import vanity as v
+
+    expected = (fallback_letters("3235262"), phrase_candidates("+18003569377", k=3))
+    clock = itertools.count(0, 10.0)  # every clock read is 10 s later: a very slow call
+    monkeypatch.setattr(v.time, "perf_counter", lambda: next(clock))
+    assert (fallback_letters("3235262"), phrase_candidates("+18003569377", k=3)) == expected
+
+def test_phrase_candidates_cover_number():
+    cands = phrase_candidates("+18003569377", k=3, span=10)
+    assert cands and cands[0].display == "800-FLOWERS"
+    assert cands[0].raw_letters == "FLOWERS"
+    scores = [c.score for c in cands]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_anywhere_finds_words_off_the_suffix():
+    e164 = "+13033569111"  # FLOW... sits mid-number; the 1s end no word
+    assert vanity_candidates(e164)[0].score <= 0.05  # suffix path: fallback only
+    cands = anywhere_candidates(e164, k=3)
+    assert cands and all(c.offset == 3 for c in cands)
+    assert _format_display(e164, "FLOW", 3) == "303-FLOW-111"
+    assert _format_display("+18003569377", "FLOWERS", 3) == "800-FLOWERS"
+
+
+def test_batch_matches_scalar_top_k():
+    pytest.importorskip("numpy")
+    numbers = ["+15553569377", "(303) 555-3679", "3035551010", "555", ""]
+    batch = vanity_candidates_batch(numbers, k=3)
+    assert batch.letters.shape == (5, 3)
+    for e164, row in zip(numbers, batch.rows()):
+        want = vanity_candidates(e164)[:3]
+        assert [(c.raw_letters, c.score) for c in row] == [(c.raw_letters, c.score) for c in want]
+    assert batch.matched.tolist() == [True, True, False, False, False]
+
+
+def test_locales_load_lazily_and_unload_under_budget(tmp_path, monkeypatch):
+    import gzip
+    import json
+    from collections import OrderedDict
+    from unittest.mock import patch
+
+    from app import handler as h
+    from app import vanity
+
+    with gzip.open(tmp_path / "words_4_7.zz.jsonl.gz", "wt") as f:
+        f.write(json.dumps({"word": "HOLA", "score": 5.0}) + "\n")
+    plain = vanity._locale_path
+    monkeypatch.setattr(vanity, "_locale_path",
+                        lambda name, locale=None, root=None: plain(name, locale, root) if locale != "zz"
+                        else tmp_path / plain(name, locale).name)
+    monkeypatch.setattr(vanity, "_AVAILABLE", ("en", "zz"))
+    monkeypatch.setattr(vanity, "_ENGINES", OrderedDict(vanity._ENGINES))
+    monkeypatch.setattr(h, "COUNTRY_LOCALES", {"52": "zz"})
+
+    assert h._extract_locale({"locale": "ZZ-mx"}, "+13035551212") == "zz"
+    assert h._extract_locale({}, "+525555554652") == "zz"
+    assert h._extract_locale({"locale": "xx"}, "+525555554652") == vanity.DEFAULT_LOCALE
+
+    vanity._engine("en")
+    monkeypatch.setattr(vanity, "LEXICON_BUDGET_MB", 1e-6)  # room for one locale at most
+    with patch("app.handler.table"):
+        res = h.handler({"phone": "+525555554652"}, None)
+    assert res["option1"].endswith("HOLA")
+    assert list(vanity._ENGINES) == ["zz"]  # English was least recently used
+
+
+def test_compile_streams_rows_and_last_repeat_wins():
+    from app import vanity
+
+    rows = [("HOME", 1.0), ("GOLF", 3.0), ("hold", 9.0), ("HOME", 4.0)]
+    lex = vanity._MappedLexicon(vanity._compile_lexicon(iter(rows)))
+    assert bytes(lex._mm) == vanity._compile_lexicon({"GOLF": 3.0, "HOME": 4.0}.items())
+    assert lex.n_words == 2 and lex.freqs[lex.word_ids[lex.find(4, "4663")[0]]] == 4.0
+    assert lex.crc == zlib.crc32(bytes(lex._mm)[vanity.LEX_HEADER.size:])  # stored, not recomputed
+
+
+def test_feature_scoring_reproduces_and_reranks_the_lexicon():
+    np = pytest.importorskip("numpy")
+    from app import vanity
+
+    rows = [("FLOWERS", 5.0), ("HOLD", 3.0), ("GOLF", 3.0), ("HOME", 4.0), ("HOOF", 1.0)]
+    lex = vanity._MappedLexicon(vanity._compile_lexicon(rows))
+    features = vanity.word_features(lex)
+    assert features.shape == (lex.n_words, len(vanity.SCORE_FEATURES))
+    stored = [vanity._score_word(lex.word(i), lex.freqs[i]) for i in range(lex.n_words)]
+    assert vanity.score_matrix(features, vanity.DEFAULT_WEIGHTS).tolist() == stored
+    assert bytes(vanity._rerank(lex, vanity.DEFAULT_WEIGHTS)._mm) == bytes(lex._mm)
+
+    def bucket(lx, digits):
+        return [lx.word(lx.word_ids[e]) for e in lx.find(len(digits), digits)]
+
+    flipped = vanity._rerank(lex, vanity.parse_weights('{"zipf": -1}'))
+    assert bucket(lex, "4663") == ["HOME", "HOOF"] and bucket(flipped, "4663") == ["HOOF", "HOME"]
+    assert bucket(flipped, "4653") == ["GOLF", "HOLD"]  # a tie stays alphabetical
+    fuzzy = flipped.find(4, "4013")  # H-O-L-D with 0 as O and 1 as L
+    want = vanity.score_matrix(features, vanity.parse_weights('{"zipf": -1}'))[flipped.word_ids[fuzzy[0]]]
+    assert flipped.scores[fuzzy[0]] == pytest.approx(want - 2 * vanity.FUZZY_PENALTY)
+
+    keys = np.frombuffer(flipped.keys, dtype="<u4")
+    scores = np.frombuffer(flipped.scores, dtype="<f8")
+    same_key = keys[:-1] == keys[1:]
+    assert (keys[:-1] <= keys[1:]).all() and (scores[:-1][same_key] >= scores[1:][same_key]).all()
+    with pytest.raises(ValueError, match="unknown scoring features"):
+        vanity.parse_weights('{"vowel": 1}')
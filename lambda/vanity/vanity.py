@@ -1,10 +1,25 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, DefaultDict
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+from bisect import bisect_left, bisect_right
 import gzip
+import heapq
+import itertools
 import json
-from collections import defaultdict
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
 
 # ------------------ Types ------------------
 @dataclass
@@ -12,6 +27,7 @@ class VanityCandidate:
     display: str       # e.g., "303-FLOWERS" (filled by handler)
     raw_letters: str   # e.g., "FLOWERS"
     score: float
+    offset: Optional[int] = None  # first digit of the word in the national number (match-anywhere)
 
 # ------------------ T9 Map ------------------
 T9 = {
@@ -19,50 +35,102 @@ T9 = {
     "4": "GHI", "5": "JKL", "6": "MNO",
     "7": "PQRS","8": "TUV","9": "WXYZ",
 }
+_T9_REV: Dict[str, str] = {L: d for d, letters in T9.items() for L in letters}
+_T9_TRANS = str.maketrans(_T9_REV)  # A–Z words only: str.translate leaves anything else as is
+
+# ------------------ Locales ------------------
+# Every locale has its own lexicon files. English keeps the plain names
+# (words_4_7.jsonl.gz, .lex, .sfx, .ngram); other locales insert their code,
+# e.g. words_4_7.es.lex. tools/build_lexicon.py --lang es fr writes them.
+# VANITY_LOCALE picks the locale used when a call names none.
+_PLAIN_LOCALE = "en"
+DEFAULT_LOCALE = os.environ.get("VANITY_LOCALE", _PLAIN_LOCALE).lower()
+JSONL_FILE = "words_4_7.jsonl.gz"
+
+# Compiled files (.lex, .sfx, .ngram) are opened from _LEXICON_DIR: this
+# module's directory until a published release is swapped in (use_lexicon_dir).
+# Word list sources (JSONL) always come from this directory.
+_LEXICON_DIR = Path(__file__).parent
+
+def _locale_path(name: str, locale: Optional[str] = None, root: Optional[Path] = None) -> Path:
+    """`name` for a locale: words_4_7.lex -> words_4_7.es.lex (English: unchanged)."""
+    here = root or Path(__file__).parent
+    if not locale or locale == _PLAIN_LOCALE:
+        return here / name
+    stem, _, ext = name.partition(".")
+    return here / f"{stem}.{locale}.{ext}"
+
+_AVAILABLE: Optional[Tuple[str, ...]] = None
+
+def available_locales() -> Tuple[str, ...]:
+    """Locales with a lexicon next to this module (compiled or JSONL), sorted."""
+    global _AVAILABLE
+    if _AVAILABLE is None:
+        here = Path(__file__).parent
+        found = {p.name.split(".")[1] for root, pat in ((_LEXICON_DIR, "words_4_7.*.lex"),
+                                                          (here, "words_4_7.*.lex"), (here, "words_4_7.*.jsonl.gz"))
+                 for p in root.glob(pat) if p.name.count(".") >= 2}
+        found.discard("jsonl")  # the plain words_4_7.jsonl.gz
+        if (_LEXICON_DIR / LEX_FILE).exists() or any(
+                (here / n).exists() for n in (LEX_FILE, JSONL_FILE, "words_common.txt.gz",
+                                              "words_common.json.gz", "words_small.txt")):
+            found.add(_PLAIN_LOCALE)
+        _AVAILABLE = tuple(sorted(found))
+    return _AVAILABLE
 
 # ------------------ Lexicon loading ------------------
-# Supports (checked in this order):
+# English supports (checked in this order); other locales read only
+# words_4_7.<locale>.jsonl.gz:
 #   - words_4_7.jsonl.gz   (JSONL: {"word":"FLOWERS","score":4.5})
 #   - words_common.txt.gz  (JSONL: same shape)
 #   - words_common.json.gz (JSON array: [{"word":"...","score":...}, ...])
 #   - words_small.txt      (one WORD per line)  [fallback/dev]
 #
-# Exports:
-#   WORDS: Set[str]            (for compatibility)
-#   WORD_SCORE: Dict[str, float]
-def _load_words() -> Tuple[Set[str], Dict[str, float]]:
+# Whatever is loaded is compiled in memory to the same flat layout as
+# words_4_7.lex (below), so the Python sets/dicts only live during the load.
+#
+# Exports (loaded on first access, see _Engine):
+#   WORDS: AbstractSet[str]          read-only view (for compatibility)
+#   WORD_SCORE: Mapping[str, float]  read-only view
+def _iter_jsonl_gz(p: Path) -> Iterator[Tuple[str, float]]:
+    with gzip.open(p, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            yield str(obj["word"]).upper(), float(obj.get("score", 0.0))
+
+def _read_jsonl_gz(p: Path) -> Tuple[Set[str], Dict[str, float]]:
+    ws: Set[str] = set()
+    score: Dict[str, float] = {}
+    for w, s in _iter_jsonl_gz(p):
+        ws.add(w); score[w] = s
+    return ws, score
+
+def _word_rows(locale: Optional[str] = None) -> Iterable[Tuple[str, float]]:
+    """(word, score) rows to compile: streamed from the JSONL when there is one, so
+    no set or dict of the whole list is built (_compile_lexicon drops repeats)."""
+    p = _locale_path(JSONL_FILE, locale, Path(__file__).parent)
+    if p.exists():
+        return _iter_jsonl_gz(p)
+    return _load_words(locale)[1].items()
+
+def _load_words(locale: Optional[str] = None) -> Tuple[Set[str], Dict[str, float]]:
     here = Path(__file__).parent
+    if locale and locale != _PLAIN_LOCALE:
+        p = _locale_path(JSONL_FILE, locale)
+        return _read_jsonl_gz(p) if p.exists() else (set(), {})
 
     # 0) Preferred file name used in your ZIP
-    p = here / "words_4_7.jsonl.gz"
+    p = here / JSONL_FILE
     if p.exists():
-        ws: Set[str] = set()
-        score: Dict[str, float] = {}
-        with gzip.open(p, "rt", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                obj = json.loads(line)
-                w = str(obj["word"]).upper()
-                s = float(obj.get("score", 0.0))
-                ws.add(w); score[w] = s
-        return ws, score
+        return _read_jsonl_gz(p)
 
     # 1) JSONL gz (legacy alt)
     p = here / "words_common.txt.gz"
     if p.exists():
-        ws: Set[str] = set()
-        score: Dict[str, float] = {}
-        with gzip.open(p, "rt", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line: continue
-                obj = json.loads(line)
-                w = str(obj["word"]).upper()
-                s = float(obj.get("score", 0.0))
-                ws.add(w); score[w] = s
-        return ws, score
+        return _read_jsonl_gz(p)
 
     # 2) JSON array gz
     p = here / "words_common.json.gz"
@@ -87,7 +155,360 @@ def _load_words() -> Tuple[Set[str], Dict[str, float]]:
     # 4) Nothing available
     return set(), {}
 
-WORDS, WORD_SCORE = _load_words()  # keep WORDS exported
+# ------------------ Compiled lexicon (mmap) ------------------
+# words_4_7.lex is written by tools/build_lexicon.py next to the JSONL. It is
+# a header followed by flat little-endian arrays, so a cold start only maps
+# the file and never parses a word. Without the file, the JSONL is compiled to
+# the same bytes in memory: one float per score, one blob for every word, no
+# per-word Python objects either way.
+#   header   : magic, version, crc32 of everything after the header,
+#              n_entries, n_words, blob_len
+#   scores   : float64[n_entries]   final _score_word() per entry (less any fuzzy penalty)
+#   freqs    : float64[n_words]     raw lexicon score (WORD_SCORE)
+#   keys     : uint32[n_entries]    len(word) * KEY_BASE + int(t9 digits), ascending
+#   word_ids : uint32[n_entries]    entry -> word
+#   offsets  : uint32[n_words + 1]  word -> slice of blob
+#   blob     : ASCII words, concatenated
+# Entries sharing a key are stored best-first. A word has one exact entry plus
+# one fuzzy entry per letter-like digit spelling (see FUZZY_DIGITS).
+LEX_FILE = "words_4_7.lex"
+LEX_MAGIC = b"VANITYLX"
+LEX_VERSION = 2
+LEX_HEADER = struct.Struct("<8sIIIII")
+KEY_BASE = 10 ** 7  # keys hold up to 7 digits
+
+
+def _pack_key(n: int, digits: str) -> int:
+    return n * KEY_BASE + int(digits)
+
+
+# Letter-like digits: 0 reads as O, 1 as I or L. Words are also indexed under
+# those spellings at compile time, FUZZY_PENALTY lower per substituted letter,
+# so a number ending in 1010 can match with the same single lookup.
+FUZZY_DIGITS = {"O": "0", "I": "1", "L": "1"}
+FUZZY_PENALTY = 1.0
+FUZZY_MAX_SUBS = 2
+_FUZZY_DELTA = {L: int(d) - int(_T9_REV[L]) for L, d in FUZZY_DIGITS.items()}  # key digit change
+
+
+def _is_fuzzy_key(digits: str) -> bool:
+    """Fuzzy keys hold a 0 or 1, exact ones never do."""
+    return "0" in digits or "1" in digits
+
+
+def _lookup_lengths(digits: str, longest: int = 7) -> List[int]:
+    """Suffix lengths to look up, in order: exact keys longest first, then fuzzy ones.
+    Every word under a fuzzy key carries the penalty, so any exact match, even
+    a shorter one, is answered before a fuzzy spelling is tried."""
+    lengths = list(range(min(longest, 7, len(digits)), 3, -1))
+    return sorted(lengths, key=lambda n: _is_fuzzy_key(digits[-n:]))
+
+
+def _fuzzy_keys(word: str, digits: str) -> Iterator[Tuple[str, int]]:
+    """(key, substitutions) for each spelling of `digits` with up to FUZZY_MAX_SUBS letter-like digits."""
+    spots = [i for i, ch in enumerate(word) if ch in FUZZY_DIGITS]
+    for r in range(1, min(FUZZY_MAX_SUBS, len(spots)) + 1):
+        for combo in itertools.combinations(spots, r):
+            key = list(digits)
+            for i in combo:
+                key[i] = FUZZY_DIGITS[word[i]]
+            yield "".join(key), r
+
+
+def _compile_lexicon(rows: Iterable[Tuple[str, float]], fuzzy: bool = True) -> bytes:
+    """(word, freq) rows -> .lex bytes. Words that have no T9 key are dropped;
+    a repeated word keeps its last freq, as loading the rows into a dict would.
+
+    Everything is held in flat arrays and ordered with stable sorts of index
+    lists, one sort key at a time, so no per-word or per-entry tuples are
+    built: the JSONL fallback compiles in about the memory it ends up using.
+    """
+    words: List[str] = []
+    freqs, neg, keys = array("d"), array("d"), array("q")
+    for w, freq in rows:
+        if not (0 < len(w) <= 7 and w.isascii() and w.isalpha() and w.isupper()):
+            continue  # only pure A–Z words up to 7 letters have a T9 key
+        digits = w.translate(_T9_TRANS)
+        words.append(w)
+        freqs.append(freq)
+        neg.append(-_score_word(w, freq))
+        keys.append(_pack_key(len(w), digits))
+
+    # word ids ordered by (key, -score, word), as the entries will be
+    alpha_order = sorted(range(len(words)), key=words.__getitem__)  # stable: repeats in row order
+    alpha_order = [i for j, i in enumerate(alpha_order, 1)
+                   if j == len(alpha_order) or words[alpha_order[j]] != words[i]]
+    order = sorted(alpha_order, key=neg.__getitem__)
+    order.sort(key=keys.__getitem__)
+    new_id = array("I", bytes(4 * len(words)))  # row -> word id
+    for wid, i in enumerate(order):
+        new_id[i] = wid
+    words = list(map(words.__getitem__, order))
+    freqs = array("d", map(freqs.__getitem__, order))
+    neg = array("d", map(neg.__getitem__, order))
+    keys = array("q", map(keys.__getitem__, order))
+    alpha = array("I", bytes(4 * len(words)))  # word id -> alphabetical rank
+    for rank, i in enumerate(alpha_order):
+        alpha[new_id[i]] = rank
+    del order, alpha_order, new_id
+
+    # entries: one exact per word, then the fuzzy spellings (the _fuzzy_keys
+    # keys, computed as offsets from the exact key)
+    e_keys, e_neg, e_wid = array("q", keys), array("d", neg), array("I", range(len(words)))
+    if fuzzy:
+        for wid, w in enumerate(words):
+            n = len(w)
+            spots = [_FUZZY_DELTA[ch] * 10 ** (n - 1 - i) for i, ch in enumerate(w) if ch in _FUZZY_DELTA]
+            for r in range(1, min(FUZZY_MAX_SUBS, len(spots)) + 1):
+                for combo in itertools.combinations(spots, r):
+                    e_keys.append(keys[wid] + sum(combo))
+                    e_neg.append(neg[wid] + FUZZY_PENALTY * r)
+                    e_wid.append(wid)
+    # Group by key, best-first within a key (alpha breaks ties deterministically)
+    order = sorted(range(len(e_wid)), key=lambda e: alpha[e_wid[e]])
+    order.sort(key=e_neg.__getitem__)
+    order.sort(key=e_keys.__getitem__)
+
+    scores = array("d", (-e_neg[e] for e in order))
+    entry_keys = array("I", map(e_keys.__getitem__, order))
+    word_ids = array("I", map(e_wid.__getitem__, order))
+    del order, e_keys, e_neg, e_wid
+    offsets = array("I", [0])
+    blob = bytearray()
+    for w in words:
+        blob += w.encode("ascii")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        for arr in (scores, freqs, entry_keys, word_ids, offsets):
+            arr.byteswap()
+
+    return _pack_lexicon(len(scores), len(words), [scores.tobytes(), freqs.tobytes(), entry_keys.tobytes(),
+                                                  word_ids.tobytes(), offsets.tobytes(), bytes(blob)])
+
+
+def _pack_lexicon(n_entries: int, n_words: int, sections: List[bytes]) -> bytes:
+    """Header + sections (the last one is the blob); the crc is taken here, never at load."""
+    crc = 0
+    for part in sections:
+        crc = zlib.crc32(part, crc)
+    header = LEX_HEADER.pack(LEX_MAGIC, LEX_VERSION, crc, n_entries, n_words, len(sections[-1]))
+    return b"".join([header, *sections])
+
+
+class _MappedLexicon:
+    """Read-only, zero-parse view over a compiled lexicon (an mmap'd .lex file, or its bytes)."""
+
+    def __init__(self, source: Union[Path, bytes]):
+        if isinstance(source, bytes):
+            name, self._mm = "<memory>", source
+        else:
+            name = source.name
+            with open(source, "rb") as fh:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.crc, n_entries, n_words, blob_len = LEX_HEADER.unpack_from(self._mm, 0)
+        if magic != LEX_MAGIC or version != LEX_VERSION:
+            raise ValueError(f"{name}: unsupported lexicon format {magic!r} v{version}")
+
+        view = memoryview(self._mm)
+        pos = LEX_HEADER.size
+
+        def take(fmt: str, count: int, width: int) -> memoryview:
+            nonlocal pos
+            arr = view[pos:pos + count * width].cast(fmt)
+            pos += count * width
+            return arr
+
+        self.n_entries = n_entries
+        self.n_words = n_words
+        self.scores = take("d", n_entries, 8)
+        self.freqs = take("d", n_words, 8)
+        self.keys = take("I", n_entries, 4)
+        self.word_ids = take("I", n_entries, 4)
+        self.offsets = take("I", n_words + 1, 4)
+        self.blob = view[pos:pos + blob_len]
+        if len(self.blob) != blob_len:
+            raise ValueError(f"{name}: truncated lexicon")
+
+    def find(self, n: int, digits: str) -> range:
+        """Entry ids whose T9 key is `digits` (length n), best-first."""
+        key = _pack_key(n, digits)
+        lo = bisect_left(self.keys, key)
+        return range(lo, bisect_right(self.keys, key, lo))
+
+    def word(self, wid: int) -> str:
+        return str(self.blob[self.offsets[wid]:self.offsets[wid + 1]], "ascii")
+
+    def word_id(self, word: str) -> Optional[int]:
+        digits = _t9_key(word)
+        if not 0 < len(word) <= 7 or len(digits) != len(word):
+            return None
+        for e in self.find(len(word), digits):
+            wid = self.word_ids[e]
+            if self.word(wid) == word:
+                return wid
+        return None
+
+
+class _LexiconWords(AbstractSet[str]):
+    """WORDS compatible view (membership, iteration) over a compiled lexicon."""
+
+    def __init__(self, lex: _MappedLexicon):
+        self._lex = lex
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self._lex.word_id(word) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._lex.word(i) for i in range(self._lex.n_words))
+
+    def __len__(self) -> int:
+        return self._lex.n_words
+
+
+class _LexiconScores(Mapping[str, float]):
+    """WORD_SCORE compatible view over a compiled lexicon."""
+
+    def __init__(self, lex: _MappedLexicon):
+        self._lex = lex
+
+    def __getitem__(self, word: str) -> float:
+        wid = self._lex.word_id(word) if isinstance(word, str) else None
+        if wid is None:
+            raise KeyError(word)
+        return self._lex.freqs[wid]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_LexiconWords(self._lex))
+
+    def __len__(self) -> int:
+        return self._lex.n_words
+
+
+def _open_lexicon(locale: Optional[str] = None, root: Optional[Path] = None) -> Optional[_MappedLexicon]:
+    """mmap the locale's compiled lexicon; None means compile its JSONL in memory instead.
+
+    VANITY_LEXICON_FORMAT=jsonl forces the JSONL path (benchmarks, debugging).
+    """
+    if os.environ.get("VANITY_LEXICON_FORMAT", "auto").lower() == "jsonl":
+        return None
+    p = _locale_path(LEX_FILE, locale, root or _LEXICON_DIR)
+    if not p.exists() or sys.byteorder != "little":
+        return None
+    try:
+        return _MappedLexicon(p)
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring compiled lexicon %s: %s", p, e)
+        return None
+
+
+# ------------------ Dense 7-digit suffix table (mmap) ------------------
+# words_4_7.sfx is written by tools/build_suffix_table.py. It answers
+# vanity_candidates() for any 7-digit suffix with a single array index:
+#   header : magic, version, crc32 of the .lex it was built from, n_slots
+#   slots  : uint32[10**7]  (first_entry << 8) | n_entries, 0 = no word
+# The slot already folds in the 7→6→5→4 fallback (exact keys before fuzzy
+# ones, see _lookup_lengths), and because .lex entries are
+# stored best-first per key, the slot's first three entries are the top 3.
+SFX_FILE = "words_4_7.sfx"
+SFX_MAGIC = b"VANITYSX"
+SFX_VERSION = 2
+SFX_HEADER = struct.Struct("<8sIII")
+SFX_SLOTS = 10 ** 7
+SFX_COUNT_BITS = 8
+
+
+def _open_suffix_table(lex: Optional[_MappedLexicon], locale: Optional[str] = None,
+                       root: Optional[Path] = None) -> Optional[memoryview]:
+    """mmap the suffix table if it was built from this exact lexicon."""
+    p = _locale_path(SFX_FILE, locale, root or _LEXICON_DIR)
+    if lex is None or not p.exists():
+        return None
+    try:
+        with open(p, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, lex_crc, n_slots = SFX_HEADER.unpack_from(mm, 0)
+        if magic != SFX_MAGIC or version != SFX_VERSION or n_slots != SFX_SLOTS:
+            raise ValueError(f"unsupported suffix table format {magic!r} v{version}")
+        if lex_crc != lex.crc:
+            raise ValueError(f"built for a different {LEX_FILE}")
+        return memoryview(mm)[SFX_HEADER.size:SFX_HEADER.size + 4 * n_slots].cast("I")
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring suffix table %s: %s", p, e)
+        return None
+
+
+# ------------------ Letter trigram model (mmap) ------------------
+# words_4_7.ngram is written by tools/build_lexicon.py. It scores how
+# pronounceable a letter string is, for fallbacks when no word matches:
+#   header : magic, version, alphabet size (27: A–Z plus a word boundary)
+#   logp   : float32[27**3]  ln P(c | a, b) at (a * 27 + b) * 27 + c
+# Trigram, bigram and unigram estimates from the lexicon are interpolated at
+# build time, so a lookup is one array index. Without the file the same table
+# is computed from the loaded lexicon on the first fallback.
+NGRAM_FILE = "words_4_7.ngram"
+NGRAM_MAGIC = b"VANITYNG"
+NGRAM_VERSION = 1
+NGRAM_HEADER = struct.Struct("<8sII")
+_NG_A = 27       # alphabet: A–Z = 0..25, boundary = 26
+_NG_BOUND = 26
+_NG_WEIGHTS = (0.6, 0.3, 0.1)  # trigram, bigram, unigram
+
+
+def _compile_ngram(words: Iterable[str]) -> bytes:
+    """A–Z words -> .ngram bytes (interpolated letter trigram log-probabilities)."""
+    A = _NG_A
+    tri, bi, uni = [0] * A ** 3, [0] * A * A, [0] * A
+    for w in words:
+        if not w.isascii() or not w.isalpha():
+            continue
+        ids = [_NG_BOUND, _NG_BOUND] + [ord(ch) - 65 for ch in w.upper()] + [_NG_BOUND]
+        for a, b, c in zip(ids, ids[1:], ids[2:]):
+            tri[(a * A + b) * A + c] += 1
+            bi[b * A + c] += 1
+            uni[c] += 1
+
+    w3, w2, w1 = _NG_WEIGHTS
+    uni_total = sum(uni) + A  # add-one: no letter is impossible
+    logp = array("f")
+    for a in range(A):
+        for b in range(A):
+            row3, row2 = (a * A + b) * A, b * A
+            n3, n2 = sum(tri[row3:row3 + A]), sum(bi[row2:row2 + A])
+            # weights of unseen contexts are dropped, not spread
+            norm = w1 + (w2 if n2 else 0.0) + (w3 if n3 else 0.0)
+            for c in range(A):
+                p = w1 * (uni[c] + 1) / uni_total
+                if n2:
+                    p += w2 * bi[row2 + c] / n2
+                if n3:
+                    p += w3 * tri[row3 + c] / n3
+                logp.append(math.log(p / norm))
+    if sys.byteorder != "little":
+        logp.byteswap()
+    return NGRAM_HEADER.pack(NGRAM_MAGIC, NGRAM_VERSION, A) + logp.tobytes()
+
+
+def _load_ngram(data: Union[bytes, mmap.mmap]) -> memoryview:
+    magic, version, alphabet = NGRAM_HEADER.unpack_from(data, 0)
+    if magic != NGRAM_MAGIC or version != NGRAM_VERSION or alphabet != _NG_A:
+        raise ValueError(f"unsupported n-gram model {magic!r} v{version}")
+    view = memoryview(data)[NGRAM_HEADER.size:NGRAM_HEADER.size + 4 * _NG_A ** 3].cast("f")
+    if len(view) != _NG_A ** 3:
+        raise ValueError("truncated n-gram model")
+    return view
+
+
+def _open_ngram(lex: "_MappedLexicon", locale: Optional[str] = None, root: Optional[Path] = None) -> memoryview:
+    """mmap the prebuilt model, else derive it from the lexicon's words."""
+    p = _locale_path(NGRAM_FILE, locale, root or _LEXICON_DIR)
+    if p.exists() and sys.byteorder == "little":
+        try:
+            with open(p, "rb") as fh:
+                return _load_ngram(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring n-gram model %s: %s", p, e)
+    return _load_ngram(_compile_ngram(_LexiconWords(lex)))
+
 
 # ------------------ Helpers ------------------
 def _digits_only(s: str) -> str:
@@ -95,86 +516,822 @@ def _digits_only(s: str) -> str:
 
 def _t9_key(s: str) -> str:
     """Map letters -> digits (e.g., FLOWERS -> 3569377)."""
-    rev: Dict[str, str] = {}
-    for d, letters in T9.items():
-        for L in letters:
-            rev[L] = d
-    return "".join(rev.get(ch, "") for ch in s if ch.isalpha())
-
-def _fallback_letters(digits: str, n: int) -> str:
-    last = digits[-n:]
-    out: List[str] = []
-    for d in last:
-        if d in T9:
-            out.append(T9[d][0])  # deterministic
-        elif d == "0":
-            out.append("O")
-        elif d == "1":
-            out.append("I")
-        else:
-            out.append(d)
-    return "".join(out)
+    return "".join(_T9_REV.get(ch, "") for ch in s if ch.isalpha())
+
+# ------------------ Pronounceable fallbacks ------------------
+# When no word matches, spell the digits with the letters the trigram model
+# finds easiest to say (0 as O, 1 as I or L), instead of each digit's first
+# letter: e.g. 3235262 -> "EBELANA" rather than "DADJAMA".
+# The beam bounds the work (at most FALLBACK_BEAM x 4 extensions per digit), so
+# the letters depend on the digits alone: they are cached and stored, and a
+# slow call must not pin a worse answer. budget_ms is an opt-in wall-clock cap.
+FALLBACK_BEAM = 16         # (previous, current) letter pairs kept per digit; 16 = all of them
+_FALLBACK_GROUPS = {**T9, "0": "O", "1": "IL"}
+
+def fallback_letters(digits: str, n: Optional[int] = None, beam: int = FALLBACK_BEAM,
+                     budget_ms: Optional[float] = None, locale: Optional[str] = None) -> str:
+    """
+    Most pronounceable spelling of the last n digits (all when n is None).
 
-def _fallback_candidates(e164: str) -> List[VanityCandidate]:
+    Beam search over every letter combination, left to right, scored by the
+    letter trigram model. Paths ending in the same (previous, current) letter
+    pair are merged, keeping the best, and at most `beam` pairs survive each
+    digit. With the default beam nothing is ever cut, so the result is exact
+    and matches vanity_candidates_batch(). Ties go to the earlier letter.
+    The model is the locale's (see _locale_path). With `budget_ms`, digits
+    left when it runs out take their first letter.
+    """
+    tail = _digits_only(digits)
+    if n is not None:
+        tail = tail[-n:] if n > 0 else ""
+    if not tail:
+        return ""
+    model = _ngram(locale)
+    A, BOUND = _NG_A, _NG_BOUND
+    groups = [[ord(ch) - 65 for ch in _FALLBACK_GROUPS[d]] for d in tail]
+    deadline = time.perf_counter() + budget_ms / 1000.0 if budget_ms is not None else None
+
+    # (a, b) -> (log-prob, letters) for paths ending in letters a, b
+    hyps: Dict[Tuple[int, int], Tuple[float, str]] = {(BOUND, BOUND): (0.0, "")}
+    for i, group in enumerate(groups):
+        if deadline is not None and time.perf_counter() > deadline:
+            _, best = max(hyps.values(), key=lambda h: h[0])
+            return best + "".join(chr(65 + g[0]) for g in groups[i:])
+        nxt: Dict[Tuple[int, int], Tuple[float, str]] = {}
+        for (a, b), (lp, s) in hyps.items():
+            row = (a * A + b) * A
+            for c in group:
+                score = lp + model[row + c]
+                cur = nxt.get((b, c))
+                if cur is None or score > cur[0]:
+                    nxt[(b, c)] = (score, s + chr(65 + c))
+        if len(nxt) > beam:
+            nxt = dict(heapq.nlargest(beam, nxt.items(), key=lambda kv: kv[1][0]))
+        hyps = nxt
+
+    best_lp, best = -math.inf, ""
+    for (a, b), (lp, s) in hyps.items():
+        score = lp + model[(a * A + b) * A + BOUND]
+        if score > best_lp:
+            best_lp, best = score, s
+    return best
+
+def fallback_candidates(e164: str, locale: Optional[str] = None) -> List[VanityCandidate]:
+    """Up to three pronounceable non-word options (last 7, 5, 4 digits), best-first."""
     d = _digits_only(e164)
     picks: List[VanityCandidate] = []
     for i, n in enumerate((7, 5, 4)):
         if len(d) >= n:
-            letters = _fallback_letters(d, n)
+            letters = fallback_letters(d, n, locale=locale)
             picks.append(VanityCandidate("", letters, 0.05 - i*0.01))
     if not picks and d:
-        letters = _fallback_letters(d, min(len(d), 4))
+        letters = fallback_letters(d, min(len(d), 4), locale=locale)
         picks.append(VanityCandidate("", letters, 0.01))
     return picks or [VanityCandidate("", "CALLME", 0.001)]
 
-def _score_word(word: str) -> float:
-    """Longer > frequent > pronounceable-ish."""
+# ------------------ Scoring ------------------
+# A word's score is a weighted sum of per-word features:
+#   length       letters (4–7)
+#   zipf         the lexicon's frequency score (WORD_SCORE; Zipf ~1–7)
+#   vowels       1 when at least a quarter of the letters (min. 1) are vowels
+#   vowel_ratio  vowels / letters
+#   repeat       1 when a letter is doubled (LL, OO, ...)
+#   bigram       mean log P(next letter | letter) along the word, word
+#                boundaries included, from the lexicon's own letter bigrams
+#                (pronounceability; <= 0)
+# DEFAULT_WEIGHTS give the ranking the compiled .lex files store (_score_word).
+# VANITY_SCORE_WEIGHTS (a JSON object, or the path of a JSON file; features it
+# omits keep their default) re-ranks each lexicon once at load, in one NumPy
+# pass over the whole feature matrix (see _rerank). A re-ranked lexicon lives
+# in memory and does without the suffix table, which holds the stored ranking.
+SCORE_FEATURES = ("length", "zipf", "vowels", "vowel_ratio", "repeat", "bigram")
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "length": 1.0, "zipf": 1.0, "vowels": 0.2, "vowel_ratio": 0.0, "repeat": -0.1, "bigram": 0.0,
+}
+
+def parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    """Weights from a JSON object or JSON file path, over DEFAULT_WEIGHTS; None/"" -> defaults."""
+    if not spec:
+        return dict(DEFAULT_WEIGHTS)
+    given = json.loads(spec if spec.lstrip().startswith("{") else Path(spec).read_text())
+    unknown = sorted(set(given) - set(SCORE_FEATURES))
+    if unknown:
+        raise ValueError(f"unknown scoring features {unknown}; expected some of {SCORE_FEATURES}")
+    return {**DEFAULT_WEIGHTS, **{name: float(w) for name, w in given.items()}}
+
+SCORE_WEIGHTS = parse_weights(os.environ.get("VANITY_SCORE_WEIGHTS"))
+
+def _score_word(word: str, freq: Optional[float] = None) -> float:
+    """Longer > frequent > pronounceable-ish: DEFAULT_WEIGHTS on one word (the stored ranking).
+
+    `freq` defaults to the loaded lexicon's score; the lexicon compiler passes
+    it explicitly so it can score words before they are loaded.
+    """
     base = float(len(word))
-    freq = float(WORD_SCORE.get(word, 0.0))  # ~0..5 typical
+    if freq is None:
+        freq = float(_engine().word_score.get(word, 0.0))  # ~0..5 typical
     vowels = sum(1 for ch in word if ch in "AEIOU")
     vow_bonus = 0.2 if vowels >= max(1, len(word)//4) else 0.0
     repeat_pen = -0.1 if any(word[i] == word[i+1] for i in range(len(word)-1)) else 0.0
     return base + freq + vow_bonus + repeat_pen
 
-# ------------------ Precomputed T9 index (cold start) ------------------
-# index[n][t9_digits] -> list of words of length n that map to t9_digits
-_INDEX: Dict[int, Dict[str, List[str]]] = {}
-if WORDS:
-    by_len: DefaultDict[int, List[str]] = defaultdict(list)
-    for w in WORDS:
-        by_len[len(w)].append(w)
-    for n, words in by_len.items():
-        bucket: DefaultDict[str, List[str]] = defaultdict(list)
-        for w in words:
-            bucket[_t9_key(w)].append(w)
-        _INDEX[n] = bucket  # type: ignore[assignment]
+def _letter_matrix(lex: _MappedLexicon) -> Tuple[Any, Any]:
+    """(uint8[n_words, 7] letters A=1..Z=26 padded with 0, int64 lengths) straight from the blob."""
+    np = _numpy()
+    blob = np.frombuffer(lex.blob, dtype=np.uint8)
+    offsets = np.frombuffer(lex.offsets, dtype="<u4").astype(np.int64)
+    lengths = np.diff(offsets)
+    idx = offsets[:-1, None] + np.arange(7)
+    inside = np.arange(7) < lengths[:, None]
+    letters = np.where(inside, blob[np.minimum(idx, max(len(blob) - 1, 0))] - 64, 0).astype(np.uint8)
+    return letters, lengths
+
+def word_features(lex: _MappedLexicon) -> Any:
+    """float64[n_words, len(SCORE_FEATURES)]: every word's features, columns in SCORE_FEATURES order."""
+    np = _numpy()
+    letters, lengths = _letter_matrix(lex)
+    n = np.maximum(lengths, 1)
+    vowel_count = np.isin(letters, [ord(v) - 64 for v in "AEIOU"]).sum(axis=1)
+    repeat = ((letters[:, 1:] == letters[:, :-1]) & (letters[:, 1:] > 0)).any(axis=1)
+
+    # letter bigrams with 0 as the boundary: ^F FL LO OW WE ER RS S$
+    seq = np.zeros((len(letters), 9), dtype=np.int64)
+    seq[:, 1:8] = letters
+    prev, nxt = seq[:, :-1], seq[:, 1:]
+    valid = np.arange(8) <= lengths[:, None]
+    pairs = prev * 27 + nxt
+    counts = np.bincount(pairs[valid], minlength=27 * 27).reshape(27, 27) + 1.0  # add-one smoothing
+    logp = np.log(counts / counts.sum(axis=1, keepdims=True)).ravel()
+    bigram = (logp[pairs] * valid).sum(axis=1) / (lengths + 1)
+
+    return np.column_stack([
+        lengths.astype(np.float64),
+        np.frombuffer(lex.freqs, dtype="<f8"),
+        (vowel_count >= np.maximum(1, lengths // 4)).astype(np.float64),
+        vowel_count / n,
+        repeat.astype(np.float64),
+        bigram,
+    ])
+
+def score_matrix(features: Any, weights: Mapping[str, float]) -> Any:
+    """Word scores for a word_features() matrix. Columns are added in feature
+    order, as _score_word adds its terms, so DEFAULT_WEIGHTS reproduce the
+    stored scores bit for bit (a BLAS dot product may not, flipping near-ties)."""
+    total = features[:, 0] * weights[SCORE_FEATURES[0]]
+    for j, name in enumerate(SCORE_FEATURES[1:], 1):
+        total = total + features[:, j] * weights[name]
+    return total
+
+def _rerank(lex: _MappedLexicon, weights: Mapping[str, float]) -> _MappedLexicon:
+    """
+    `lex` with every entry rescored under `weights` and each key's entries
+    re-sorted best-first (ties alphabetical, as the compiler does): one
+    weighted sum over the feature columns and one lexsort, no per-word Python.
+    """
+    np = _numpy()
+    word_scores = score_matrix(word_features(lex), weights)
+    keys = np.frombuffer(lex.keys, dtype="<u4").astype(np.int64)
+    word_ids = np.frombuffer(lex.word_ids, dtype="<u4").astype(np.int64)
+
+    # fuzzy substitutions: the 0/1 digits among a key's n digits (exact T9 keys have none)
+    n, rest = np.divmod(keys, KEY_BASE)
+    subs = np.zeros(len(keys), dtype=np.int64)
+    for i in range(7):
+        rest, digit = np.divmod(rest, 10)
+        subs += (digit <= 1) & (i < n)
+    scores = word_scores[word_ids] - FUZZY_PENALTY * subs
+
+    letters, _ = _letter_matrix(lex)
+    alpha = np.empty(lex.n_words, dtype=np.int64)
+    alpha[np.lexsort(letters.T[::-1])] = np.arange(lex.n_words)
+    order = np.lexsort((alpha[word_ids], -scores, keys))
+
+    return _MappedLexicon(_pack_lexicon(lex.n_entries, lex.n_words, [
+        scores[order].astype("<f8").tobytes(), lex.freqs.tobytes(),
+        keys[order].astype("<u4").tobytes(), word_ids[order].astype("<u4").tobytes(),
+        lex.offsets.tobytes(), lex.blob.tobytes(),
+    ]))
+
+# ------------------ Engines (lazy, one per locale) ------------------
+# Nothing is loaded at import time. The first lookup for a locale (or warm())
+# opens its lexicon, so warm-up pings, imports that never look anything up and
+# locales nobody calls from stay cheap. A single-locale deployment holds one
+# engine, exactly as before.
+# VANITY_LEXICON_BUDGET_MB caps what loaded engines may hold (mapped files
+# count in full): past it, the least recently used other locales are unloaded
+# and reload on their next call. 0 = no cap.
+LEXICON_BUDGET_MB = float(os.environ.get("VANITY_LEXICON_BUDGET_MB", "0"))
+
+def _nbytes(*buffers: Any) -> int:
+    return sum(memoryview(b).nbytes for b in buffers if b is not None)
+
+class _Engine:
+    """One locale's loaded lexicon plus everything derived from it; read-only once built."""
+
+    def __init__(self, locale: Optional[str] = None, root: Optional[Path] = None) -> None:
+        self.locale = locale or DEFAULT_LOCALE
+        self.root = root or _LEXICON_DIR
+        lex = _open_lexicon(self.locale, self.root)
+        # mapped: served from words_4_7.lex; else compiled from the JSONL just now
+        self.mapped = lex is not None
+        if lex is None:
+            if os.environ.get("VANITY_LEXICON_FORMAT", "auto").lower() != "jsonl":
+                log.warning("No compiled lexicon for %s; compiling its word list (slow cold start, "
+                            "run tools/build_lexicon.py --from-jsonl)", self.locale)
+            lex = _MappedLexicon(_compile_lexicon(_word_rows(self.locale)))
+        # reranked: scored under VANITY_SCORE_WEIGHTS rather than as stored
+        self.reranked = False
+        if SCORE_WEIGHTS != DEFAULT_WEIGHTS:
+            try:
+                lex, self.reranked = _rerank(lex, SCORE_WEIGHTS), True
+            except ImportError:
+                log.warning("VANITY_SCORE_WEIGHTS needs numpy; serving the stored ranking")
+        self.lex: _MappedLexicon = lex
+        # the suffix table is only trusted next to the file it was built from
+        self.suffix_table = (_open_suffix_table(lex, self.locale, self.root)
+                             if self.mapped and not self.reranked else None)
+        self.words: AbstractSet[str] = _LexiconWords(lex)
+        self.word_score: Mapping[str, float] = _LexiconScores(lex)
+        self.version = f"lex-{lex.crc:08x}"
+        # built on first use by the features that need them
+        self.trie: Optional[_T9Trie] = None
+        self.automaton: Optional[_T9Automaton] = None
+        self.ngram: Optional[memoryview] = None
+        self.batch_index: Optional[Tuple[Any, Any, Any]] = None
+
+    def nbytes(self) -> int:
+        """Bytes held by the lexicon, suffix table, model and whichever indexes are built."""
+        held = [self.lex._mm, self.suffix_table, self.ngram]
+        for index in (self.trie, self.automaton):
+            if index is not None:
+                held += [v for v in vars(index).values() if isinstance(v, (array, bytearray))]
+        return _nbytes(*held) + sum(a.nbytes for a in self.batch_index or ())
+
+# locale -> engine, least recently used first
+_ENGINES: "OrderedDict[str, _Engine]" = OrderedDict()
+_ENGINE_LOCK = threading.Lock()
+
+def _engine(locale: Optional[str] = None) -> _Engine:
+    locale = locale or DEFAULT_LOCALE
+    eng = _ENGINES.get(locale)
+    if eng is None:
+        with _ENGINE_LOCK:
+            eng = _ENGINES.get(locale)
+            if eng is None:
+                eng = _ENGINES[locale] = _Engine(locale)
+        _trim(locale)
+    elif len(_ENGINES) > 1:
+        try:
+            _ENGINES.move_to_end(locale)
+        except KeyError:  # unloaded by another thread just now; `eng` is still usable
+            pass
+    return eng
+
+def _trim(keep: str) -> None:
+    """Unload least recently used locales (never `keep`) until under LEXICON_BUDGET_MB."""
+    if LEXICON_BUDGET_MB <= 0:
+        return
+    budget = LEXICON_BUDGET_MB * 2 ** 20
+    with _ENGINE_LOCK:
+        sizes = {locale: eng.nbytes() for locale, eng in _ENGINES.items()}
+        total = sum(sizes.values())
+        for locale in list(_ENGINES):
+            if total <= budget:
+                break
+            if locale != keep:
+                del _ENGINES[locale]  # in-flight callers keep their reference
+                total -= sizes[locale]
+                log.info("Unloaded %s lexicon (%.1f MB) to stay under %.0f MB",
+                         locale, sizes[locale] / 2 ** 20, LEXICON_BUDGET_MB)
+
+def _ngram(locale: Optional[str] = None) -> memoryview:
+    """Loaded on the first fallback; matched numbers never touch it."""
+    eng = _engine(locale)
+    if eng.ngram is None:
+        eng.ngram = _open_ngram(eng.lex, eng.locale, eng.root)
+        _trim(eng.locale)
+    return eng.ngram
+
+def use_lexicon_dir(root: Path) -> Dict[str, str]:
+    """
+    Serve compiled lexicons from `root` from now on (hot reload of a release).
+
+    The locales loaded now are rebuilt from `root` first, with the indexes they
+    had (mapped from the release's words_4_7.idx; built here, still before the
+    swap, only if it ships none), on the calling thread; then the whole
+    registry is swapped in one assignment. Calls in flight finish on the
+    engines they already hold. A release without a compiled lexicon for every
+    loaded locale raises ValueError and the current engines stay.
+    Returns {locale: new lexicon version}.
+    """
+    global _LEXICON_DIR, _ENGINES, _AVAILABLE
+    root = Path(root)
+    missing = [locale for locale in _ENGINES if not _locale_path(LEX_FILE, locale, root).exists()]
+    if missing:
+        raise ValueError(f"{root}: release has no {LEX_FILE} for loaded locale(s) {', '.join(missing)}")
+    fresh: "OrderedDict[str, _Engine]" = OrderedDict()
+    for locale, old in list(_ENGINES.items()):
+        eng = fresh[locale] = _Engine(locale, root)
+        if not eng.mapped:
+            raise ValueError(f"{root}: compiled lexicon for {locale} could not be loaded")
+        if old.ngram is not None:
+            eng.ngram = _open_ngram(eng.lex, locale, root)
+        if (old.trie is not None or old.automaton is not None) and not _adopt_indexes(eng):
+            log.warning("Release %s ships no %s for %s; building its indexes", root, IDX_FILE, locale)
+            if old.trie is not None:
+                eng.trie = _T9Trie(_exact_keys(eng.lex))
+            if old.automaton is not None:
+                eng.automaton = _T9Automaton(_exact_keys(eng.lex))
+    with _ENGINE_LOCK:
+        _LEXICON_DIR, _ENGINES, _AVAILABLE = root, fresh, None
+    return {locale: eng.version for locale, eng in fresh.items()}
+
+def warm(phrases: bool = False, anywhere: bool = False, locale: Optional[str] = None) -> None:
+    """Load the lexicon, fallback model (and phrase trie / match-anywhere automaton) now rather than on the first call."""
+    _ngram(locale)
+    if phrases:
+        _phrase_trie(locale)
+    if anywhere:
+        _automaton(locale)
+
+def lexicon_version(locale: Optional[str] = None) -> str:
+    """Identifies the word list behind results (cache keys, stored records)."""
+    return _engine(locale).version
+
+def __getattr__(name: str) -> Any:
+    # WORDS / WORD_SCORE / LEXICON_VERSION stay importable; loaded on first access
+    if name == "WORDS":
+        return _engine().words
+    if name == "WORD_SCORE":
+        return _engine().word_score
+    if name == "LEXICON_VERSION":
+        return _engine().version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ------------------ Main API ------------------
-def vanity_candidates(e164: str, max_letters: int = 7) -> List[VanityCandidate]:
+def _lexicon_candidates(lex: _MappedLexicon, e164: str, digits: str, max_letters: int,
+                        k: Optional[int] = None, fallback: bool = True,
+                        locale: Optional[str] = None) -> List[VanityCandidate]:
+    """vanity_candidates() over the compiled lexicon: entries are pre-scored and best-first."""
+    for n in _lookup_lengths(digits, max_letters):
+        hit = lex.find(n, digits[-n:])
+        if hit:
+            return [VanityCandidate("", lex.word(lex.word_ids[e]), lex.scores[e]) for e in hit[:k]]
+    return fallback_candidates(e164, locale)[:k] if fallback else []
+
+def _table_candidates(lex: _MappedLexicon, table: memoryview, e164: str, digits: str,
+                      k: Optional[int] = None, fallback: bool = True,
+                      locale: Optional[str] = None) -> List[VanityCandidate]:
+    """vanity_candidates() as one suffix-table index (7→4 fallback folded in at build time)."""
+    slot = table[int(digits[-7:])]
+    if not slot:
+        return fallback_candidates(e164, locale)[:k] if fallback else []
+    first = slot >> SFX_COUNT_BITS
+    hit = range(first, first + (slot & ((1 << SFX_COUNT_BITS) - 1)))
+    return [VanityCandidate("", lex.word(lex.word_ids[e]), lex.scores[e]) for e in hit[:k]]
+
+def vanity_candidates(e164: str, max_letters: int = 7, k: Optional[int] = None,
+                      fallback: bool = True, locale: Optional[str] = None) -> List[VanityCandidate]:
     """
     Return best-first VanityCandidate list using the curated lexicon if present,
-    else deterministic fallback so we never return zero.
+    else fallback_candidates() so we never return zero (fallback=False returns
+    [] instead, for callers that handle the no-match case themselves).
+
+    `k` caps the result at the best k; every index stores its words already
+    ranked, so this is a slice with no per-request scoring or sorting.
+    `locale` picks the lexicon (default DEFAULT_LOCALE).
     """
     digits = _digits_only(e164)
     if not digits:
         return []
 
-    # Try longest suffix first (7..4)
-    matches: List[str] = []
-    for n in range(min(max_letters, 7), 3, -1):
-        tail = digits[-n:] if len(digits) >= n else ""
-        if not tail:
+    eng = _engine(locale)
+    if eng.suffix_table is not None and max_letters >= 7 and len(digits) >= 7:
+        return _table_candidates(eng.lex, eng.suffix_table, e164, digits, k, fallback, eng.locale)
+    return _lexicon_candidates(eng.lex, e164, digits, max_letters, k, fallback, eng.locale)
+
+# ------------------ Batch API (bulk portfolios) ------------------
+# Vectorized over a NumPy digit matrix. numpy is imported on first use only:
+# the Connect Lambda never calls this and does not ship it.
+@dataclass
+class VanityBatch:
+    """Columnar top-k results of vanity_candidates_batch(); row i is numbers[i]."""
+    letters: Any    # np.ndarray[str] (N, k); "" where a row has fewer than k options
+    scores: Any     # np.ndarray[float64] (N, k); nan where letters == ""
+    matched: Any    # np.ndarray[bool] (N,); False means fallback letters, not a word
+
+    def rows(self) -> Iterator[List[VanityCandidate]]:
+        for letters, scores in zip(self.letters.tolist(), self.scores.tolist()):
+            yield [VanityCandidate("", L, s) for L, s in zip(letters, scores) if L]
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:  # pragma: no cover - depends on the environment
+        raise ImportError("vanity_candidates_batch and score re-ranking require numpy (pip install numpy)") from e
+    return numpy
+
+def _batch_index(locale: Optional[str] = None) -> Tuple[Any, Any, Any]:
+    """(packed keys int64 ascending, scores float64, words str) per entry, best-first per key."""
+    eng = _engine(locale)
+    if eng.batch_index is None:
+        np = _numpy()
+        lex = eng.lex
+        keys = np.frombuffer(lex.keys, dtype=np.uint32).astype(np.int64)
+        scores = np.frombuffer(lex.scores, dtype=np.float64)
+        words = np.array([lex.word(w) for w in lex.word_ids], dtype="U7")
+        eng.batch_index = (keys, scores, words)
+        _trim(eng.locale)
+    return eng.batch_index
+
+def _fallback_letters_batch(tails: Any, locale: Optional[str] = None) -> Any:
+    """
+    fallback_letters() for each row of an (M, n) digit matrix, as U{n} strings.
+
+    The same search without a beam or time limit: a Viterbi pass over
+    (previous, current) letter-slot pairs, vectorized over rows. Ties resolve
+    to the earlier letter exactly as the scalar loop does.
+    """
+    np = _numpy()
+    M, n = tails.shape
+    A, BOUND = _NG_A, _NG_BOUND
+    model = np.frombuffer(_ngram(locale), dtype=np.float32).astype(np.float64).reshape(A, A, A)
+    groups = np.full((10, 4), -1, dtype=np.int64)
+    for d, letters in _FALLBACK_GROUPS.items():
+        groups[int(d), :len(letters)] = [ord(ch) - 65 for ch in letters]
+    slot = groups[tails]                      # (M, n, 4) letter ids, -1 = no such letter
+    valid = slot >= 0
+    ids = np.where(valid, slot, 0)
+
+    # score[m, jb, jc]: best path whose last two letters are slots jb, jc
+    first = np.where(valid[:, 0], model[BOUND, BOUND][ids[:, 0]], -np.inf)
+    if n == 1:
+        best = first.argmax(axis=1)[:, None]
+    else:
+        score = first[:, :, None] + model[BOUND][ids[:, 0, :, None], ids[:, 1, None, :]]
+        score[~np.broadcast_to(valid[:, 1, None, :], score.shape)] = -np.inf
+        back = []
+        for i in range(2, n):
+            cand = score[:, :, :, None] + model[ids[:, i - 2, :, None, None], ids[:, i - 1, None, :, None],
+                                                ids[:, i, None, None, :]]
+            bp = cand.argmax(axis=1)        # first max = earliest letter, as in the scalar loop
+            score = np.take_along_axis(cand, bp[:, None], axis=1)[:, 0]
+            score[~np.broadcast_to(valid[:, i, None, :], score.shape)] = -np.inf
+            back.append(bp)
+        final = score + model[ids[:, n - 2, :, None], ids[:, n - 1, None, :], BOUND]
+        jb, jc = np.divmod(final.reshape(M, 16).argmax(axis=1), 4)
+        best = np.empty((M, n), dtype=np.int64)
+        best[:, n - 2], best[:, n - 1] = jb, jc
+        rows = np.arange(M)
+        for i in range(n - 1, 1, -1):
+            best[:, i - 2] = back[i - 2][rows, best[:, i - 1], best[:, i]]
+    chars = (np.take_along_axis(ids, best[:, :, None], axis=2)[:, :, 0] + 65).astype(np.uint32)
+    return np.ascontiguousarray(chars).view(f"U{n}").ravel()
+
+def vanity_candidates_batch(numbers: Iterable[str], k: int = 3, locale: Optional[str] = None) -> VanityBatch:
+    """
+    vanity_candidates() for many numbers at once, top k per number.
+
+    Rows with 7+ digits are resolved together: digits are pulled out of the
+    character matrix, the 7-digit suffix becomes an integer key, and the
+    suffix table (or a searchsorted over packed lexicon keys, 7→4) gives each
+    row's ranked entry range. Unmatched rows get the same pronounceable
+    fallback letters as the scalar path. Shorter inputs go through
+    vanity_candidates() one by one.
+    """
+    np = _numpy()
+    nums = np.asarray(list(numbers), dtype=str)
+    N = len(nums)
+    letters = np.full((N, k), "", dtype="U10")
+    scores = np.full((N, k), np.nan)
+    matched = np.zeros(N, dtype=bool)
+    if N == 0 or k <= 0:
+        return VanityBatch(letters, scores, matched)
+
+    # digit matrix: one row of UCS-4 code points per number
+    width = max(1, nums.dtype.itemsize // 4)
+    codes = nums.view(np.uint32).reshape(N, width)
+    is_digit = (codes >= 48) & (codes <= 57)
+    n_digits = is_digit.sum(axis=1)
+    rank = np.cumsum(is_digit[:, ::-1], axis=1)[:, ::-1]  # 1 = last digit
+    in_tail = is_digit & (rank <= 7)
+    pow10 = 10 ** np.arange(7, dtype=np.int64)
+    suffix = ((codes.astype(np.int64) - 48) * np.where(in_tail, pow10[np.clip(rank - 1, 0, 6)], 0)).sum(axis=1)
+
+    full = n_digits >= 7
+    first = np.zeros(N, dtype=np.int64)
+    count = np.zeros(N, dtype=np.int64)
+    suffix_table = _engine(locale).suffix_table
+    if suffix_table is not None:
+        slots = np.frombuffer(suffix_table, dtype=np.uint32)[suffix[full]].astype(np.int64)
+        first[full] = slots >> SFX_COUNT_BITS
+        count[full] = slots & ((1 << SFX_COUNT_BITS) - 1)
+    keys = _batch_index(locale)[0]
+    if suffix_table is None and len(keys):
+        open_rows = full.copy()
+        # _lookup_lengths() per row: exact keys (no 0/1 digit) at any length first
+        has01 = np.cumsum((suffix[:, None] // pow10) % 10 <= 1, axis=1) > 0  # [:, n-1]: in the last n
+        for fuzzy in (False, True):
+            for n in range(7, 3, -1):
+                packed = n * KEY_BASE + suffix % 10 ** n
+                lo = np.searchsorted(keys, packed, side="left")
+                hi = np.searchsorted(keys, packed, side="right")
+                hit = open_rows & (hi > lo) & (has01[:, n - 1] == fuzzy)
+                first[hit], count[hit] = lo[hit], (hi - lo)[hit]
+                open_rows &= ~hit
+    matched[:] = count > 0
+
+    # matched rows: gather the first k entries of each ranked range
+    _, entry_scores, entry_words = _batch_index(locale)
+    cols = np.arange(k)
+    take = matched[:, None] & (cols < count[:, None])
+    entry = (first[:, None] + cols)[take]
+    letters[take] = entry_words[entry]
+    scores[take] = entry_scores[entry]
+
+    # unmatched 7+ digit rows: pronounceable fallback letters for the last 7/5/4
+    miss = full & ~matched
+    if miss.any():
+        tail = (suffix[miss, None] // pow10[::-1]) % 10
+        for i, n in enumerate((7, 5, 4)[:k]):
+            letters[miss, i] = _fallback_letters_batch(tail[:, 7 - n:], locale)
+            scores[miss, i] = 0.05 - i * 0.01
+
+    for i in np.flatnonzero(~full).tolist():
+        for j, c in enumerate(vanity_candidates(str(nums[i]), k=k, locale=locale)):
+            letters[i, j], scores[i, j] = c.raw_letters, c.score
+            matched[i] = matched[i] or c.score > 0.05  # lexicon hits always outscore fallbacks
+    return VanityBatch(letters, scores, matched)
+
+# ------------------ Phrase segmentation (multi-word) ------------------
+# Covers the whole local (7) or national (10) number with one or more lexicon
+# words, leaving literal digits where nothing fits: 800-GO-FLOWERS style.
+# Segmentations are ranked by the sum of their word scores minus a penalty per
+# literal digit, found by k-best dynamic programming over a T9 trie.
+# The DP is bounded by span and k (span steps of at most k x (1 + k x word
+# lengths) options), so the result depends on the digits alone; budget_ms is
+# an opt-in wall-clock cap.
+_PHRASE_GAP_PENALTY = 1.0   # per digit left as a literal
+
+class _T9Trie:
+    """Digit trie over lexicon T9 keys, as flat arrays (row of 10 children per node)."""
+
+    def __init__(self, keys: Iterable[str]):
+        self.child = array("i", [-1] * 10)
+        self.terminal = bytearray(1)
+        for key in keys:
+            node = 0
+            for ch in key:
+                slot = node * 10 + ord(ch) - 48
+                nxt = self.child[slot]
+                if nxt < 0:
+                    nxt = len(self.terminal)
+                    self.child[slot] = nxt
+                    self.child.extend([-1] * 10)
+                    self.terminal.append(0)
+                node = nxt
+            self.terminal[node] = 1
+
+    def lengths(self, digits: str, start: int) -> Iterator[int]:
+        """Lengths n for which digits[start:start+n] is a lexicon key."""
+        node = 0
+        for n, ch in enumerate(digits[start:], 1):
+            node = self.child[node * 10 + ord(ch) - 48]
+            if node < 0:
+                return
+            if self.terminal[node]:
+                yield n
+
+def _exact_keys(lex: _MappedLexicon) -> Iterator[str]:
+    """Distinct T9 keys of exact spellings. Fuzzy keys (with a 0 or 1) serve
+    suffix lookups only: inside a phrase or mid-number, a literal 0/1 reads
+    better than a word spelled with it (800-FLOWERS, not TOOF-LOWERS)."""
+    for k in dict.fromkeys(lex.keys):
+        key = f"{k % KEY_BASE:0{k // KEY_BASE}d}"
+        if "0" not in key and "1" not in key:
+            yield key
+
+def _phrase_trie(locale: Optional[str] = None) -> _T9Trie:
+    """Built on first phrase lookup so single-word callers never pay for it."""
+    eng = _engine(locale)
+    if eng.trie is None:
+        if not _adopt_indexes(eng):
+            eng.trie = _T9Trie(_exact_keys(eng.lex))
+        _trim(eng.locale)
+    return eng.trie
+
+def _ranked_words(n: int, digits: str, k: int, locale: Optional[str] = None) -> List[Tuple[float, str]]:
+    """Best k (score, word) pairs whose T9 key is `digits` (length n)."""
+    lex = _engine(locale).lex
+    return [(lex.scores[e], lex.word(lex.word_ids[e])) for e in lex.find(n, digits)[:k]]
+
+def phrase_candidates(
+    e164: str,
+    k: int = 3,
+    span: int = 10,
+    budget_ms: Optional[float] = None,
+    locale: Optional[str] = None,
+) -> List[VanityCandidate]:
+    """
+    Return up to k best-first segmentations of the last `span` digits (7 or 10)
+    into lexicon words and literal digits, e.g. display "800-356-9377" ->
+    "800-FLOWERS". raw_letters joins the words; display is already formatted.
+
+    The DP runs right to left, so the number's tail is always resolved first.
+    With `budget_ms`, leading digits left when it runs out stay literal.
+    Returns [] when no segmentation contains a word.
+    """
+    digits = _digits_only(e164)
+    if not digits or k <= 0:
+        return []
+    body = digits[-span:]
+    lead = digits[-10:-span] if len(digits) >= 10 and span < 10 else ""
+    trie = _phrase_trie(locale)
+    deadline = time.perf_counter() + budget_ms / 1000.0 if budget_ms is not None else None
+
+    # best[i]: k best (score, segments) covering body[i:]; segments are
+    # (text, is_word) pairs
+    L = len(body)
+    best: List[List[Tuple[float, Tuple[Tuple[str, bool], ...]]]] = [[] for _ in range(L + 1)]
+    best[L] = [(0.0, ())]
+    start = 0
+    for i in range(L - 1, -1, -1):
+        if deadline is not None and time.perf_counter() > deadline:
+            start = i + 1
+            break
+        options = [(s - _PHRASE_GAP_PENALTY, ((body[i], False),) + segs) for s, segs in best[i + 1]]
+        for n in trie.lengths(body, i):
+            for ws, w in _ranked_words(n, body[i:i + n], k, locale):
+                options.extend((ws + s, ((w, True),) + segs) for s, segs in best[i + n])
+        best[i] = heapq.nlargest(k, options, key=lambda o: o[0])
+
+    out: List[VanityCandidate] = []
+    for score, segs in best[start]:
+        words = [text for text, is_word in segs if is_word]
+        if not words:
             continue
-        words_by_key = _INDEX.get(n)
-        if words_by_key:
-            hit = words_by_key.get(tail, [])
-            if hit:
-                matches = hit
-                break
+        if start:
+            segs = ((body[:start], False),) + segs
+            score -= _PHRASE_GAP_PENALTY * start
+        groups: List[str] = [lead] if lead else []
+        for text, is_word in segs:
+            if not is_word and groups and groups[-1].isdigit():
+                groups[-1] += text  # merge literal runs: 3,0,3 -> 303
+            else:
+                groups.append(text)
+        out.append(VanityCandidate("-".join(groups), "".join(words), score))
+    return out
+
+# ------------------ Match anywhere (Aho-Corasick) ------------------
+# Finds every lexicon word at any offset of the national number, not just the
+# suffix: 303-FLOW-377 as well as 303-555-FLOW. One left-to-right pass over
+# the digits; cost depends on the number's length and its matches, not on
+# the lexicon size.
+_ANYWHERE_TRAIL_PENALTY = 0.25  # per digit after the word: tail words still win ties
+
+class _T9Automaton:
+    """Aho-Corasick automaton over lexicon T9 keys, as flat arrays (10 transitions per node)."""
+
+    def __init__(self, keys: Iterable[str]):
+        trie = _T9Trie(keys)
+        goto, terminal = trie.child, trie.terminal
+        n_nodes = len(terminal)
+        fail = array("i", [0]) * n_nodes
+        out = array("i", [-1]) * n_nodes  # nearest terminal node on the fail chain
+        depth = bytearray(n_nodes)
+        queue: List[int] = []
+        for c in range(10):
+            nxt = goto[c]
+            if nxt < 0:
+                goto[c] = 0
+            else:
+                depth[nxt] = 1
+                queue.append(nxt)
+        # BFS: a node's fail target is shallower, so its row is already complete
+        for node in queue:
+            f = fail[node]
+            out[node] = f if terminal[f] else out[f]
+            row, frow = node * 10, f * 10
+            for c in range(10):
+                nxt = goto[row + c]
+                if nxt < 0:
+                    goto[row + c] = goto[frow + c]
+                else:
+                    fail[nxt] = goto[frow + c]
+                    depth[nxt] = depth[node] + 1
+                    queue.append(nxt)
+        self.goto, self.terminal, self.out, self.depth = goto, terminal, out, depth
 
-    if not matches:
-        return _fallback_candidates(e164)
+    def __len__(self) -> int:
+        return len(self.terminal)
 
-    scored = [VanityCandidate("", w, _score_word(w)) for w in matches]
-    scored.sort(key=lambda c: c.score, reverse=True)
-    return scored
\ No newline at end of file
+    def matches(self, digits: str) -> Iterator[Tuple[int, int]]:
+        """(end, n) for every key equal to digits[end - n:end]."""
+        goto, terminal, out, depth = self.goto, self.terminal, self.out, self.depth
+        node = 0
+        for end, ch in enumerate(digits, 1):
+            node = goto[node * 10 + ord(ch) - 48]
+            m = node if terminal[node] else out[node]
+            while m > 0:
+                yield end, depth[m]
+                m = out[m]
+
+def _automaton(locale: Optional[str] = None) -> _T9Automaton:
+    """Built on first match-anywhere lookup so other callers never pay for it."""
+    eng = _engine(locale)
+    if eng.automaton is None:
+        if not _adopt_indexes(eng):
+            eng.automaton = _T9Automaton(_exact_keys(eng.lex))
+        _trim(eng.locale)
+    return eng.automaton
+
+# ------------------ Prebuilt phrase trie + automaton ------------------
+# words_4_7.idx is written by tools/build_lexicon.py so that neither index is
+# built at runtime (about 0.2 s and 0.5 s of pure Python for English; on a
+# hot reload that would hold the GIL while requests are being served). Both
+# are over the same exact keys, so they share node numbers:
+#   header   : magic, version, crc32 of the .lex it was built from, n_nodes
+#   child    : int32[n_nodes * 10]  _T9Trie.child
+#   goto     : int32[n_nodes * 10]  _T9Automaton.goto
+#   out      : int32[n_nodes]       _T9Automaton.out
+#   terminal : uint8[n_nodes]
+#   depth    : uint8[n_nodes]
+IDX_FILE = "words_4_7.idx"
+IDX_MAGIC = b"VANITYIX"
+IDX_VERSION = 1
+IDX_HEADER = struct.Struct("<8sIII")
+
+
+def _compile_indexes(lex: _MappedLexicon) -> bytes:
+    """The .idx bytes for `lex` (crc-tied, like the suffix table)."""
+    trie = _T9Trie(_exact_keys(lex))
+    ac = _T9Automaton(_exact_keys(lex))
+    parts = [array("i", trie.child), array("i", ac.goto), array("i", ac.out)]
+    if sys.byteorder != "little":
+        for arr in parts:
+            arr.byteswap()
+    header = IDX_HEADER.pack(IDX_MAGIC, IDX_VERSION, lex.crc, len(trie.terminal))
+    return b"".join([header, *(arr.tobytes() for arr in parts), bytes(trie.terminal), bytes(ac.depth)])
+
+
+def _open_indexes(lex: _MappedLexicon, locale: Optional[str] = None,
+                  root: Optional[Path] = None) -> Optional[Tuple[_T9Trie, _T9Automaton]]:
+    """Load the prebuilt trie and automaton if they were built from this exact lexicon."""
+    p = _locale_path(IDX_FILE, locale, root or _LEXICON_DIR)
+    if not p.exists() or sys.byteorder != "little":
+        return None
+    try:
+        data = p.read_bytes()
+        magic, version, lex_crc, n = IDX_HEADER.unpack_from(data, 0)
+        if magic != IDX_MAGIC or version != IDX_VERSION:
+            raise ValueError(f"unsupported index format {magic!r} v{version}")
+        if lex_crc != lex.crc:
+            raise ValueError(f"built for a different {LEX_FILE}")
+        view = memoryview(data)[IDX_HEADER.size:]
+        if len(view) != n * 86:
+            raise ValueError("truncated index")
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring prebuilt indexes %s: %s", p, e)
+        return None
+    # one copy per array: indexing an array is faster than a memoryview in the lookup loops
+    child, goto, out = array("i"), array("i"), array("i")
+    child.frombytes(view[:40 * n])
+    goto.frombytes(view[40 * n:80 * n])
+    out.frombytes(view[80 * n:84 * n])
+    trie, ac = _T9Trie(()), _T9Automaton(())
+    trie.child, ac.goto, ac.out = child, goto, out
+    trie.terminal = ac.terminal = bytearray(view[84 * n:85 * n])
+    ac.depth = bytearray(view[85 * n:])
+    return trie, ac
+
+def _adopt_indexes(eng: "_Engine") -> bool:
+    """Take both indexes from words_4_7.idx when the release ships it for this lexicon."""
+    if not eng.mapped or eng.reranked:
+        return False  # a compiled-in-memory or reranked lexicon has its own crc
+    shipped = _open_indexes(eng.lex, eng.locale, eng.root)
+    if shipped is None:
+        return False
+    eng.trie, eng.automaton = shipped
+    return True
+
+def anywhere_candidates(e164: str, k: int = 3, locale: Optional[str] = None) -> List[VanityCandidate]:
+    """
+    Best k lexicon words occurring anywhere in the national number (last 10
+    digits). Ranked by word score minus a small penalty per digit after the
+    word, then by position (later first). `offset` is where the word starts;
+    display is left empty for handler._format_display().
+    Returns [] when no word occurs.
+    """
+    digits = _digits_only(e164)[-10:]
+    if not digits or k <= 0:
+        return []
+    lex = _engine(locale).lex
+    best: Dict[str, VanityCandidate] = {}
+    for end, n in _automaton(locale).matches(digits):
+        penalty = _ANYWHERE_TRAIL_PENALTY * (len(digits) - end)
+        for e in lex.find(n, digits[end - n:end])[:k]:
+            w = lex.word(lex.word_ids[e])
+            score = lex.scores[e] - penalty
+            if w not in best or score > best[w].score:
+                best[w] = VanityCandidate("", w, score, end - n)
+    return sorted(best.values(), key=lambda c: (-c.score, -(c.offset or 0), c.raw_letters))[:k]
@@ -1,6 +1,18 @@
 // web/app.js
 (() => {
   const API_PATH = "/last5"; // CloudFront -> API Gateway
+  const SHOW = 5;
+
+  const REFRESH_MS = 10000;  // version checks; a 304 costs the API no read
+
+  // Newest first, as the API returns them; later loads only ask for items
+  // newer than the first one (?since=) and revalidate with If-None-Match.
+  // When the API serves its materialized view it sends a version: then the
+  // page checks for a newer one (?version=) every REFRESH_MS instead.
+  let shown = [];
+  let etag = null;
+  let etagUrl = null;
+  let version = null;
 
   const $status  = document.getElementById("status");
   const $results = document.getElementById("results");
@@ -71,18 +83,35 @@
 
   async function load() {
     try {
-      $status.textContent = "Loading…";
-      const r = await fetch(API_PATH, { headers: { "Accept": "application/json" } });
+      if (!shown.length) $status.textContent = "Loading…";
+      const since = version === null && shown.length && shown[0].created_at;
+      const url = version !== null ? `${API_PATH}?limit=${SHOW}&version=${version}`
+                : since ? `${API_PATH}?since=${encodeURIComponent(since)}&limit=${SHOW}` : API_PATH;
+      const headers = { "Accept": "application/json" };
+      if (etag && etagUrl === url) headers["If-None-Match"] = etag;
+
+      const r = await fetch(url, { headers });
+      if (r.status === 304) {  // nothing new
+        $status.textContent = "";
+        return true;
+      }
       if (!r.ok) throw new Error(`HTTP ${r.status}`);
+      etag = r.headers.get("ETag");
+      etagUrl = url;
       const data = await r.json();
+      const wasPolling = version !== null;
+      version = Number.isInteger(data?.version) ? data.version : null;
 
-      // normalize to an array
+      // normalize to an array (already newest → oldest)
       const items = Array.isArray(data?.items) ? data.items
                    : Array.isArray(data)       ? data
                    : [];
-
-      // newest → oldest
-      items.sort((a, b) => new Date(b.created_at || 0) - new Date(a.created_at || 0));
+      if (since && !items.length) {
+        $status.textContent = "";
+        return true;
+      }
+      // a version response is the whole newest page
+      shown = (wasPolling ? items : items.concat(shown)).slice(0, SHOW);
 
       // render
       $results.innerHTML = "";
@@ -91,7 +120,7 @@
       $badge.innerHTML = '<span class="dot"></span> Updated just now';
       $results.appendChild($badge);
 
-      const show = items.slice(0, 5);
+      const show = shown;
       if (!show.length) {
         const $empty = document.createElement("div");
         $empty.className = "empty";
@@ -102,12 +131,22 @@
       }
 
       $status.textContent = "";
+      return true;
     } catch (err) {
       $status.textContent = `Couldn't load recent calls (${err.message}).`;
+      return false;
+    }
+  }
+
+  // With a versioned view, keep checking for the next version.
+  async function follow() {
+    while (version !== null) {
+      await new Promise(res => setTimeout(res, REFRESH_MS));
+      await load();
     }
   }
 
-  load();
-  // Optional periodic refresh:
+  load().then(follow);
+  // Optional periodic refresh (API without the materialized view):
   // setInterval(load, 30000);
 })();
\ No newline at end of file